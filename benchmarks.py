@@ -0,0 +1,442 @@
+"""
+Benchmarks de rendimiento del sistema
+"""
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from dataclasses import make_dataclass, fields, field
+from pathlib import Path
+
+# Añadir el directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+import pandas as pd
+from services import (ExcelReader, GroupingOptimizer, GroupingPortfolio, PlanCache, NestingEngine,
+                      ShapeRegistry, NFPCache)
+import copy
+from models import Player, Piece, Garment
+from config import VALID_SIZES
+
+
+def _timeit(func, repeat: int = 3) -> float:
+    """
+    Ejecuta una función varias veces y devuelve el mejor tiempo
+
+    Args:
+        func: Función sin argumentos a medir
+        repeat: Número de repeticiones
+
+    Returns:
+        Mejor tiempo en segundos
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build_synthetic_order_sheet(rows: int = 50_000, players_per_sponsor: int = 25,
+                                seed: int = 42) -> pd.DataFrame:
+    """
+    Genera una hoja de pedido sintética con el formato de ExcelReader
+
+    Args:
+        rows: Número aproximado de filas
+        players_per_sponsor: Jugadores por bloque de patrocinador
+        seed: Semilla aleatoria
+
+    Returns:
+        DataFrame con la hoja sintética
+    """
+    rng = random.Random(seed)
+    first, second = [], []
+
+    sponsor_idx = 0
+    while len(first) < rows:
+        first.append(f"Patrocinador: SPONSOR {sponsor_idx}")
+        second.append(None)
+        sponsor_idx += 1
+        for i in range(players_per_sponsor):
+            name = f"JUGADOR{i}"
+            first.append(f"{i + 1} {name}" if rng.random() < 0.8 else name)
+            second.append(rng.choice(VALID_SIZES))
+        first.append(None)
+        second.append(None)
+
+    first.append("TOTAL")
+    second.append(len(first))
+
+    return pd.DataFrame({"Jugador": first, "Talla": second})
+
+
+def benchmark_excel_parser(rows: int = 50_000):
+    """Compara el parseo fila a fila con el parseo columnar de ExcelReader"""
+    print("=" * 60)
+    print(f"BENCHMARK: PARSEO DE PEDIDO ({rows} filas)")
+    print("=" * 60)
+
+    df = build_synthetic_order_sheet(rows)
+
+    def parse(vectorized: bool):
+        reader = ExcelReader("sintetico.xlsx")
+        reader.df = df
+        return reader.parse_order(vectorized=vectorized)
+
+    assert parse(False) == parse(True), "El parseo columnar no coincide con el parseo fila a fila"
+
+    t_rows = _timeit(lambda: parse(False))
+    t_vector = _timeit(lambda: parse(True))
+
+    print(f"   iterrows:  {t_rows * 1000:9.1f} ms")
+    print(f"   columnar:  {t_vector * 1000:9.1f} ms")
+    print(f"   speedup:   {t_rows / t_vector:9.1f}x")
+
+
+def _legacy_model(cls, extra: tuple = ()):
+    """Réplica de un modelo como dataclass con __dict__ y sin interning"""
+    spec = [
+        (f.name, f.type, field(default=f.default, default_factory=f.default_factory))
+        for f in fields(cls) if not f.name.startswith("_")
+    ]
+    return make_dataclass(f"Legacy{cls.__name__}", spec + list(extra))
+
+
+def _measure_bytes(factory, count: int) -> float:
+    """
+    Mide la memoria media por objeto creado
+
+    Args:
+        factory: Función que recibe el índice y crea un objeto
+        count: Número de objetos
+
+    Returns:
+        Bytes por objeto
+    """
+    tracemalloc.start()
+    objects = [factory(i) for i in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / count
+
+
+def benchmark_model_memory(count: int = 100_000):
+    """Compara la memoria por jugador y por pieza con y sin __slots__/interning"""
+    print("=" * 60)
+    print(f"BENCHMARK: MEMORIA DE MODELOS ({count} objetos)")
+    print("=" * 60)
+
+    sponsors = [f"SPONSOR {i}" for i in range(20)]
+    vertices = [(float(i), float(i * 2)) for i in range(50)]
+
+    # Cadenas nuevas en cada fila, como las que produce el parseo del Excel
+    def fresh(text: str) -> str:
+        return "".join(list(text))
+
+    def player_args(i: int) -> dict:
+        return dict(name=f"JUGADOR {i}", number=str(i % 99),
+                    size=fresh(VALID_SIZES[i % len(VALID_SIZES)]),
+                    sponsor=fresh(sponsors[i % len(sponsors)]), team=fresh("EQUIPO"))
+
+    def piece_args(i: int) -> dict:
+        return dict(name=fresh("@MANGA DER"), size=fresh(VALID_SIZES[i % len(VALID_SIZES)]),
+                    vertices=[(x + i, y + i) for x, y in vertices])
+
+    legacy_player = _legacy_model(Player)
+    legacy_piece = _legacy_model(Piece, extra=[("width", float, field(default=0.0)), ("height", float, field(default=0.0)),
+                                                ("vertices", list, field(default_factory=list))])
+
+    rows = [
+        ("Player", _measure_bytes(lambda i: legacy_player(**player_args(i)), count),
+         _measure_bytes(lambda i: Player(**player_args(i)), count)),
+        ("Piece", _measure_bytes(lambda i: legacy_piece(**piece_args(i)), count),
+         _measure_bytes(lambda i: Piece(**piece_args(i)), count)),
+    ]
+
+    for name, before, after in rows:
+        print(f"   {name:7s} antes: {before:8.0f} B   ahora: {after:8.0f} B   "
+              f"({(1 - after / before) * 100:.0f}% menos)")
+
+
+def _legacy_rotate_translate(vertices: list, angle: float, dx: float, dy: float) -> list:
+    """Rotación y traslación vértice a vértice (implementación anterior)"""
+    angle_rad = np.radians(angle)
+    cos_a = np.cos(angle_rad)
+    sin_a = np.sin(angle_rad)
+    rotated = [(x * cos_a - y * sin_a, x * sin_a + y * cos_a) for x, y in vertices]
+    return [(x + dx, y + dy) for x, y in rotated]
+
+
+def benchmark_piece_transforms(vertex_count: int = 500, iterations: int = 2_000):
+    """Mide el throughput de rotar, trasladar, reflejar y calcular la caja de una pieza"""
+    print("=" * 60)
+    print(f"BENCHMARK: TRANSFORMACIONES DE PIEZA ({vertex_count} vértices)")
+    print("=" * 60)
+
+    theta = np.linspace(0, 2 * np.pi, vertex_count, endpoint=False)
+    outline = np.column_stack([300 * np.cos(theta), 400 * np.sin(theta)])
+
+    def legacy():
+        vertices = [tuple(v) for v in outline.tolist()]
+        for i in range(iterations):
+            vertices = _legacy_rotate_translate(vertices, 90, 1.0, 1.0)
+            np.array(vertices).min(axis=0)
+
+    def vectorized(dtype):
+        piece = Piece(name="DELANTERO", size="M", vertices=outline.copy()).astype(dtype)
+        for i in range(iterations):
+            piece.rotate(90)
+            piece.translate(1.0, 1.0)
+            piece.mirror()
+            piece.calculate_bounding_box()
+        piece.vertices  # los vértices solo se calculan al pedirlos
+
+    t_legacy = _timeit(legacy, repeat=1)
+    t_f64 = _timeit(lambda: vectorized(np.float64), repeat=1)
+    t_f32 = _timeit(lambda: vectorized(np.float32), repeat=1)
+
+    for label, elapsed in [("listas (antes)", t_legacy), ("float64", t_f64), ("float32", t_f32)]:
+        print(f"   {label:15s}: {iterations / elapsed:10.0f} transformaciones/s "
+              f"({vertex_count * iterations / elapsed / 1e6:6.1f} Mvértices/s)")
+
+
+def benchmark_garment_flyweight(players: int = 500, vertex_count: int = 400):
+    """Compara la memoria de prendas por jugador copiadas frente a compartidas"""
+    print("=" * 60)
+    print(f"BENCHMARK: PRENDAS POR JUGADOR ({players} jugadores)")
+    print("=" * 60)
+
+    theta = np.linspace(0, 2 * np.pi, vertex_count, endpoint=False)
+    outline = np.column_stack([300 * np.cos(theta), 400 * np.sin(theta)])
+    pattern = Garment(size="M")
+    for name in ["DELANTERO", "POSTERIOR", "@MANGA DER", "@MANGA IZQ"]:
+        pattern.add_piece(Piece(name=name, size="M", vertices=outline))
+
+    def copied(i: int) -> Garment:
+        garment = copy.deepcopy(pattern)
+        garment.player = Player(name=f"JUGADOR {i}", number=str(i), size="M")
+        return garment
+
+    def shared(i: int) -> Garment:
+        return pattern.instantiate(Player(name=f"JUGADOR {i}", number=str(i), size="M"))
+
+    before = _measure_bytes(copied, players)
+    after = _measure_bytes(shared, players)
+    print(f"   copia por jugador:     {before:9.0f} B/prenda")
+    print(f"   geometría compartida:  {after:9.0f} B/prenda ({before / after:.1f}x menos)")
+
+
+def benchmark_piece_simplification(vertex_count: int = 5_000, tolerance: float = 0.5):
+    """Mide la reducción de vértices y el coste de simplificar un contorno denso"""
+    print("=" * 60)
+    print(f"BENCHMARK: SIMPLIFICACIÓN DE CONTORNOS ({vertex_count} vértices, {tolerance} mm)")
+    print("=" * 60)
+
+    theta = np.linspace(0, 2 * np.pi, vertex_count, endpoint=False)
+    radius = 300 + 15 * np.sin(7 * theta)
+    outline = np.column_stack([radius * np.cos(theta), 1.3 * radius * np.sin(theta)])
+    piece = Piece(name="DELANTERO", size="M", vertices=outline)
+
+    elapsed = _timeit(lambda: piece.simplify(tolerance))
+    original = piece.calculate_area()
+    simplified = Piece(name="DELANTERO", size="M", vertices=piece.placement_source).calculate_area()
+
+    print(f"   vértices:  {len(piece.source_vertices)} -> {len(piece.placement_source)} "
+          f"({piece.vertex_reduction * 100:.1f}% menos)")
+    print(f"   área:      +{(simplified / original - 1) * 100:.3f}% (nunca encoge)")
+    print(f"   tiempo:    {elapsed * 1000:9.1f} ms")
+
+
+def benchmark_grouping_cache(orders: int = 50, sizes: int = 10):
+    """Compara el tiempo de agrupar tallas sin caché, con caché vacía y con caché llena"""
+    print("=" * 60)
+    print(f"BENCHMARK: CACHÉ DE PLANES DE AGRUPACIÓN ({orders} pedidos, {sizes} tallas)")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    labels = list(VALID_SIZES)[:sizes]
+    summaries = [{size: rng.randint(1, 30) for size in labels} for _ in range(orders)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PlanCache(str(Path(tmp) / "plans.sqlite"))
+        plain = GroupingOptimizer()
+        cached = GroupingOptimizer(cache=cache)
+
+        start = time.perf_counter()
+        for summary in summaries:
+            plain.optimize(summary)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for summary in summaries:
+            cached.optimize(summary)
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for summary in summaries:
+            cached.optimize(summary)
+        hot = time.perf_counter() - start
+        stats = cache.get_stats()
+        cache.close()
+
+    print(f"   sin caché:         {cold * 1000 / orders:9.2f} ms/pedido")
+    print(f"   caché vacía:       {warm * 1000 / orders:9.2f} ms/pedido "
+          f"({stats['warm_starts']} arranques en caliente)")
+    print(f"   caché llena:       {hot * 1000 / orders:9.2f} ms/pedido ({cold / hot:.0f}x)")
+
+
+def benchmark_grouping_portfolio(orders: int = 10, sizes: int = 26, time_budget: float = 1.0):
+    """Compara el branch-and-bound solo con el portfolio de estrategias en pedidos grandes"""
+    print("=" * 60)
+    print(f"BENCHMARK: PORTFOLIO DE AGRUPACIÓN ({orders} pedidos, {sizes} tallas, {time_budget} s)")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    summaries = [{f"T{i}": rng.randint(1, 60) for i in range(sizes)} for _ in range(orders)]
+    single = GroupingOptimizer(time_budget=time_budget)
+
+    single_waste = portfolio_waste = 0
+    with GroupingPortfolio(time_budget=time_budget) as portfolio:
+        for summary in summaries:
+            single_waste += single.optimize(summary).get_waste()
+            portfolio_waste += portfolio.optimize(summary).get_waste()
+
+    print(f"   sobrantes branch-and-bound: {single_waste:6d}")
+    print(f"   sobrantes portfolio:        {portfolio_waste:6d}")
+    for name, stats in portfolio.get_stats().items():
+        print(f"   {name:18s} victorias {stats['wins']:3d} (únicas {stats['sole_wins']:3d}), "
+              f"sin plan {stats['failures']:3d}, omitida {stats['skipped']:3d}")
+
+
+def _jersey_garment(size: str, scale: float) -> Garment:
+    """Camiseta sintética: cuerpos con sisa y escote, mangas con copa y sesgo de cuello"""
+    def arc(cx, cy, rx, ry, start, stop, n):
+        t = np.linspace(start, stop, n)
+        return np.column_stack([cx + rx * np.cos(t), cy + ry * np.sin(t)])
+
+    def body(neck):
+        width, height = 520, 720
+        outline = np.vstack([
+            [[0, 0], [width, 0], [width, 480]],
+            arc(width - 10, 720, 70, 240, -np.pi / 2, -np.pi, 16)[1:],
+            [[width - 90, height]],
+            arc(width / 2, height, width / 2 - 150, neck, 0, -np.pi, 24),
+            [[90, height]],
+            arc(10, 720, 70, 240, 0, -np.pi / 2, 16)[:-1]
+        ])
+        return outline * scale
+
+    sleeve = np.vstack([[[60, 0], [420, 0], [480, 170]],
+                        arc(240, 170, 240, 110, 0, np.pi, 30)[1:-1],
+                        [[0, 170]]]) * scale
+    outlines = {
+        "DELANTERO": body(110),
+        "POSTERIOR": body(30),
+        "@MANGA DER": sleeve,
+        "@MANGA IZQ": sleeve * [-1, 1],
+        "SESGO CUELLO": np.array([[0, 0], [460 * scale, 0], [460 * scale, 40], [0, 40]])
+    }
+    garment = Garment(size=size)
+    for name, outline in outlines.items():
+        piece = Piece(name=name, size=size, vertices=outline)
+        piece.simplify(0.5)
+        garment.add_piece(piece)
+    return garment
+
+
+def benchmark_nesting(garments: int = 200):
+    """Mide el nesting bottom-left-fill de un grupo grande frente a apilar cajas"""
+    print("=" * 60)
+    print(f"BENCHMARK: NESTING EN ROLLO ({garments} prendas)")
+    print("=" * 60)
+
+    shapes = ShapeRegistry()
+    patterns = {size: _jersey_garment(size, scale)
+                for size, scale in [("S", 0.92), ("M", 1.0), ("L", 1.08), ("XL", 1.16)]}
+    for garment in patterns.values():
+        shapes.canonicalize_garment(garment)
+    sizes = list(patterns)
+    group = [patterns[sizes[i % len(sizes)]].instantiate() for i in range(garments)]
+
+    # Referencia: la caja de cada prenda (Garment.get_bounding_box) en filas a lo ancho del rollo
+    engine = NestingEngine()
+    usable = engine.roll_width - 2 * engine.edge_margin
+    for garment in group:
+        for piece in garment.pieces:
+            piece.calculate_bounding_box()
+    boxes = sorted((garment.get_bounding_box() for garment in group), key=lambda box: -box[1])
+    box_length, row_width, row_height = 0.0, usable, 0.0
+    for width, height in boxes:
+        if row_width + width > usable:
+            box_length += row_height + engine.spacing
+            row_width, row_height = 0.0, height
+        row_width += width + engine.spacing
+    box_length += row_height + 2 * engine.edge_margin
+
+    result = engine.nest(group)
+    print(f"   piezas:            {len(result.placements)} ({len(result.unplaced)} sin colocar)")
+    print(f"   longitud usada:    {result.length / 1000:9.2f} m (cajas: {box_length / 1000:.2f} m)")
+    print(f"   eficiencia:        {result.efficiency * 100:9.1f}% (objetivo "
+          f"{result.target_efficiency * 100:.0f}%)")
+    print(f"   tiempo:            {result.elapsed:9.2f} s")
+
+
+def benchmark_nfp_cache(sizes: tuple = ("M", "L"), rotations: tuple = (0, 90)):
+    """Compara calcular los no-fit polygons de un patrón con leerlos de la caché en disco"""
+    print("=" * 60)
+    print(f"BENCHMARK: CACHÉ DE NO-FIT POLYGONS (tallas {'/'.join(sizes)}, giros {rotations})")
+    print("=" * 60)
+
+    shapes = ShapeRegistry()
+    pieces = []
+    for index, size in enumerate(sizes):
+        garment = _jersey_garment(size, 1.0 + 0.08 * index)
+        shapes.canonicalize_garment(garment)
+        pieces.extend(garment.pieces)
+
+    def lookups(cache: NFPCache):
+        for fixed in pieces:
+            for moving in pieces:
+                for angle in rotations:
+                    rotated = moving.instance()
+                    rotated.rotate(angle)
+                    cache.get(fixed, rotated)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "nfp.sqlite")
+        timings = []
+        for _ in range(2):
+            cache = NFPCache(path, shapes=shapes)
+            start = time.perf_counter()
+            lookups(cache)
+            timings.append((time.perf_counter() - start, cache.get_stats()))
+            cache.close()
+
+    (cold, cold_stats), (warm, warm_stats) = timings
+    pairs = len(pieces) ** 2 * len(rotations)
+    print(f"   parejas consultadas: {pairs} ({cold_stats['computed']} NFPs distintos)")
+    print(f"   primera ejecución:   {cold * 1000:9.1f} ms")
+    print(f"   con caché en disco:  {warm * 1000:9.1f} ms ({warm_stats['computed']} calculados, "
+          f"{cold / warm:.0f}x)")
+
+
+def main():
+    """Función principal de benchmarks"""
+    benchmark_excel_parser()
+    benchmark_model_memory()
+    benchmark_piece_transforms()
+    benchmark_garment_flyweight()
+    benchmark_piece_simplification()
+    benchmark_grouping_cache()
+    benchmark_grouping_portfolio()
+    benchmark_nesting()
+    benchmark_nfp_cache()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,10 @@ DATA_DIR = BASE_DIR / "data"
 TEMPLATES_DIR = DATA_DIR / "templates"
 OUTPUT_DIR = DATA_DIR / "output"
 LOGS_DIR = DATA_DIR / "logs"
+CACHE_DIR = DATA_DIR / "cache"
 
 # Crear directorios si no existen
-for directory in [DATA_DIR, TEMPLATES_DIR, OUTPUT_DIR, LOGS_DIR]:
+for directory in [DATA_DIR, TEMPLATES_DIR, OUTPUT_DIR, LOGS_DIR, CACHE_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
 # Tallas válidas
@@ -41,9 +42,19 @@ NESTING_CONFIG = {
     "allowed_rotations": [0, 90, 180, 270],  # rotaciones permitidas en grados
     "spacing": 10,  # espacio mínimo entre piezas en mm
     "max_pieces_per_file": 50,  # máximo de prendas por archivo
+    "resolution_mm": 2.0,  # ancho de columna del horizonte del nesting
     "optimization_level": "medium"  # low, medium, high
 }
 
+# Configuración de extracción de patrones PDF
+PDF_CONFIG = {
+    "curve_tolerance_mm": 0.1,  # error cordal máximo al aproximar curvas por rectas
+    "join_tolerance_mm": 0.05,  # distancia máxima para unir extremos de segmentos
+    "simplify_tolerance_mm": 0.5,  # simplificación (hacia fuera) del contorno para nesting; 0 = desactivada
+    "label_region": 0.25,  # fracción superior de la página donde se busca el nombre de la pieza
+    "shape_quantum_mm": 0.01  # resolución para detectar piezas duplicadas o simétricas
+}
+
 # Configuración de texto (nombres y números)
 TEXT_CONFIG = {
     "font_name": "Arial",
@@ -70,8 +81,26 @@ LOGGING_CONFIG = {
 
 # Límites de optimización
 OPTIMIZATION_LIMITS = {
-    "min_group_size": 2,  # mínimo de tallas en un grupo
-    "max_group_size": 4,  # máximo de tallas en un grupo
+    "min_group_size": 2,  # mínimo de prendas por archivo (se rellena con la talla de más cantidad)
+    "max_group_size": 4,  # máximo de prendas por archivo (tallas distintas o repetidas, p. ej. M+M+L)
     "max_file_size_mb": 50,  # tamaño máximo del archivo en MB
-    "target_efficiency": 0.75  # eficiencia objetivo del nesting (75%)
-}
\ No newline at end of file
+    "target_efficiency": 0.75,  # eficiencia objetivo del nesting (75%)
+    "time_budget_s": 5.0,  # tiempo máximo de búsqueda de la agrupación de tallas
+    "portfolio_strategies": ["greedy", "branch_and_bound", "dp", "local_search"],  # estrategias en paralelo
+    "portfolio_dp_max_sizes": 16  # la DP por subconjuntos (hasta 2^n estados) solo se lanza con estas tallas o menos
+}
+
+# Configuración de cachés en disco
+CACHE_CONFIG = {
+    "orders_dir": CACHE_DIR / "orders",  # pedidos ya parseados
+    "orders_max_size_mb": 64,  # tamaño máximo de la caché de pedidos
+    "patterns_dir": CACHE_DIR / "patterns",  # geometría extraída de los PDFs
+    "plans_path": CACHE_DIR / "grouping_plans.sqlite",  # planes de agrupación de tallas
+    "nfp_path": CACHE_DIR / "nfp.sqlite",  # no-fit polygons entre formas canónicas
+    "nfp_memory_entries": 4096  # NFPs que se mantienen en memoria (LRU)
+}
+
+# Catálogo de patrones con métricas precalculadas por pieza
+CATALOG_CONFIG = {
+    "path": DATA_DIR / "pattern_catalog.sqlite"
+}
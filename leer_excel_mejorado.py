@@ -1,12 +1,33 @@
 """
 Script para leer el Excel de equipaciones y convertirlo a objetos Player y Order
 """
+import hashlib
 import pandas as pd
 from pathlib import Path
+from typing import Dict, List
 from models.player import Player
 from models.order import Order
 
 
+def leer_hoja_equipaciones(excel_path):
+    """
+    Lee la hoja 'Equipaciones' del Excel interactivo
+    
+    Args:
+        excel_path: Ruta al archivo Excel
+        
+    Returns:
+        DataFrame con las columnas de nombre, número y talla
+    """
+    return pd.read_excel(
+        excel_path,
+        sheet_name='Equipaciones',
+        usecols=[0, 1, 2],  # Ajustar columnas según tu Excel
+        skiprows=4,          # Ajustar filas a saltar según tu Excel
+        header=None
+    )
+
+
 def dividir_por_equipos(df):
     """
     Divide el DataFrame en equipos según los encabezados 'Equipo:'
@@ -138,6 +159,138 @@ def convertir_equipos_a_order(equipos_data, nombre_pedido="Pedido Equipaciones")
     return order
 
 
+def localizar_bloques_equipo(df):
+    """
+    Localiza los bloques 'Equipo:' sin limpiar ni convertir sus datos
+    
+    Args:
+        df: DataFrame con todos los datos
+        
+    Returns:
+        Lista de diccionarios con clave, nombre, patrocinador y filas
+        (inicio, fin) de cada bloque, incluida la fila 'Equipo:'
+    """
+    primera_columna = df.iloc[:, 0].astype(str)
+    cabeceras = [int(i) for i in (primera_columna.str.startswith('Equipo:')).to_numpy().nonzero()[0]]
+    
+    bloques = []
+    vistos: Dict[str, int] = {}
+    for n, inicio in enumerate(cabeceras):
+        fin = cabeceras[n + 1] if n + 1 < len(cabeceras) else len(df)
+        nombre = primera_columna.iloc[inicio].replace('Equipo:', '').strip()
+        patrocinador = str(df.iloc[inicio, 1]).replace('Patrocinador:', '').strip()
+        
+        # Clave única aunque dos equipos se llamen igual
+        vistos[nombre] = vistos.get(nombre, 0) + 1
+        clave = nombre if vistos[nombre] == 1 else f"{nombre}#{vistos[nombre]}"
+        
+        bloques.append({
+            'clave': clave,
+            'nombre': nombre,
+            'patrocinador': patrocinador,
+            'inicio': inicio,
+            'fin': fin
+        })
+    
+    return bloques
+
+
+def huella_bloque(df, inicio, fin):
+    """
+    Calcula la huella del contenido de un bloque de equipo
+    
+    Args:
+        df: DataFrame con todos los datos
+        inicio: Fila de la cabecera 'Equipo:'
+        fin: Fila siguiente al final del bloque
+        
+    Returns:
+        Hash hexadecimal del bloque
+    """
+    bloque = df.iloc[inicio:fin].dropna(how='all')
+    valores = pd.util.hash_pandas_object(bloque.astype(str), index=False).to_numpy()
+    return hashlib.sha1(valores.tobytes()).hexdigest()
+
+
+class PedidoIncremental:
+    """Mantiene un Order actualizado re-parseando solo los equipos modificados"""
+    
+    def __init__(self, nombre_pedido="Pedido Equipaciones"):
+        """
+        Inicializa el pedido incremental
+        
+        Args:
+            nombre_pedido: Nombre del pedido
+        """
+        self.order = Order(name=nombre_pedido)
+        self.huellas: Dict[str, str] = {}
+        self.jugadores_por_equipo: Dict[str, List[Player]] = {}
+    
+    def actualizar(self, df) -> List[str]:
+        """
+        Sincroniza el pedido con una nueva lectura de la hoja
+        
+        Solo se limpian y convierten los bloques cuya huella ha cambiado; los
+        jugadores de los equipos sin cambios se conservan tal cual.
+        
+        Args:
+            df: DataFrame con todos los datos (ver leer_hoja_equipaciones)
+            
+        Returns:
+            Lista de claves de equipos añadidos, modificados o eliminados
+        """
+        bloques = localizar_bloques_equipo(df)
+        claves_actuales = [b['clave'] for b in bloques]
+        
+        cambiados = []
+        equipos_a_convertir = []
+        for bloque in bloques:
+            huella = huella_bloque(df, bloque['inicio'], bloque['fin'])
+            if self.huellas.get(bloque['clave']) == huella:
+                continue
+            
+            self.huellas[bloque['clave']] = huella
+            cambiados.append(bloque['clave'])
+            equipos_a_convertir.append({
+                'clave': bloque['clave'],
+                'nombre': bloque['nombre'],
+                'patrocinador': bloque['patrocinador'],
+                'datos': limpiar_equipo(df.iloc[bloque['inicio'] + 1:bloque['fin']].copy())
+            })
+        
+        # Equipos que ya no están en la hoja
+        for clave in list(self.huellas):
+            if clave not in claves_actuales:
+                del self.huellas[clave]
+                self._parchear_equipo(clave, [])
+                cambiados.append(clave)
+        
+        for equipo in equipos_a_convertir:
+            parcial = convertir_equipos_a_order([equipo])
+            self._parchear_equipo(equipo['clave'], parcial.players)
+        
+        return cambiados
+    
+    def _parchear_equipo(self, clave: str, jugadores: List[Player]):
+        """
+        Sustituye en el Order los jugadores de un equipo
+        
+        Se usan remove_player/add_player, así que los índices del pedido se
+        actualizan en el sitio sin recorrer los demás equipos. Los jugadores
+        del equipo sustituido pasan al final de la lista.
+        
+        Args:
+            clave: Clave del equipo
+            jugadores: Nuevos jugadores del equipo (vacío si se ha eliminado)
+        """
+        for player in self.jugadores_por_equipo.pop(clave, []):
+            self.order.remove_player(player)
+        for player in jugadores:
+            self.order.add_player(player)
+        if jugadores:
+            self.jugadores_por_equipo[clave] = jugadores
+
+
 def mostrar_resumen_pedido(order: Order):
     """
     Muestra por pantalla un resumen completo del pedido
@@ -245,14 +398,8 @@ def main():
     
     print("📂 Leyendo archivo Excel...")
     
-    # Leer Excel (ajustar parámetros según tu archivo)
-    df = pd.read_excel(
-        excel_path,
-        sheet_name='Equipaciones',
-        usecols=[0, 1, 2],  # Ajustar columnas según tu Excel
-        skiprows=4,          # Ajustar filas a saltar según tu Excel
-        header=None
-    )
+    # Leer Excel (ajustar parámetros en leer_hoja_equipaciones)
+    df = leer_hoja_equipaciones(excel_path)
     
     print("✅ Archivo leído correctamente")
     
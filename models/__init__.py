@@ -5,5 +5,9 @@ from .player import Player
 from .piece import Piece
 from .garment import Garment
 from .order import Order
+from .columnar_order import ColumnarOrder
+from .size_group import SizeGroup, GroupingPlan
+from .nesting_result import PlacedPiece, NestingResult
 
-__all__ = ['Player', 'Piece', 'Garment', 'Order']
\ No newline at end of file
+__all__ = ['Player', 'Piece', 'Garment', 'Order', 'ColumnarOrder', 'SizeGroup', 'GroupingPlan',
+           'PlacedPiece', 'NestingResult']
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Representación columnar de pedidos para análisis masivo
+"""
+from typing import List, Dict, Optional, Iterable
+import numpy as np
+import pandas as pd
+from .player import Player
+from .order import Order
+
+# Columnas de la tabla de jugadores
+COLUMNS = ["name", "number", "size", "sponsor", "team"]
+
+NO_SPONSOR = "SIN PATROCINADOR"
+
+
+def _categorical(values) -> pd.Categorical:
+    """Codifica valores como categóricos en orden de primera aparición"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    return pd.Categorical.from_codes(codes, categories=pd.Index(uniques, dtype=object))
+
+
+class ColumnarOrder:
+    """
+    Pedido almacenado por columnas (talla, patrocinador y equipo categóricos)
+
+    Expone la misma interfaz de consulta que Order pero resuelve los
+    resúmenes con agrupaciones vectorizadas. Los objetos Player solo se crean
+    cuando se piden.
+    """
+
+    def __init__(self, name: str = "", data: Optional[pd.DataFrame] = None):
+        """
+        Inicializa el pedido columnar
+
+        Args:
+            name: Nombre del pedido
+            data: DataFrame con las columnas name, number, size, sponsor, team
+        """
+        self.name = name
+        if data is None:
+            data = pd.DataFrame({column: [] for column in COLUMNS})
+
+        self.data = pd.DataFrame({
+            # object explícito: evita que None se convierta en NaN
+            "name": pd.Series(data["name"].to_numpy(dtype=object), dtype=object),
+            "number": pd.Series(data["number"].to_numpy(dtype=object), dtype=object),
+            "size": _categorical(data["size"]),
+            "sponsor": _categorical(data["sponsor"]),
+            "team": _categorical(data["team"])
+        })
+        self._players: List[Optional[Player]] = [None] * len(self.data)
+
+    @classmethod
+    def from_players(cls, players: Iterable[Player], name: str = "") -> "ColumnarOrder":
+        """
+        Crea un pedido columnar a partir de jugadores
+
+        Args:
+            players: Jugadores
+            name: Nombre del pedido
+
+        Returns:
+            ColumnarOrder
+        """
+        records = [(p.name, p.number, p.size, p.sponsor, p.team) for p in players]
+        columns = zip(*records) if records else [()] * len(COLUMNS)
+        data = pd.DataFrame({
+            column: pd.Series(values, dtype=object)
+            for column, values in zip(COLUMNS, columns)
+        })
+        return cls(name=name, data=data)
+
+    @classmethod
+    def from_order(cls, order: Order) -> "ColumnarOrder":
+        """Crea un pedido columnar a partir de un Order"""
+        return cls.from_players(order.players, name=order.name)
+
+    def to_order(self) -> Order:
+        """Convierte el pedido a un Order con objetos Player"""
+        order = Order(name=self.name)
+        for player in self.players:
+            order.add_player(player)
+        return order
+
+    def _player_at(self, row: int) -> Player:
+        """Materializa (y recuerda) el jugador de una fila"""
+        player = self._players[row]
+        if player is None:
+            data = self.data
+            player = Player(
+                name=data["name"].iat[row],
+                number=data["number"].iat[row],
+                size=data["size"].iat[row],
+                sponsor=data["sponsor"].iat[row],
+                team=data["team"].iat[row]
+            )
+            self._players[row] = player
+        return player
+
+    def _players_where(self, mask: np.ndarray) -> List[Player]:
+        """Materializa los jugadores de las filas seleccionadas"""
+        return [self._player_at(int(row)) for row in np.flatnonzero(mask)]
+
+    @property
+    def players(self) -> List[Player]:
+        """Todos los jugadores (se materializan en el primer acceso)"""
+        return self._players_where(np.ones(len(self.data), dtype=bool))
+
+    def _counts(self, column: pd.Categorical) -> Dict[str, int]:
+        """Cuenta filas por categoría, en orden de primera aparición"""
+        counts = np.bincount(column.codes, minlength=len(column.categories))
+        return {category: int(count)
+                for category, count in zip(column.categories, counts) if count}
+
+    def get_size_summary(self) -> Dict[str, int]:
+        """
+        Obtiene resumen de cantidades por talla
+
+        Returns:
+            dict: {talla: cantidad}
+        """
+        return self._counts(self.data["size"].array)
+
+    def get_sponsor_summary(self) -> Dict[str, int]:
+        """
+        Obtiene resumen de cantidades por patrocinador
+
+        Returns:
+            dict: {patrocinador: cantidad}
+        """
+        summary: Dict[str, int] = {}
+        for sponsor, count in self._counts(self.data["sponsor"].array).items():
+            key = sponsor or NO_SPONSOR
+            summary[key] = summary.get(key, 0) + count
+        return summary
+
+    def get_players_by_size(self, size: str) -> List[Player]:
+        """
+        Obtiene todos los jugadores de una talla específica
+
+        Args:
+            size: Talla a buscar
+
+        Returns:
+            Lista de jugadores
+        """
+        return self._players_where((self.data["size"] == size).to_numpy())
+
+    def get_players_by_sponsor(self, sponsor: str) -> List[Player]:
+        """
+        Obtiene todos los jugadores de un patrocinador
+
+        Args:
+            sponsor: Nombre del patrocinador
+
+        Returns:
+            Lista de jugadores
+        """
+        return self._players_where((self.data["sponsor"] == sponsor).to_numpy())
+
+    def get_players_by_team(self, team: str) -> List[Player]:
+        """
+        Obtiene todos los jugadores de un equipo
+
+        Args:
+            team: Nombre del equipo
+
+        Returns:
+            Lista de jugadores
+        """
+        return self._players_where((self.data["team"] == team).to_numpy())
+
+    def get_total_players(self) -> int:
+        """Obtiene el total de jugadores"""
+        return len(self.data)
+
+    def get_available_sizes(self) -> List[str]:
+        """Obtiene lista de tallas disponibles en el pedido"""
+        return sorted(self.get_size_summary())
+
+    def validate_duplicate_numbers(self) -> tuple[bool, List[str]]:
+        """
+        Verifica si hay números duplicados por equipo/patrocinador
+
+        Returns:
+            tuple: (hay_duplicados, lista_de_duplicados)
+        """
+        numbers = self.data["number"]
+        rows = np.flatnonzero((numbers.notna() & (numbers != "")).to_numpy())
+        if len(rows) == 0:
+            return False, []
+
+        # Claves enteras (patrocinador, número); los códigos de factorize
+        # siguen el orden de primera aparición, como el recorrido de Order
+        sponsors = self.data["sponsor"].to_numpy(dtype=object)[rows]
+        sponsors[sponsors == ""] = NO_SPONSOR
+        sponsor_codes, sponsor_names = pd.factorize(sponsors)
+        number_codes, number_values = pd.factorize(numbers.to_numpy(dtype=object)[rows])
+        keys = sponsor_codes.astype(np.int64) * len(number_values) + number_codes
+
+        _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        first_row = first_index[inverse]
+        repeated = np.flatnonzero(first_row != np.arange(len(rows)))
+        repeated = repeated[np.argsort(sponsor_codes[repeated], kind="stable")]
+
+        names = self.data["name"].to_numpy(dtype=object)[rows]
+        duplicates = [
+            f"{sponsor_names[sponsor_codes[i]]}: número {number_values[number_codes[i]]} "
+            f"duplicado ({names[first_row[i]]} y {names[i]})"
+            for i in repeated
+        ]
+        return len(duplicates) > 0, duplicates
+
+    def get_statistics(self) -> Dict[str, any]:
+        """
+        Obtiene estadísticas del pedido
+
+        Returns:
+            dict con estadísticas
+        """
+        return {
+            "total_players": self.get_total_players(),
+            "size_summary": self.get_size_summary(),
+            "sponsor_summary": self.get_sponsor_summary(),
+            "available_sizes": self.get_available_sizes(),
+            "total_garments": 0
+        }
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"ColumnarOrder(name='{self.name}', players={len(self.data)})"
@@ -4,9 +4,9 @@ Modelo de datos para prenda completa
 from dataclasses import dataclass, field
 from typing import List, Optional
 from models.piece import Piece
-from models.player import Player
+from models.player import Player, intern_size
 
-@dataclass
+@dataclass(slots=True)
 class Garment:
     """Representa una prenda completa (conjunto de piezas)"""
     
@@ -14,12 +14,36 @@ class Garment:
     pieces: List[Piece] = field(default_factory=list)
     player: Optional[Player] = None
     
+    def __post_init__(self):
+        """Comparte la instancia de la talla"""
+        self.size = intern_size(self.size)
+    
     def add_piece(self, piece: Piece):
         """Añade una pieza a la prenda"""
         if piece.size != self.size:
             raise ValueError(f"La talla de la pieza ({piece.size}) no coincide con la prenda ({self.size})")
         self.pieces.append(piece)
     
+    def instantiate(self, player: Optional[Player] = None) -> "Garment":
+        """
+        Crea una prenda para un jugador compartiendo la geometría del patrón
+        
+        Las piezas nuevas solo guardan su transformación (ver Piece.instance),
+        por lo que la memoria crece con el número de tallas y no con el de
+        jugadores.
+        
+        Args:
+            player: Jugador asignado a la prenda
+            
+        Returns:
+            Nueva Garment
+        """
+        return Garment(
+            size=self.size,
+            pieces=[piece.instance() for piece in self.pieces],
+            player=player
+        )
+    
     def get_piece_by_name(self, name: str) -> Optional[Piece]:
         """
         Obtiene una pieza por su nombre
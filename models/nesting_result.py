@@ -0,0 +1,43 @@
+"""
+Modelo de datos para el resultado del nesting en el rollo
+"""
+from dataclasses import dataclass, field
+from typing import List
+from models.piece import Piece
+
+@dataclass(slots=True)
+class PlacedPiece:
+    """Pieza colocada en el rollo"""
+
+    piece: Piece  # Pieza ya transformada a su posición en el rollo
+    garment: int  # Índice de la prenda a la que pertenece
+    rotation: float  # Giro aplicado en grados
+    x: float  # Esquina inferior izquierda de la geometría de colocación (mm)
+    y: float
+
+
+@dataclass(slots=True)
+class NestingResult:
+    """Colocación de un grupo de prendas en el rollo"""
+
+    placements: List[PlacedPiece] = field(default_factory=list)
+    roll_width: float = 0.0  # Ancho del rollo en mm
+    length: float = 0.0  # Longitud de rollo consumida en mm (con márgenes)
+    piece_area: float = 0.0  # Área de las piezas colocadas en mm²
+    unplaced: List[Piece] = field(default_factory=list)  # Piezas que no caben en el ancho
+    target_efficiency: float = 0.0  # Eficiencia objetivo
+    elapsed: float = 0.0  # Tiempo de cálculo en segundos
+
+    @property
+    def efficiency(self) -> float:
+        """Fracción del tejido consumido que ocupan las piezas"""
+        used = self.roll_width * self.length
+        return self.piece_area / used if used else 0.0
+
+    def meets_target(self) -> bool:
+        """Verifica que todas las piezas caben y se alcanza la eficiencia objetivo"""
+        return not self.unplaced and self.efficiency >= self.target_efficiency
+
+    def __repr__(self):
+        return (f"NestingResult(pieces={len(self.placements)}, length={self.length:.0f}mm, "
+                f"efficiency={self.efficiency:.1%}, target={self.target_efficiency:.0%})")
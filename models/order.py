@@ -3,11 +3,25 @@ Modelo de datos para pedido completo
 """
 from dataclasses import dataclass, field
 from typing import List, Dict
-from collections import defaultdict
+from collections import defaultdict, Counter
 from .player import Player
 from .garment import Garment
 
-@dataclass
+
+def _position(players: List[Player], player: Player) -> int:
+    """
+    Posición de un jugador por identidad (dos jugadores pueden ser iguales)
+    
+    Raises:
+        ValueError: Si el jugador no está en la lista
+    """
+    for i, candidate in enumerate(players):
+        if candidate is player:
+            return i
+    raise ValueError(f"{player!r} no pertenece al pedido")
+
+
+@dataclass(slots=True)
 class Order:
     """Representa un pedido completo de equipaciones"""
     
@@ -15,9 +29,73 @@ class Order:
     players: List[Player] = field(default_factory=list)
     garments: List[Garment] = field(default_factory=list)
     
+    # Índices y contadores mantenidos por add_player/remove_player
+    _by_size: Dict[str, List[Player]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_sponsor: Dict[str, List[Player]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_team: Dict[str, List[Player]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _size_counts: Counter = field(default_factory=Counter, init=False, repr=False, compare=False)
+    _sponsor_counts: Counter = field(default_factory=Counter, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Construye los índices de los jugadores iniciales"""
+        self.rebuild_indexes()
+    
+    def rebuild_indexes(self):
+        """
+        Reconstruye los índices desde cero
+        
+        Necesario solo si se modifica la lista players directamente en
+        lugar de usar add_player/remove_player.
+        """
+        self._by_size = {}
+        self._by_sponsor = {}
+        self._by_team = {}
+        self._size_counts = Counter()
+        self._sponsor_counts = Counter()
+        for player in self.players:
+            self._index_player(player)
+    
+    def _index_player(self, player: Player):
+        """Registra un jugador en los índices"""
+        self._by_size.setdefault(player.size, []).append(player)
+        self._by_sponsor.setdefault(player.sponsor, []).append(player)
+        self._by_team.setdefault(player.team, []).append(player)
+        self._size_counts[player.size] += 1
+        self._sponsor_counts[player.sponsor or "SIN PATROCINADOR"] += 1
+    
+    def _unindex_player(self, player: Player):
+        """Elimina un jugador de los índices"""
+        for index, key in ((self._by_size, player.size),
+                           (self._by_sponsor, player.sponsor),
+                           (self._by_team, player.team)):
+            bucket = index[key]
+            del bucket[_position(bucket, player)]
+            if not bucket:
+                del index[key]
+        
+        for counts, key in ((self._size_counts, player.size),
+                            (self._sponsor_counts, player.sponsor or "SIN PATROCINADOR")):
+            counts[key] -= 1
+            if counts[key] == 0:
+                del counts[key]
+    
     def add_player(self, player: Player):
         """Añade un jugador al pedido"""
         self.players.append(player)
+        self._index_player(player)
+    
+    def remove_player(self, player: Player):
+        """
+        Elimina un jugador del pedido
+        
+        Args:
+            player: Jugador a eliminar
+            
+        Raises:
+            ValueError: Si el jugador no pertenece al pedido
+        """
+        del self.players[_position(self.players, player)]
+        self._unindex_player(player)
     
     def add_garment(self, garment: Garment):
         """Añade una prenda al pedido"""
@@ -30,10 +108,7 @@ class Order:
         Returns:
             dict: {talla: cantidad}
         """
-        summary = defaultdict(int)
-        for player in self.players:
-            summary[player.size] += 1
-        return dict(summary)
+        return dict(self._size_counts)
     
     def get_sponsor_summary(self) -> Dict[str, int]:
         """
@@ -42,11 +117,7 @@ class Order:
         Returns:
             dict: {patrocinador: cantidad}
         """
-        summary = defaultdict(int)
-        for player in self.players:
-            sponsor = player.sponsor or "SIN PATROCINADOR"
-            summary[sponsor] += 1
-        return dict(summary)
+        return dict(self._sponsor_counts)
     
     def get_players_by_size(self, size: str) -> List[Player]:
         """
@@ -58,7 +129,7 @@ class Order:
         Returns:
             Lista de jugadores
         """
-        return [p for p in self.players if p.size == size]
+        return list(self._by_size.get(size, []))
     
     def get_players_by_sponsor(self, sponsor: str) -> List[Player]:
         """
@@ -70,7 +141,19 @@ class Order:
         Returns:
             Lista de jugadores
         """
-        return [p for p in self.players if p.sponsor == sponsor]
+        return list(self._by_sponsor.get(sponsor, []))
+    
+    def get_players_by_team(self, team: str) -> List[Player]:
+        """
+        Obtiene todos los jugadores de un equipo
+        
+        Args:
+            team: Nombre del equipo
+            
+        Returns:
+            Lista de jugadores
+        """
+        return list(self._by_team.get(team, []))
     
     def get_total_players(self) -> int:
         """Obtiene el total de jugadores"""
@@ -78,7 +161,7 @@ class Order:
     
     def get_available_sizes(self) -> List[str]:
         """Obtiene lista de tallas disponibles en el pedido"""
-        return sorted(list(set(p.size for p in self.players)))
+        return sorted(self._size_counts)
     
     def validate_duplicate_numbers(self) -> tuple[bool, List[str]]:
         """
@@ -2,20 +2,69 @@
 Modelo de datos para pieza de prenda
 """
 from dataclasses import dataclass, field
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Union
 import numpy as np
+from models.player import intern_size, intern_text
+from utils.geometry import simplify_polygon
 
-@dataclass
+# Precisiones admitidas para la geometría
+VERTEX_DTYPES = (np.float64, np.float32)
+
+
+def as_vertex_array(vertices, dtype=None) -> np.ndarray:
+    """
+    Convierte vértices a un array contiguo (N, 2)
+    
+    Args:
+        vertices: Lista de tuplas (x, y) o array
+        dtype: np.float64 (por defecto) o np.float32; si es None se conserva
+            la precisión de un array ya float32/float64
+            
+    Returns:
+        Array (N, 2) en C-order; un array modificable del llamador se copia,
+        así que el resultado nunca es un alias suyo
+    """
+    if dtype is None:
+        dtype = vertices.dtype.type if isinstance(vertices, np.ndarray) and \
+            vertices.dtype.type in VERTEX_DTYPES else np.float64
+    array = np.ascontiguousarray(np.asarray(vertices, dtype=dtype).reshape(-1, 2))
+    if isinstance(vertices, np.ndarray) and vertices.flags.writeable and np.may_share_memory(array, vertices):
+        array = array.copy()
+    return array
+
+
+def rotation_matrix(angle: float) -> np.ndarray:
+    """
+    Matriz de rotación 2x2 (exacta para múltiplos de 90°)
+    
+    Args:
+        angle: Ángulo en grados
+        
+    Returns:
+        Matriz 2x2
+    """
+    quarter = angle % 360
+    if quarter % 90 == 0:
+        cos_a, sin_a = {0: (1.0, 0.0), 90: (0.0, 1.0), 180: (-1.0, 0.0), 270: (0.0, -1.0)}[int(quarter)]
+    else:
+        angle_rad = np.radians(angle)
+        cos_a, sin_a = np.cos(angle_rad), np.sin(angle_rad)
+    return np.array([[cos_a, -sin_a], [sin_a, cos_a]])
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Marca un array como de solo lectura y lo devuelve"""
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(slots=True, init=False)
 class Piece:
     """Representa una pieza vectorial de una prenda (delantero, manga, etc.)"""
     
     name: str  # DELANTERO, POSTERIOR, @MANGA DER, etc.
     size: str  # S, M, L, XL, etc.
     svg_path: str = ""  # Path SVG de la pieza
-    width: float = 0.0  # Ancho en mm
-    height: float = 0.0  # Alto en mm
     area: float = 0.0  # Área en mm²
-    vertices: List[Tuple[float, float]] = field(default_factory=list)  # Vértices del polígono
     
     # Transformaciones
     rotation: float = 0.0  # Rotación en grados
@@ -24,11 +73,262 @@ class Piece:
     # Metadata
     pdf_page: Optional[int] = None  # Página del PDF de origen
     normalized_name: Optional[str] = None  # Nombre normalizado
+    marks: List[np.ndarray] = field(default_factory=list, repr=False)  # Marcas internas (piquetes, hilo)
+    shape_key: Optional[str] = field(default=None, init=False, repr=False)  # Clave de forma canónica (la fija share_shape)
+    
+    # Ancho y alto en mm (propiedades width/height); tras rotate/transform se
+    # recalculan desde la caja delimitadora la próxima vez que se piden
+    _width: float = field(default=0.0, init=False, repr=False, compare=False)
+    _height: float = field(default=0.0, init=False, repr=False, compare=False)
+    _size_stale: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    # Geometría de origen (inmutable) y transformación afín acumulada
+    _source: np.ndarray = field(default=None, init=False, repr=False, compare=False)
+    _source_bbox: Optional[Tuple[float, float, float, float]] = field(default=None, init=False, repr=False, compare=False)
+    _matrix: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)  # None = identidad
+    _placement: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)  # None = _source
+    _base: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)  # canónica -> pieza
+    
+    # Cachés que se invalidan al cambiar la transformación
+    _vertices: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _bbox: Optional[Tuple[float, float, float, float]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __init__(self, name: str, size: str, svg_path: str = "", width: float = 0.0,
+                 height: float = 0.0, area: float = 0.0,
+                 vertices: Optional[Union[np.ndarray, List[Tuple[float, float]]]] = None,
+                 rotation: float = 0.0, position: Tuple[float, float] = (0.0, 0.0),
+                 pdf_page: Optional[int] = None, normalized_name: Optional[str] = None,
+                 marks: Optional[List[np.ndarray]] = None):
+        """
+        Inicializa la pieza
+        
+        Args:
+            name: Nombre de la pieza (DELANTERO, @MANGA DER, etc.)
+            size: Talla
+            svg_path: Path SVG de la pieza
+            width: Ancho en mm
+            height: Alto en mm
+            area: Área en mm²
+            vertices: Vértices (N, 2) como array o lista de tuplas
+            rotation: Rotación en grados
+            position: Posición (x, y) en mm
+            pdf_page: Página del PDF de origen
+            normalized_name: Nombre normalizado (se deduce del nombre si es None)
+            marks: Marcas internas (piquetes, hilo)
+        """
+        self.name = intern_text(name)
+        self.size = intern_size(size)
+        self.svg_path = svg_path
+        self._width = width
+        self._height = height
+        self._size_stale = False
+        self.area = area
+        self.rotation = rotation
+        self.position = position
+        self.pdf_page = pdf_page
+        self._set_source([] if vertices is None else vertices)
+        self.marks = [_readonly(as_vertex_array(mark, self._source.dtype)) for mark in marks or []]
+        self.normalized_name = self._normalize_name() if normalized_name is None else normalized_name
+    
+    def _set_source(self, vertices, dtype=None):
+        """Fija la geometría de origen y reinicia la transformación"""
+        source = as_vertex_array(vertices, dtype)
+        source.flags.writeable = False
+        self._source = source
+        self._source_bbox = None
+        if len(source):
+            min_x, min_y = source.min(axis=0).tolist()
+            max_x, max_y = source.max(axis=0).tolist()
+            self._source_bbox = (min_x, min_y, max_x, max_y)
+        self._matrix = None
+        self._placement = None
+        self._base = None
+        self.shape_key = None
+        self._vertices = source
+        self._bbox = self._source_bbox
+    
+    @property
+    def vertices(self) -> np.ndarray:
+        """Vértices transformados (N, 2), calculados al pedirlos y cacheados (solo lectura)"""
+        if self._vertices is None:
+            linear = self._matrix[:2, :2].T.astype(self._source.dtype)
+            vertices = self._source @ linear
+            vertices += self._matrix[:2, 2].astype(self._source.dtype)
+            vertices.flags.writeable = False
+            self._vertices = vertices
+        return self._vertices
+    
+    @vertices.setter
+    def vertices(self, vertices):
+        """Sustituye la geometría; la transformación vuelve a la identidad"""
+        self._set_source(vertices)
+    
+    @property
+    def width(self) -> float:
+        """Ancho en mm"""
+        if self._size_stale:
+            self.calculate_bounding_box()
+        return self._width
+    
+    @width.setter
+    def width(self, width: float):
+        self._width = width
+        self._size_stale = False
+    
+    @property
+    def height(self) -> float:
+        """Alto en mm"""
+        if self._size_stale:
+            self.calculate_bounding_box()
+        return self._height
+    
+    @height.setter
+    def height(self, height: float):
+        self._height = height
+        self._size_stale = False
+    
+    def _from_base(self, points: np.ndarray) -> np.ndarray:
+        """Lleva puntos de la geometría compartida al sistema de la pieza"""
+        if self._base is None:
+            return points
+        return points @ self._base[:2, :2].T + self._base[:2, 2]
+    
+    def _user_matrix(self) -> Optional[np.ndarray]:
+        """Transformación aplicada a la pieza, sin la de su forma canónica"""
+        if self._base is None or self._matrix is None:
+            return self._matrix
+        return self._matrix @ np.linalg.inv(self._base)
+    
+    @property
+    def source_vertices(self) -> np.ndarray:
+        """Geometría original, sin transformar (solo lectura)"""
+        return self._from_base(self._source)
+    
+    @property
+    def placement_source(self) -> np.ndarray:
+        """Geometría simplificada para el nesting, sin transformar (solo lectura)"""
+        return self._from_base(self._source if self._placement is None else self._placement)
+    
+    @property
+    def placement_vertices(self) -> np.ndarray:
+        """Geometría simplificada para el nesting con la transformación actual"""
+        if self._placement is None:
+            return self.vertices
+        if self._matrix is None:
+            return self._placement
+        return self._placement @ self._matrix[:2, :2].T + self._matrix[:2, 2]
+    
+    @property
+    def placement_key(self) -> tuple:
+        """Identifica la geometría de colocación sin transformar (misma clave = mismos vértices)"""
+        base = None if self._base is None else self._base.tobytes()
+        return self.shape_key or id(self._source), base, id(self._placement)
+    
+    @property
+    def placement_frame(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Geometría de colocación en su sistema propio y matriz 3x3 que la lleva a su posición
+        
+        Con forma compartida el sistema propio es el canónico, común a todas
+        las piezas con la misma shape_key.
+        """
+        geometry = self._source if self._placement is None else self._placement
+        return geometry, np.eye(3) if self._matrix is None else self._matrix
+    
+    @property
+    def vertex_reduction(self) -> float:
+        """Fracción de vértices eliminados por la simplificación (0 = ninguno)"""
+        if self._placement is None or len(self._source) == 0:
+            return 0.0
+        return 1.0 - len(self._placement) / len(self._source)
+    
+    def simplify(self, tolerance: float, outward: bool = True) -> float:
+        """
+        Calcula la geometría simplificada que se usa para colocar la pieza
+        
+        La geometría original se conserva intacta para la exportación. Con
+        outward=True la geometría simplificada envuelve a la original, así
+        que una colocación sin solapes sigue siéndolo con las piezas reales.
+        
+        Args:
+            tolerance: Distancia máxima en mm entre ambos contornos
+            outward: Garantizar que la pieza simplificada no encoge
+            
+        Returns:
+            Fracción de vértices eliminados
+        """
+        # Se simplifica _source, que con forma compartida ya está en el
+        # sistema canónico: el resultado se guarda tal cual, sin deshacer _base
+        simplified = simplify_polygon(self._source, tolerance, outward)
+        if len(simplified) < len(self._source):
+            self._placement = _readonly(as_vertex_array(simplified, self._source.dtype))
+        else:
+            self._placement = None
+        return self.vertex_reduction
+    
+    def set_placement_geometry(self, vertices):
+        """
+        Fija la geometría de colocación (en coordenadas de origen)
+        
+        Args:
+            vertices: Array (M, 2) o None para usar la geometría original
+        """
+        if vertices is None:
+            self._placement = None
+            return
+        placement = as_vertex_array(vertices, self._source.dtype)
+        if self._base is not None:
+            inverse = np.linalg.inv(self._base)
+            placement = (placement @ inverse[:2, :2].T + inverse[:2, 2]).astype(self._source.dtype)
+        self._placement = _readonly(placement)
     
-    def __post_init__(self):
-        """Inicialización adicional"""
-        if self.normalized_name is None:
-            self.normalized_name = self._normalize_name()
+    def share_shape(self, key: str, geometry: np.ndarray, base: np.ndarray,
+                    placement: Optional[np.ndarray] = None):
+        """
+        Sustituye la geometría por una forma canónica compartida
+        
+        La pieza pasa a ser base · geometry (un giro de 90° y/o un espejo más
+        una traslación), con su transformación actual encima. Piezas
+        duplicadas o simétricas (manga derecha/izquierda) apuntan así al
+        mismo array.
+        
+        Args:
+            key: Clave de la forma canónica
+            geometry: Geometría canónica (N, 2) de solo lectura
+            base: Matriz 3x3 que lleva la geometría canónica a esta pieza
+            placement: Geometría simplificada en el sistema canónico (opcional)
+        """
+        user = self._user_matrix()
+        self._source = geometry
+        min_x, min_y = geometry.min(axis=0).tolist()
+        max_x, max_y = geometry.max(axis=0).tolist()
+        self._source_bbox = (min_x, min_y, max_x, max_y)
+        self._base = base
+        self._placement = placement
+        self._matrix = base if user is None else user @ base
+        self._vertices = None
+        self._bbox = None
+        self.shape_key = key
+    
+    @property
+    def transform_matrix(self) -> np.ndarray:
+        """Transformación afín 3x3 acumulada"""
+        user = self._user_matrix()
+        return np.eye(3) if user is None else user.copy()
+    
+    def get_marks(self) -> List[np.ndarray]:
+        """
+        Obtiene las marcas internas con la transformación actual aplicada
+        
+        Returns:
+            Lista de arrays (M_i, 2)
+        """
+        user = self._user_matrix()
+        if user is None:
+            return self.marks
+        linear = user[:2, :2].T
+        offset = user[:2, 2]
+        return [mark @ linear + offset for mark in self.marks]
     
     def _normalize_name(self) -> str:
         """Normaliza el nombre de la pieza"""
@@ -46,18 +346,42 @@ class Piece:
         Calcula el área de la pieza usando la fórmula del área de polígono
         (Shoelace formula)
         """
-        if not self.vertices or len(self.vertices) < 3:
+        if len(self._source) < 3:
             return self.width * self.height
         
-        vertices = np.array(self.vertices)
-        x = vertices[:, 0]
-        y = vertices[:, 1]
+        # El área de origen escalada por el determinante de la transformación
+        x = self._source[:, 0]
+        y = self._source[:, 1]
         
         # Fórmula de Shoelace
-        area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+        area = 0.5 * abs(float(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1))))
+        if self._matrix is not None:
+            area *= abs(float(np.linalg.det(self._matrix[:2, :2])))
         self.area = area
         return area
     
+    def _is_axis_aligned(self) -> bool:
+        """Indica si la transformación lleva ejes a ejes (giros de 90°, espejos, escalas)"""
+        if self._matrix is None:
+            return True
+        linear = self._matrix[:2, :2]
+        return (linear[0, 1] == 0 and linear[1, 0] == 0) or (linear[0, 0] == 0 and linear[1, 1] == 0)
+    
+    def _world_bbox(self) -> Tuple[float, float, float, float]:
+        """Caja delimitadora transformada, en O(1) si la transformación es alineada a ejes"""
+        if self._bbox is None:
+            if self._is_axis_aligned():
+                min_x, min_y, max_x, max_y = self._source_bbox
+                corners = np.array([[min_x, min_y, 1.0], [max_x, max_y, 1.0]]) @ self._matrix.T
+                (x0, y0), (x1, y1) = corners[:, :2].tolist()
+                self._bbox = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            else:
+                vertices = self.vertices
+                min_x, min_y = vertices.min(axis=0).tolist()
+                max_x, max_y = vertices.max(axis=0).tolist()
+                self._bbox = (min_x, min_y, max_x, max_y)
+        return self._bbox
+    
     def calculate_bounding_box(self) -> Tuple[float, float, float, float]:
         """
         Calcula la caja delimitadora de la pieza
@@ -65,41 +389,42 @@ class Piece:
         Returns:
             tuple: (min_x, min_y, max_x, max_y)
         """
-        if not self.vertices:
+        if len(self._source) == 0:
             return (0, 0, self.width, self.height)
         
-        vertices = np.array(self.vertices)
-        min_x, min_y = vertices.min(axis=0)
-        max_x, max_y = vertices.max(axis=0)
+        min_x, min_y, max_x, max_y = self._world_bbox()
         
-        self.width = max_x - min_x
-        self.height = max_y - min_y
+        self._width = max_x - min_x
+        self._height = max_y - min_y
+        self._size_stale = False
         
         return (min_x, min_y, max_x, max_y)
     
+    def _compose(self, matrix: np.ndarray):
+        """Acumula una transformación afín 3x3 e invalida las cachés"""
+        self._matrix = matrix if self._matrix is None else matrix @ self._matrix
+        self._vertices = None
+        self._bbox = None
+    
     def rotate(self, angle: float):
         """
         Rota la pieza un ángulo dado
         
+        Solo acumula la transformación: los vértices, la caja delimitadora y
+        el ancho/alto se calculan al pedirlos (la caja en O(1) con giros
+        múltiplos de 90°).
+        
         Args:
             angle: Ángulo en grados
         """
         self.rotation = (self.rotation + angle) % 360
         
         # Si hay vértices, rotarlos
-        if self.vertices:
-            angle_rad = np.radians(angle)
-            cos_a = np.cos(angle_rad)
-            sin_a = np.sin(angle_rad)
-            
-            rotated = []
-            for x, y in self.vertices:
-                new_x = x * cos_a - y * sin_a
-                new_y = x * sin_a + y * cos_a
-                rotated.append((new_x, new_y))
-            
-            self.vertices = rotated
-            self.calculate_bounding_box()
+        if len(self._source):
+            matrix = np.eye(3)
+            matrix[:2, :2] = rotation_matrix(angle)
+            self._compose(matrix)
+            self._size_stale = True
     
     def translate(self, dx: float, dy: float):
         """
@@ -111,8 +436,110 @@ class Piece:
         """
         self.position = (self.position[0] + dx, self.position[1] + dy)
         
-        if self.vertices:
-            self.vertices = [(x + dx, y + dy) for x, y in self.vertices]
+        if len(self._source):
+            bbox = self._bbox
+            matrix = np.eye(3)
+            matrix[:2, 2] = (dx, dy)
+            self._compose(matrix)
+            if bbox is not None:
+                self._bbox = (bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy)
+    
+    def mirror(self, horizontal: bool = True):
+        """
+        Refleja la pieza sobre su propio eje (p. ej. manga derecha -> izquierda)
+        
+        La caja delimitadora no cambia de posición.
+        
+        Args:
+            horizontal: True refleja en x (eje vertical), False refleja en y
+        """
+        if len(self._source):
+            bbox = self._world_bbox()
+            axis = 0 if horizontal else 1
+            matrix = np.eye(3)
+            matrix[axis, axis] = -1.0
+            matrix[axis, 2] = bbox[axis] + bbox[axis + 2]
+            self._compose(matrix)
+            self._bbox = bbox
+    
+    def transform(self, matrix: np.ndarray):
+        """
+        Aplica una transformación afín 3x3 (coordenadas homogéneas)
+        
+        Args:
+            matrix: Matriz 3x3 con la parte lineal en [:2, :2] y la
+                traslación en [:2, 2]
+        """
+        if len(self._source):
+            self._compose(np.asarray(matrix, dtype=np.float64))
+            self._size_stale = True
+    
+    def reset_transform(self):
+        """Vuelve a la geometría de origen (rotación y posición a cero)"""
+        self.rotation = 0.0
+        self.position = (0.0, 0.0)
+        self._matrix = self._base
+        self._vertices = self._source if self._base is None else None
+        self._bbox = self._source_bbox if self._base is None else None
+    
+    def instance(self) -> "Piece":
+        """
+        Crea una pieza ligera que comparte la geometría de origen
+        
+        La geometría es inmutable, así que todas las instancias (por ejemplo
+        una por jugador) apuntan al mismo array y solo guardan su propia
+        transformación. La instancia parte de la transformación actual.
+        
+        Returns:
+            Nueva Piece sin copia de vértices
+        """
+        piece = Piece(
+            name=self.name,
+            size=self.size,
+            svg_path=self.svg_path,
+            width=self._width,
+            height=self._height,
+            area=self.area,
+            rotation=self.rotation,
+            position=self.position,
+            pdf_page=self.pdf_page,
+            normalized_name=self.normalized_name
+        )
+        piece._size_stale = self._size_stale
+        piece.marks = self.marks
+        piece._source = self._source
+        piece._source_bbox = self._source_bbox
+        piece._matrix = None if self._matrix is None else self._matrix.copy()
+        piece._placement = self._placement
+        piece._base = self._base
+        piece.shape_key = self.shape_key
+        piece._vertices = self._vertices
+        piece._bbox = self._bbox
+        return piece
+    
+    def shares_geometry_with(self, other: "Piece") -> bool:
+        """Indica si dos piezas comparten la misma geometría de origen"""
+        return self._source is other._source
+    
+    def astype(self, dtype) -> "Piece":
+        """
+        Cambia la precisión de la geometría (np.float64 o np.float32)
+        
+        Args:
+            dtype: Tipo de coma flotante
+            
+        Returns:
+            La propia pieza
+        """
+        matrix, placement, base, key = self._matrix, self._placement, self._base, self.shape_key
+        self._set_source(self._source, dtype)
+        if placement is not None:
+            self._placement = _readonly(as_vertex_array(placement, dtype))
+        self._base, self.shape_key = base, key
+        self.marks = [_readonly(as_vertex_array(mark, dtype)) for mark in self.marks]
+        if matrix is not None:
+            self._compose(matrix)
+        return self
     
     def get_area_mm2(self) -> float:
         """Retorna el área en mm²"""
@@ -124,5 +551,19 @@ class Piece:
         """Verifica si es la pieza posterior (donde va el nombre y número)"""
         return "POSTERIOR" in self.name.upper() or "BACK" in self.normalized_name.lower()
     
+    def __eq__(self, other):
+        if not isinstance(other, Piece):
+            return NotImplemented
+        return (
+            (self.name, self.size, self.svg_path, self.width, self.height, self.area,
+             self.rotation, self.position, self.pdf_page, self.normalized_name)
+            == (other.name, other.size, other.svg_path, other.width, other.height, other.area,
+                other.rotation, other.position, other.pdf_page, other.normalized_name)
+            and np.array_equal(self.vertices, other.vertices)
+            and np.array_equal(self.placement_source, other.placement_source)
+            and len(self.marks) == len(other.marks)
+            and all(np.array_equal(a, b) for a, b in zip(self.marks, other.marks))
+        )
+    
     def __repr__(self):
-        return f"Piece(name='{self.name}', size='{self.size}', area={self.area:.2f}mm²)"
\ No newline at end of file
+        return f"Piece(name='{self.name}', size='{self.size}', area={self.area:.2f}mm²)"
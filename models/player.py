@@ -1,10 +1,34 @@
 """
 Modelo de datos para jugador/cliente
 """
+import sys
 from dataclasses import dataclass
 from typing import Optional
+from config import VALID_SIZES
 
-@dataclass
+# Una única instancia de cada talla válida, compartida por todos los modelos
+SIZE_POOL = {size: size for size in VALID_SIZES}
+
+
+def intern_size(size: str) -> str:
+    """
+    Devuelve la instancia compartida de una talla
+    
+    Args:
+        size: Talla ya normalizada
+        
+    Returns:
+        La misma talla, compartida si es válida
+    """
+    return SIZE_POOL.get(size) or sys.intern(size)
+
+
+def intern_text(text):
+    """Deduplica textos repetidos (patrocinadores, equipos, nombres de pieza)"""
+    return sys.intern(text) if type(text) is str else text
+
+
+@dataclass(slots=True)
 class Player:
     """Representa un jugador o persona que recibe una equipación"""
     
@@ -17,7 +41,11 @@ class Player:
     def __post_init__(self):
         """Validación después de inicialización"""
         # Normalizar talla
-        self.size = self.size.strip().upper()
+        self.size = intern_size(self.size.strip().upper())
+        
+        # Patrocinador y equipo se repiten en muchos jugadores
+        self.sponsor = intern_text(self.sponsor)
+        self.team = intern_text(self.team)
         
         # Normalizar nombre
         self.name = self.name.strip()
@@ -0,0 +1,76 @@
+"""
+Modelo de datos para agrupación de tallas en archivos de impresión
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+from models.player import intern_size
+
+@dataclass(slots=True)
+class SizeGroup:
+    """Grupo de tallas que forman un archivo de impresión y sus repeticiones"""
+
+    sizes: Dict[str, int]  # {talla: prendas por repetición}, p. ej. {"M": 1, "L": 1}
+    repetitions: int = 1  # Veces que se imprime el archivo
+
+    def __post_init__(self):
+        """Comparte la instancia de las tallas"""
+        self.sizes = {intern_size(size): count for size, count in self.sizes.items()}
+
+    @property
+    def garments_per_file(self) -> int:
+        """Prendas en cada repetición del archivo"""
+        return sum(self.sizes.values())
+
+    def get_total_garments(self) -> int:
+        """Prendas producidas en total por el grupo"""
+        return self.garments_per_file * self.repetitions
+
+    def get_produced(self, size: str) -> int:
+        """Prendas producidas de una talla"""
+        return self.sizes.get(size, 0) * self.repetitions
+
+    def __repr__(self):
+        sizes = "+".join(size for size, count in self.sizes.items() for _ in range(count))
+        return f"SizeGroup(({sizes}) × {self.repetitions})"
+
+
+@dataclass(slots=True)
+class GroupingPlan:
+    """Plan de agrupación de un pedido: un archivo por grupo"""
+
+    groups: List[SizeGroup] = field(default_factory=list)
+    demand: Dict[str, int] = field(default_factory=dict)  # {talla: cantidad pedida}
+    optimal: bool = False  # True si la búsqueda terminó dentro del presupuesto
+    elapsed: float = 0.0  # Tiempo de búsqueda en segundos
+
+    @property
+    def file_count(self) -> int:
+        """Número de archivos de impresión"""
+        return len(self.groups)
+
+    def get_produced(self) -> Dict[str, int]:
+        """
+        Obtiene las prendas producidas por talla
+
+        Returns:
+            dict: {talla: cantidad}
+        """
+        produced: Dict[str, int] = {}
+        for group in self.groups:
+            for size in group.sizes:
+                produced[size] = produced.get(size, 0) + group.get_produced(size)
+        return produced
+
+    def get_waste(self) -> int:
+        """Prendas producidas de más respecto al pedido"""
+        produced = self.get_produced()
+        return sum(produced.get(size, 0) - count for size, count in self.demand.items()) + \
+            sum(count for size, count in produced.items() if size not in self.demand)
+
+    def covers_demand(self) -> bool:
+        """Verifica que el plan produce al menos lo pedido de cada talla"""
+        produced = self.get_produced()
+        return all(produced.get(size, 0) >= count for size, count in self.demand.items())
+
+    def __repr__(self):
+        return f"GroupingPlan(files={self.file_count}, waste={self.get_waste()}, optimal={self.optimal})"
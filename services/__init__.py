@@ -1,12 +1,33 @@
 """
 Servicios del sistema
 """
-from .excel_reader import ExcelReader, read_order_from_excel
-from .pdf_processor import PDFProcessor, PDFPatternLoader
+from .excel_reader import ExcelReader, read_order_from_excel, read_orders_from_directory
+from .order_cache import OrderCache
+from .pattern_cache import PatternCache
+from .pattern_catalog import PatternCatalog, PieceMetrics
+from .shape_registry import ShapeRegistry
+from .pdf_processor import PDFProcessor, PDFPatternLoader, LazyPDFPatternLoader
+from .plan_cache import PlanCache
+from .grouping_optimizer import GroupingOptimizer
+from .grouping_portfolio import GroupingPortfolio
+from .nesting_engine import NestingEngine
+from .nfp_cache import NFPCache
 
 __all__ = [
     'ExcelReader',
     'read_order_from_excel',
+    'read_orders_from_directory',
+    'OrderCache',
     'PDFProcessor',
-    'PDFPatternLoader'
+    'PDFPatternLoader',
+    'LazyPDFPatternLoader',
+    'PatternCache',
+    'ShapeRegistry',
+    'PatternCatalog',
+    'PieceMetrics',
+    'PlanCache',
+    'GroupingOptimizer',
+    'GroupingPortfolio',
+    'NestingEngine',
+    'NFPCache'
 ]
\ No newline at end of file
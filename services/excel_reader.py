@@ -1,25 +1,42 @@
 """
 Servicio para lectura y parseo de archivos Excel con pedidos
 """
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterator, Sequence, Any, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import re
+from openpyxl import load_workbook
 from models import Player, Order
+from config import VALID_SIZES
+from services.order_cache import OrderCache, file_digest
+
+# Versión del parser. Incrementar al cambiar el resultado del parseo para
+# invalidar los pedidos guardados en la caché.
+PARSER_VERSION = "1"
+
+# Marcadores de fin de la lista de jugadores
+STOP_MARKERS = ["TOTAL", "RESUMEN", "OTROS"]
+
+# Patrón: "23 ENRÍQUEZ" o "7 GIL" o solo "PALOMA"
+NUMBER_NAME_PATTERN = r'^(\d+)\s+(.+)$'
 
 class ExcelReader:
     """Lee y procesa archivos Excel con pedidos de equipaciones"""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, cache: Optional[OrderCache] = None):
         """
         Inicializa el lector
         
         Args:
             filepath: Ruta al archivo Excel
+            cache: Caché de pedidos parseados (opcional)
         """
         self.filepath = Path(filepath)
         self.df: Optional[pd.DataFrame] = None
         self.order: Optional[Order] = None
+        self.cache = cache
         
     def read_excel(self) -> pd.DataFrame:
         """
@@ -35,16 +52,47 @@ class ExcelReader:
         except Exception as e:
             raise ValueError(f"Error al leer el archivo Excel: {e}")
     
-    def parse_order(self) -> Order:
+    def parse_order(self, vectorized: bool = False) -> Order:
         """
         Parsea el Excel y crea un objeto Order
         
+        Args:
+            vectorized: Si es True usa el parseo columnar (mismo resultado,
+                mucho más rápido en pedidos grandes)
+        
         Returns:
             Order con todos los jugadores
         """
+        # Con caché solo se parsea si el contenido del archivo no se conoce
+        use_cache = self.cache is not None and self.df is None
+        if use_cache:
+            digest = file_digest(str(self.filepath))
+            cached = self.cache.get(str(self.filepath), PARSER_VERSION, digest=digest)
+            if cached is not None:
+                self.order = cached
+                return cached
+        
         if self.df is None:
             self.read_excel()
         
+        if vectorized:
+            self.order = self._parse_order_vectorized()
+        else:
+            self.order = self._parse_order_rows()
+        
+        if use_cache:
+            self.cache.put(str(self.filepath), PARSER_VERSION, self.order, digest=digest)
+        
+        return self.order
+    
+    def _parse_order_rows(self) -> Order:
+        """
+        Parsea el DataFrame fila a fila
+        
+        Returns:
+            Order con todos los jugadores
+        """
+        
         order = Order(name=self.filepath.stem)
         current_sponsor = ""
         
@@ -58,7 +106,7 @@ class ExcelReader:
                 continue
             
             # Detectar líneas de resumen (TOTAL, etc.) y saltarlas
-            if first_col.upper() in ["TOTAL", "RESUMEN", "OTROS"]:
+            if first_col.upper() in STOP_MARKERS:
                 break
             
             # Parsear jugador
@@ -66,15 +114,134 @@ class ExcelReader:
             if player:
                 order.add_player(player)
         
-        self.order = order
         return order
     
-    def _parse_player_row(self, row: pd.Series, sponsor: str) -> Optional[Player]:
+    def iter_players(self, sheet_name: Optional[str] = None) -> Iterator[Player]:
+        """
+        Lee el Excel en modo streaming y genera los jugadores equipo a equipo
+        
+        Usa openpyxl en modo read_only, por lo que la memoria no depende del
+        tamaño de la hoja, y deja de leer en el primer marcador de resumen
+        (TOTAL, RESUMEN, OTROS). Igual que read_excel, la primera fila de la
+        hoja se trata como encabezado.
+        
+        Reconoce tanto bloques "Patrocinador:" como bloques
+        "Equipo: X | Patrocinador: Y" seguidos de una fila de encabezados
+        (Nombre jugador, Numero, Talla).
+        
+        Args:
+            sheet_name: Hoja a leer (por defecto la primera)
+            
+        Yields:
+            Player por cada fila válida
+        """
+        try:
+            workbook = load_workbook(self.filepath, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValueError(f"Error al leer el archivo Excel: {e}")
+        
+        try:
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            rows = sheet.iter_rows(min_row=2, values_only=True)
+            
+            current_sponsor = ""
+            current_team = ""
+            columns: Optional[Dict[str, int]] = None
+            
+            for row in rows:
+                first_col = str(row[0]).strip() if row and row[0] is not None else ""
+                
+                if first_col.startswith("Equipo:"):
+                    current_team = first_col.replace("Equipo:", "").strip()
+                    second_col = str(row[1]).strip() if len(row) > 1 and row[1] is not None else ""
+                    if second_col.startswith("Patrocinador:"):
+                        current_sponsor = second_col.replace("Patrocinador:", "").strip()
+                    columns = None
+                    continue
+                
+                if first_col.startswith("Patrocinador:"):
+                    current_sponsor = first_col.replace("Patrocinador:", "").strip()
+                    continue
+                
+                if first_col.upper() in STOP_MARKERS:
+                    return
+                
+                # Fila de encabezados de un bloque "Equipo:"
+                if current_team and columns is None and first_col.lower().startswith("nombre"):
+                    columns = self._map_team_columns(row)
+                    continue
+                
+                if columns is not None:
+                    player = self._parse_team_row(row, columns, current_sponsor)
+                else:
+                    player = self._parse_player_row(row, current_sponsor)
+                
+                if player:
+                    player.team = current_team
+                    yield player
+        finally:
+            workbook.close()
+    
+    def _map_team_columns(self, header: Sequence[Any]) -> Dict[str, int]:
+        """
+        Localiza las columnas de nombre, número y talla en un encabezado
+        
+        Args:
+            header: Valores de la fila de encabezados
+            
+        Returns:
+            dict: {"name"|"number"|"size": índice_de_columna}
+        """
+        columns = {}
+        for idx, value in enumerate(header):
+            label = str(value).strip().lower() if value is not None else ""
+            if label.startswith("nombre"):
+                columns.setdefault("name", idx)
+            elif label.startswith(("numero", "número", "dorsal")):
+                columns.setdefault("number", idx)
+            elif label.startswith("talla"):
+                columns.setdefault("size", idx)
+        return columns
+    
+    def _parse_team_row(self, row: Sequence[Any], columns: Dict[str, int],
+                        sponsor: str) -> Optional[Player]:
+        """
+        Parsea una fila de un bloque "Equipo:" usando sus columnas
+        
+        Args:
+            row: Valores de la fila
+            columns: Índices de columna devueltos por _map_team_columns
+            sponsor: Patrocinador actual
+            
+        Returns:
+            Player o None si no es una fila válida
+        """
+        def cell(key: str) -> Optional[str]:
+            idx = columns.get(key)
+            if idx is None or idx >= len(row) or row[idx] is None:
+                return None
+            value = str(row[idx]).strip()
+            return value or None
+        
+        name = cell("name")
+        size = cell("size")
+        
+        if not name or not size or not self._is_valid_size(size):
+            return None
+        
+        return Player(
+            name=name,
+            number=cell("number"),
+            size=size,
+            sponsor=sponsor
+        )
+    
+    def _parse_player_row(self, row: Sequence[Any], sponsor: str) -> Optional[Player]:
         """
         Parsea una fila y extrae los datos del jugador
         
         Args:
-            row: Fila del DataFrame
+            row: Fila del DataFrame (o tupla de valores)
             sponsor: Patrocinador actual
             
         Returns:
@@ -90,7 +257,7 @@ class ExcelReader:
         first_col = values[0]
         
         # Patrón: "23 ENRÍQUEZ" o "7 GIL" o solo "PALOMA"
-        match = re.match(r'^(\d+)\s+(.+)$', first_col)
+        match = re.match(NUMBER_NAME_PATTERN, first_col)
         
         if match:
             number = match.group(1)
@@ -113,6 +280,79 @@ class ExcelReader:
             sponsor=sponsor
         )
     
+    def _parse_order_vectorized(self) -> Order:
+        """
+        Parsea el DataFrame completo con operaciones columnares
+        
+        Equivale a recorrer las filas con _parse_player_row pero detecta
+        patrocinadores y marcadores de fin, y separa número y nombre, sobre
+        columnas completas en lugar de fila a fila.
+        
+        Returns:
+            Order con todos los jugadores
+        """
+        order = Order(name=self.filepath.stem)
+        
+        if self.df.empty:
+            return order
+        
+        # Celdas como texto limpio ("" para celdas vacías), igual que str(v).strip()
+        cells = pd.DataFrame({
+            i: self.df.iloc[:, i].astype(object).map(lambda v: str(v).strip(), na_action='ignore')
+            for i in range(self.df.shape[1])
+        }).fillna("")
+        first_col = cells[0]
+        
+        # Cortar en el primer marcador de resumen (TOTAL, RESUMEN, OTROS)
+        is_stop = first_col.str.upper().isin(STOP_MARKERS).to_numpy()
+        if is_stop.any():
+            stop = int(is_stop.argmax())
+            cells = cells.iloc[:stop]
+            first_col = first_col.iloc[:stop]
+        
+        # Patrocinador vigente en cada fila (forward-fill desde "Patrocinador:")
+        is_sponsor = first_col.str.startswith("Patrocinador:")
+        sponsors = (
+            first_col.where(is_sponsor)
+            .str.replace("Patrocinador:", "", regex=False)
+            .str.strip()
+            .ffill()
+            .fillna("")
+        )
+        
+        # Primer y segundo valor no vacío de cada fila
+        values = cells.to_numpy(dtype=object)
+        rank = np.cumsum(values != "", axis=1)
+        non_empty = values != ""
+        has_two = rank[:, -1] >= 2
+        rows = np.arange(len(values))
+        first_value = values[rows, np.argmax(non_empty & (rank == 1), axis=1)]
+        second_value = values[rows, np.argmax(non_empty & (rank == 2), axis=1)]
+        
+        sizes = pd.Series(second_value, index=cells.index, dtype=object)
+        is_player = (
+            has_two
+            & ~is_sponsor.to_numpy()
+            & sizes.str.upper().isin(VALID_SIZES).to_numpy()
+        )
+        
+        # Separar "23 ENRÍQUEZ" en número y nombre
+        first_values = pd.Series(first_value[is_player], dtype=object)
+        parts = first_values.str.extract(NUMBER_NAME_PATTERN)
+        has_number = parts[0].notna()
+        numbers = parts[0].where(has_number, None)
+        names = parts[1].where(has_number, first_values)
+        
+        for name, number, size, sponsor in zip(
+            names.tolist(),
+            numbers.tolist(),
+            sizes[is_player].tolist(),
+            sponsors[is_player].tolist()
+        ):
+            order.add_player(Player(name=name, number=number, size=size, sponsor=sponsor))
+        
+        return order
+    
     def _is_valid_size(self, size: str) -> bool:
         """
         Verifica si una talla es válida
@@ -123,9 +363,7 @@ class ExcelReader:
         Returns:
             bool
         """
-        valid_sizes = ["2", "4", "6", "8", "10", "12", "14", "16", 
-                      "XS", "S", "M", "L", "XL", "XXL", "XXXL"]
-        return size.upper() in valid_sizes
+        return size.upper() in VALID_SIZES
     
     def get_size_summary(self) -> Dict[str, int]:
         """
@@ -171,7 +409,6 @@ class ExcelReader:
             errors.extend(duplicate_list)
         
         # Validar cada jugador
-        from config import VALID_SIZES
         for player in self.order.players:
             is_valid, error_msg = player.validate(VALID_SIZES)
             if not is_valid:
@@ -208,15 +445,102 @@ class ExcelReader:
 
 
 # Función auxiliar para uso rápido
-def read_order_from_excel(filepath: str) -> Order:
+def read_order_from_excel(filepath: str, cache: Optional[OrderCache] = None) -> Order:
     """
     Función auxiliar para leer un pedido desde Excel
     
     Args:
         filepath: Ruta al archivo Excel
+        cache: Caché de pedidos parseados (opcional)
         
     Returns:
         Order con los datos parseados
     """
-    reader = ExcelReader(filepath)
-    return reader.parse_order()
\ No newline at end of file
+    reader = ExcelReader(filepath, cache=cache)
+    return reader.parse_order()
+
+
+# Extensiones de libros de pedido que se procesan en lote (openpyxl no lee .xls)
+EXCEL_PATTERNS = ["*.xlsx", "*.xlsm"]
+
+
+def _parse_workbook(filepath: str, cache: Optional[OrderCache] = None) -> Tuple[Order, int, int]:
+    """
+    Parsea un libro en un proceso trabajador (debe ser una función de módulo)
+    
+    Returns:
+        tuple: (Order, aciertos, fallos de la caché en este libro); el proceso
+        trabaja sobre una copia de la caché, así que el padre suma los contadores
+    """
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    order = ExcelReader(filepath, cache=cache).parse_order(vectorized=True)
+    if cache is None:
+        return order, 0, 0
+    return order, cache.hits - hits, cache.misses - misses
+
+
+def read_orders_from_directory(
+    path: str,
+    workers: Optional[int] = None,
+    merge: bool = True,
+    cache: Optional[OrderCache] = None
+) -> Tuple[Union[Order, Dict[str, Order]], Dict[str, str]]:
+    """
+    Lee en paralelo todos los pedidos Excel de un directorio
+    
+    Cada libro se parsea en un proceso independiente. Un libro que falla no
+    interrumpe el lote: su error se devuelve aparte.
+    
+    Args:
+        path: Directorio con los libros de pedido
+        workers: Número de procesos (None = núcleos disponibles, 1 = secuencial)
+        merge: Si es True devuelve un único Order; si no, {archivo: Order}
+        cache: Caché de pedidos parseados (opcional)
+        
+    Returns:
+        tuple: (Order combinado o {archivo: Order}, {archivo: mensaje_error})
+    """
+    directory = Path(path)
+    files = sorted(
+        {f for pattern in EXCEL_PATTERNS for f in directory.glob(pattern)
+         if not f.name.startswith("~$")}  # ficheros de bloqueo de Excel
+    )
+    
+    orders: Dict[str, Order] = {}
+    errors: Dict[str, str] = {}
+    
+    if workers == 1 or len(files) <= 1:
+        for filepath in files:
+            try:
+                orders[filepath.name] = _parse_workbook(str(filepath), cache)[0]
+            except Exception as e:
+                errors[filepath.name] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_parse_workbook, str(filepath), cache): filepath
+                for filepath in files
+            }
+            for future in as_completed(futures):
+                filepath = futures[future]
+                try:
+                    orders[filepath.name], hits, misses = future.result()
+                except Exception as e:
+                    errors[filepath.name] = str(e)
+                    continue
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+    
+    # Mantener el orden de los archivos, no el de finalización
+    orders = {f.name: orders[f.name] for f in files if f.name in orders}
+    
+    if not merge:
+        return orders, errors
+    
+    merged = Order(name=directory.name)
+    for order in orders.values():
+        for player in order.players:
+            merged.add_player(player)
+    
+    return merged, errors
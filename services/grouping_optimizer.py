@@ -0,0 +1,380 @@
+"""
+Optimizador de agrupación de tallas en archivos de impresión
+"""
+import math
+import time
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+from models import Order, SizeGroup, GroupingPlan
+from config import OPTIMIZATION_LIMITS
+from services.plan_cache import PlanCache, size_signature
+
+# Coste de un plan: (archivos, prendas sobrantes), comparado lexicográficamente
+Cost = Tuple[int, int]
+
+# Sobrantes máximos representables al empaquetar un coste en un entero
+_WASTE_BITS = 32
+
+
+def pack_cost(cost: Cost) -> int:
+    """Empaqueta un coste en un entero que conserva el orden (para multiprocessing.Value)"""
+    files, waste = cost
+    return (files << _WASTE_BITS) | min(waste, (1 << _WASTE_BITS) - 1)
+
+
+def unpack_cost(packed: int) -> Cost:
+    """Inversa de pack_cost"""
+    return packed >> _WASTE_BITS, packed & ((1 << _WASTE_BITS) - 1)
+
+
+class GroupingOptimizer:
+    """
+    Agrupa las tallas de un pedido en archivos con repeticiones
+
+    Cada archivo contiene entre min_group_size y max_group_size prendas (la
+    misma talla puede repetirse, p. ej. S+S) y se imprime un número de veces.
+    Cada talla se asigna a un único archivo. El objetivo es minimizar
+    primero el número de archivos y después las prendas sobrantes.
+
+    La búsqueda es un branch-and-bound sobre particiones de las tallas:
+    la talla pendiente de menor índice se asigna a cada bloque factible que
+    la contiene, con cota inferior ceil(tallas_pendientes / max_group_size)
+    archivos y poda por dominancia (no se vuelve a un mismo conjunto de
+    tallas pendientes con un coste igual o peor). Si se agota el
+    presupuesto de tiempo se devuelve el mejor plan encontrado.
+
+    Con una PlanCache los planes óptimos de una firma de tallas ya vista se
+    devuelven sin buscar, y el resto arranca desde la partición de la firma
+    guardada más parecida.
+    """
+
+    def __init__(self, min_group_size: Optional[int] = None, max_group_size: Optional[int] = None,
+                 time_budget: Optional[float] = None, cache: Optional[PlanCache] = None):
+        """
+        Inicializa el optimizador
+
+        Args:
+            min_group_size: Mínimo de prendas por archivo (por defecto OPTIMIZATION_LIMITS)
+            max_group_size: Máximo de prendas por archivo (por defecto OPTIMIZATION_LIMITS)
+            time_budget: Tiempo máximo de búsqueda en segundos (por defecto
+                OPTIMIZATION_LIMITS["time_budget_s"])
+            cache: Caché de planes de agrupación (opcional)
+        """
+        self.min_group_size = min_group_size or OPTIMIZATION_LIMITS["min_group_size"]
+        self.max_group_size = max_group_size or OPTIMIZATION_LIMITS["max_group_size"]
+        self.time_budget = time_budget if time_budget is not None else OPTIMIZATION_LIMITS["time_budget_s"]
+        if self.min_group_size > self.max_group_size:
+            raise ValueError(f"min_group_size ({self.min_group_size}) mayor que "
+                             f"max_group_size ({self.max_group_size})")
+        self.cache = cache
+        # Mejor coste conocido por otros procesos (multiprocessing.Value con
+        # pack_cost); la búsqueda poda contra él y publica sus mejoras
+        self.shared_cost = None
+        self.nodes = 0  # Nodos explorados en la última búsqueda
+
+    def optimize_order(self, order: Order) -> GroupingPlan:
+        """
+        Agrupa las tallas de un pedido
+
+        Args:
+            order: Pedido
+
+        Returns:
+            GroupingPlan
+        """
+        return self.optimize(order.get_size_summary())
+
+    def block_cost(self, demand: List[int]) -> Optional[Tuple[int, int, List[int]]]:
+        """
+        Mejor forma de imprimir un conjunto de tallas en un solo archivo
+
+        Para cada número de repeticiones r, cada talla necesita ceil(d / r)
+        prendas por archivo; si no se llega al mínimo se rellena con la talla
+        de mayor cantidad.
+
+        Args:
+            demand: Cantidades pedidas de las tallas del bloque
+
+        Returns:
+            tuple: (sobrantes, repeticiones, prendas por talla) o None si el
+            bloque no cabe en un archivo
+        """
+        if len(demand) > self.max_group_size:
+            return None
+
+        # Solo cambia el reparto en los r = ceil(d / m)
+        max_size = self.max_group_size
+        candidates = {-(-d // m) for d in demand for m in range(1, max_size + 1)}
+        ordered = sorted(range(len(demand)), key=lambda i: -demand[i])
+        total_demand = sum(demand)
+        best = None
+        for r in candidates:
+            counts = [-(-d // r) for d in demand]
+            total = sum(counts)
+            if total > max_size:
+                continue
+            if total < self.min_group_size:
+                counts[ordered[0]] += self.min_group_size - total
+                total = self.min_group_size
+            waste = total * r - total_demand
+            if best is None or (waste, r) < best[:2]:
+                best = (waste, r, counts)
+        return best
+
+    def optimize(self, size_summary: Dict[str, int], incumbent: Optional[GroupingPlan] = None) -> GroupingPlan:
+        """
+        Busca el plan con menos archivos y, a igualdad, menos sobrantes
+
+        Args:
+            size_summary: {talla: cantidad}, p. ej. Order.get_size_summary()
+            incumbent: Plan de partida (opcional); la búsqueda solo acepta
+                planes mejores
+
+        Returns:
+            GroupingPlan (optimal=False si se agotó el presupuesto)
+        """
+        if self.cache is None:
+            return self._search(size_summary, incumbent)
+
+        started = time.perf_counter()
+        config = PlanCache.config_key(self.min_group_size, self.max_group_size)
+        cached = self.cache.get(config, size_summary)
+        if cached is not None and cached.optimal:
+            self.cache.hits += 1
+            self.nodes = 0
+            cached.elapsed = time.perf_counter() - started
+            return cached
+
+        # Plan guardado no óptimo o firma más parecida como punto de partida
+        start = cached or self._plan_from_partition(size_summary, self.cache.nearest(config, size_summary))
+        if start is not None:
+            self.cache.warm_starts += 1
+        else:
+            self.cache.misses += 1
+        if incumbent is None or (start is not None and self._plan_cost(start) < self._plan_cost(incumbent)):
+            incumbent = start
+
+        plan = self._search(size_summary, incumbent)
+        if cached is None or self._plan_cost(plan) < self._plan_cost(cached) or plan.optimal:
+            self.cache.put(config, plan)
+        plan.elapsed = time.perf_counter() - started
+        return plan
+
+    def _search(self, size_summary: Dict[str, int], incumbent: Optional[GroupingPlan] = None) -> GroupingPlan:
+        """Branch-and-bound sin caché (ver optimize)"""
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+        self.nodes = 0
+
+        sizes = [size for size, count in size_summary.items() if count > 0]
+        demand = [size_summary[size] for size in sizes]
+        n = len(sizes)
+        if n == 0:
+            return GroupingPlan(demand={}, optimal=True)
+
+        blocks = self._feasible_blocks(demand)
+        full = (1 << n) - 1
+        best_cost: Cost = (n + 1, 0)
+        best_plan: List[Tuple[int, int, int, List[int]]] = []
+
+        def plan_cost(plan) -> Cost:
+            return len(plan), sum(block[1] for block in plan)
+
+        # Plan inicial: el recibido si es válido y el voraz, que ya alcanza
+        # el mínimo de archivos (cualquier bloque de <= max_group_size tallas
+        # es factible) juntando tallas de cantidades parecidas
+        starts = [self._greedy_blocks(sizes, demand)]
+        if incumbent is not None and incumbent.covers_demand():
+            starts.append(self._blocks_from_plan(incumbent, sizes, demand))
+        for start in starts:
+            if start is not None and plan_cost(start) < best_cost:
+                best_plan, best_cost = start, plan_cost(start)
+
+        # Cota de sobrantes: cada talla carga al menos con la menor parte
+        # proporcional de sobrantes de los bloques que la contienen
+        share = [min(block[1] / bin(block[0]).count("1") for block in options)
+                 for options in self._blocks_by_member(blocks, n)]
+
+        # Tamaño y cota de sobrantes de cada bloque, para podar sin recalcular
+        block_info = {block[0]: (bin(block[0]).count("1"),
+                                 sum(share[i] for i in range(n) if block[0] >> i & 1))
+                      for options in blocks.values() for block in options}
+        max_size = self.max_group_size
+
+        seen: Dict[int, Cost] = {}
+        complete = True
+        stack: List = []
+
+        shared = self.shared_cost.get_obj() if self.shared_cost is not None else None
+        if shared is not None:
+            self._publish(best_cost)
+
+        def search(remaining: int, count: int, files: int, waste: int, share_left: float):
+            nonlocal best_cost, best_plan, complete
+            if not remaining:
+                if (files, waste) < best_cost:
+                    best_cost = (files, waste)
+                    best_plan = list(stack)
+                    if shared is not None:
+                        self._publish(best_cost)
+                return
+
+            # Con coste compartido se poda contra el mejor de todos los procesos;
+            # ese plan lo devuelve el proceso que lo encontró
+            limit = best_cost if shared is None else min(best_cost, unpack_cost(shared.value))
+
+            # Cotas inferiores de archivos y sobrantes para las tallas pendientes
+            bound = files + -(-count // max_size)
+            if (bound, waste + share_left - 1e-9) >= limit:
+                return
+            if seen.get(remaining, (math.inf, math.inf)) <= (files, waste):
+                return
+            seen[remaining] = (files, waste)
+
+            self.nodes += 1
+            if not complete or time.perf_counter() > deadline:
+                complete = False
+                return
+
+            first = (remaining & -remaining).bit_length() - 1
+            for block in blocks[first]:
+                mask = block[0]
+                if mask & ~remaining:
+                    continue
+                size, block_share = block_info[mask]
+                # Bloques ordenados de mayor a menor: si este ya fuerza más
+                # archivos que el mejor plan, los siguientes también
+                child_files = files + 1 + -(-(count - size) // max_size)
+                if child_files > limit[0]:
+                    break
+                child_waste = waste + block[1]
+                if (child_files, child_waste + share_left - block_share - 1e-9) >= limit:
+                    continue
+                stack.append(block)
+                search(remaining & ~mask, count - size, files + 1, child_waste, share_left - block_share)
+                stack.pop()
+
+        search(full, n, 0, 0, sum(share))
+
+        plan = self._plan_from_blocks(sizes, demand, best_plan)
+        # Podando contra el coste compartido, terminar solo demuestra que no
+        # hay nada mejor que el plan de otro proceso: el propio puede ser peor
+        plan.optimal = complete and (shared is None or best_cost <= unpack_cost(shared.value))
+        plan.elapsed = time.perf_counter() - started
+        return plan
+
+    def _feasible_blocks(self, demand: List[int]) -> Dict[int, List[Tuple[int, int, int, List[int]]]]:
+        """
+        Bloques factibles (máscara de tallas) con su mejor reparto
+
+        Returns:
+            dict: {talla de menor índice del bloque: [(máscara, sobrantes,
+            repeticiones, prendas por talla)]}, primero los bloques grandes
+            (menos archivos) y con menos sobrantes
+        """
+        n = len(demand)
+        blocks: Dict[int, List[Tuple[int, int, int, List[int]]]] = {i: [] for i in range(n)}
+        for k in range(1, min(n, self.max_group_size) + 1):
+            for members in combinations(range(n), k):
+                cost = self.block_cost([demand[i] for i in members])
+                if cost is not None:
+                    waste, repetitions, counts = cost
+                    mask = sum(1 << i for i in members)
+                    blocks[members[0]].append((mask, waste, repetitions, counts))
+        for options in blocks.values():
+            options.sort(key=lambda block: (-bin(block[0]).count("1"), block[1]))
+        return blocks
+
+    def _publish(self, cost: Cost):
+        """Publica un coste en shared_cost si mejora el compartido"""
+        packed = pack_cost(cost)
+        with self.shared_cost.get_lock():
+            if packed < self.shared_cost.value:
+                self.shared_cost.value = packed
+
+    @staticmethod
+    def _plan_from_blocks(sizes: List[str], demand: List[int],
+                          blocks: List[Tuple[int, int, int, List[int]]]) -> GroupingPlan:
+        """Convierte bloques de la búsqueda (máscara, sobrantes, repeticiones, prendas) en un plan"""
+        n = len(sizes)
+        groups = [
+            SizeGroup(
+                sizes={sizes[i]: counts[k] for k, i in enumerate(j for j in range(n) if mask >> j & 1)},
+                repetitions=repetitions
+            )
+            for mask, _, repetitions, counts in blocks
+        ]
+        return GroupingPlan(groups=groups, demand={size: count for size, count in zip(sizes, demand)})
+
+    @staticmethod
+    def _plan_cost(plan: GroupingPlan) -> Cost:
+        """Coste (archivos, sobrantes) de un plan; infinito si no cubre el pedido"""
+        if not plan.covers_demand():
+            return math.inf, math.inf
+        return plan.file_count, plan.get_waste()
+
+    def _plan_from_partition(self, size_summary: Dict[str, int],
+                             partition: Optional[List[List[int]]]) -> Optional[GroupingPlan]:
+        """
+        Aplica una partición de índices de talla (orden normalizado) a un pedido
+
+        Las repeticiones y prendas por archivo se recalculan para las
+        cantidades del pedido, así que el plan es válido aunque la partición
+        venga de otra firma.
+        """
+        if partition is None:
+            return None
+        sizes, counts = size_signature(size_summary)
+        groups = []
+        for members in partition:
+            if not members or max(members) >= len(sizes):
+                return None
+            cost = self.block_cost([counts[i] for i in members])
+            if cost is None:
+                return None
+            _, repetitions, per_file = cost
+            groups.append(SizeGroup(sizes={sizes[i]: count for i, count in zip(members, per_file)},
+                                    repetitions=repetitions))
+        return GroupingPlan(groups=groups, demand=dict(zip(sizes, counts)))
+
+    @staticmethod
+    def _blocks_by_member(blocks: Dict[int, List[Tuple[int, int, int, List[int]]]],
+                          n: int) -> List[List[Tuple[int, int, int, List[int]]]]:
+        """Bloques que contienen cada talla (no solo como talla de menor índice)"""
+        members: List[List[Tuple[int, int, int, List[int]]]] = [[] for _ in range(n)]
+        for options in blocks.values():
+            for block in options:
+                for i in range(n):
+                    if block[0] >> i & 1:
+                        members[i].append(block)
+        return members
+
+    def _greedy_blocks(self, sizes: List[str], demand: List[int]) -> List[Tuple[int, int, int, List[int]]]:
+        """Plan voraz: tallas ordenadas por cantidad en bloques consecutivos de max_group_size"""
+        order = sorted(range(len(sizes)), key=lambda i: -demand[i])
+        blocks = []
+        for start in range(0, len(order), self.max_group_size):
+            members = sorted(order[start:start + self.max_group_size])
+            waste, repetitions, counts = self.block_cost([demand[i] for i in members])
+            blocks.append((sum(1 << i for i in members), waste, repetitions, counts))
+        return blocks
+
+    def _blocks_from_plan(self, plan: GroupingPlan, sizes: List[str],
+                          demand: List[int]) -> Optional[List[Tuple[int, int, int, List[int]]]]:
+        """Convierte un plan en bloques de la búsqueda (None si no es una partición válida)"""
+        index = {size: i for i, size in enumerate(sizes)}
+        blocks = []
+        used = 0
+        for group in plan.groups:
+            members = sorted(index[size] for size in group.sizes if size in index)
+            mask = sum(1 << i for i in members)
+            if not members or mask & used or not \
+                    self.min_group_size <= group.garments_per_file <= self.max_group_size:
+                return None
+            used |= mask
+            counts = [group.sizes[sizes[i]] for i in members]
+            waste = sum(c * group.repetitions for c in counts) - sum(demand[i] for i in members)
+            if waste < 0:
+                return None
+            blocks.append((mask, waste, group.repetitions, counts))
+        return blocks if used == (1 << len(sizes)) - 1 else None
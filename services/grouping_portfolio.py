@@ -0,0 +1,411 @@
+"""
+Portfolio de estrategias de agrupación de tallas ejecutadas en paralelo
+"""
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Tuple
+from models import Order, GroupingPlan
+from config import OPTIMIZATION_LIMITS
+from services.grouping_optimizer import GroupingOptimizer, Cost, pack_cost
+
+# Estado compartido del proceso: mejor coste (pack_cost) y aviso de óptimo demostrado.
+# Lo fija _init_worker en cada proceso del pool (o optimize() en modo secuencial).
+_shared_cost = None
+_solved = None
+
+
+class _Stop(Exception):
+    """La estrategia debe terminar: se agotó el tiempo u otra demostró el óptimo"""
+
+
+def _init_worker(shared_cost, solved):
+    """Inicializador de los procesos del pool"""
+    global _shared_cost, _solved
+    _shared_cost = shared_cost
+    _solved = solved
+
+
+def _should_stop(deadline: float) -> bool:
+    return time.time() > deadline or _solved.is_set()
+
+
+def _greedy(optimizer: GroupingOptimizer, sizes: List[str], demand: List[int],
+            deadline: float, seed: int) -> Optional[GroupingPlan]:
+    """Tallas ordenadas por cantidad en bloques consecutivos de max_group_size"""
+    blocks = optimizer._greedy_blocks(sizes, demand)
+    optimizer._publish((len(blocks), sum(block[1] for block in blocks)))
+    return optimizer._plan_from_blocks(sizes, demand, blocks)
+
+
+def _branch_and_bound(optimizer: GroupingOptimizer, sizes: List[str], demand: List[int],
+                      deadline: float, seed: int) -> Optional[GroupingPlan]:
+    """Branch-and-bound de GroupingOptimizer podando contra el coste compartido"""
+    optimizer.time_budget = max(deadline - time.time(), 0.0)
+    plan = optimizer.optimize(dict(zip(sizes, demand)))
+    if plan.optimal:
+        _solved.set()
+    return plan
+
+
+def _subset_dp(optimizer: GroupingOptimizer, sizes: List[str], demand: List[int],
+               deadline: float, seed: int) -> Optional[GroupingPlan]:
+    """
+    Programación dinámica exacta sobre conjuntos de tallas pendientes
+
+    Sin cotas: explora todos los conjuntos alcanzables asignando siempre la
+    talla pendiente de menor índice, así que gana en pedidos pequeños con
+    muchos empates donde el branch-and-bound poda poco.
+    """
+    blocks = optimizer._feasible_blocks(demand)
+    memo: Dict[int, Tuple[Cost, Optional[tuple]]] = {0: ((0, 0), None)}
+
+    def solve(remaining: int) -> Cost:
+        entry = memo.get(remaining)
+        if entry is not None:
+            return entry[0]
+        if len(memo) & 255 == 0 and _should_stop(deadline):
+            raise _Stop
+        first = (remaining & -remaining).bit_length() - 1
+        best: Tuple[Cost, Optional[tuple]] = ((math.inf, math.inf), None)
+        for block in blocks[first]:
+            if block[0] & ~remaining:
+                continue
+            files, waste = solve(remaining & ~block[0])
+            cost = (files + 1, waste + block[1])
+            if cost < best[0]:
+                best = (cost, block)
+        memo[remaining] = best
+        return best[0]
+
+    full = (1 << len(sizes)) - 1
+    try:
+        cost = solve(full)
+    except _Stop:
+        return None
+
+    chosen = []
+    remaining = full
+    while remaining:
+        block = memo[remaining][1]
+        chosen.append(block)
+        remaining &= ~block[0]
+    optimizer._publish(cost)
+    _solved.set()
+    plan = optimizer._plan_from_blocks(sizes, demand, chosen)
+    plan.optimal = True
+    return plan
+
+
+def _local_search(optimizer: GroupingOptimizer, sizes: List[str], demand: List[int],
+                  deadline: float, seed: int) -> Optional[GroupingPlan]:
+    """
+    Búsqueda local aleatoria sobre particiones de tallas
+
+    Parte del plan voraz y aplica movimientos (mover una talla a otro
+    archivo, intercambiar dos tallas, fusionar dos archivos) aceptando los
+    que no empeoran y, con poca probabilidad, los que sí para salir de
+    mínimos locales. Vuelve al mejor plan tras una racha sin mejoras.
+    """
+    rng = random.Random(seed)
+    n = len(sizes)
+    max_size = optimizer.max_group_size
+    costs: Dict[int, Optional[Tuple[int, int, List[int]]]] = {}
+
+    def block(mask: int):
+        if mask not in costs:
+            costs[mask] = optimizer.block_cost([demand[i] for i in range(n) if mask >> i & 1])
+        return costs[mask]
+
+    def total(groups: List[int]) -> Cost:
+        return len(groups), sum(block(mask)[0] for mask in groups)
+
+    greedy = [entry[0] for entry in optimizer._greedy_blocks(sizes, demand)]
+    best, best_cost = list(greedy), total(greedy)
+    current, current_cost = list(greedy), best_cost
+    lower = (-(-n // max_size), 0)
+    stale = 0
+    iteration = 0
+
+    while best_cost > lower:
+        iteration += 1
+        if iteration & 63 == 0 and _should_stop(deadline):
+            break
+
+        candidate = list(current)
+        a = rng.randrange(len(candidate))
+        move = rng.random()
+        if move < 0.2 and len(candidate) > 1:
+            # Fusionar dos archivos
+            b = rng.randrange(len(candidate) - 1)
+            b += b >= a
+            merged = candidate[a] | candidate[b]
+            if bin(merged).count("1") > max_size:
+                continue
+            candidate[a] = merged
+            del candidate[b]
+        else:
+            members = [i for i in range(n) if candidate[a] >> i & 1]
+            i = rng.choice(members)
+            b = rng.randrange(len(candidate) + 1)  # len(candidate) = archivo nuevo
+            if b == a:
+                continue
+            if b == len(candidate):
+                candidate.append(0)
+            if move < 0.6 or not candidate[b]:
+                # Mover la talla i al archivo b
+                candidate[a] &= ~(1 << i)
+                candidate[b] |= 1 << i
+            else:
+                # Intercambiar la talla i con una del archivo b
+                j = rng.choice([j for j in range(n) if candidate[b] >> j & 1])
+                candidate[a] = candidate[a] & ~(1 << i) | (1 << j)
+                candidate[b] = candidate[b] & ~(1 << j) | (1 << i)
+            candidate = [mask for mask in candidate if mask]
+            if any(bin(mask).count("1") > max_size or block(mask) is None for mask in candidate):
+                continue
+
+        cost = total(candidate)
+        if cost <= current_cost or rng.random() < 0.02:
+            current, current_cost = candidate, cost
+        if current_cost < best_cost:
+            best, best_cost = list(current), current_cost
+            optimizer._publish(best_cost)
+            stale = 0
+        else:
+            stale += 1
+            if stale > 500:
+                current, current_cost = list(best), best_cost
+                stale = 0
+
+    plan = optimizer._plan_from_blocks(sizes, demand, [(mask, *block(mask)) for mask in best])
+    plan.optimal = best_cost == lower
+    return plan
+
+
+# Estrategias disponibles: (optimizador, tallas, cantidades, fin, semilla) -> plan o None
+STRATEGIES: Dict[str, Callable[..., Optional[GroupingPlan]]] = {
+    "greedy": _greedy,
+    "branch_and_bound": _branch_and_bound,
+    "dp": _subset_dp,
+    "local_search": _local_search
+}
+
+# Máximo de tallas con el que se lanza cada estrategia (sin entrada = sin límite).
+# La memoria de la DP crece con 2^n conjuntos y con 26 tallas no termina.
+MAX_SIZES: Dict[str, int] = {
+    "dp": OPTIMIZATION_LIMITS["portfolio_dp_max_sizes"]
+}
+
+
+def _run_strategy(name: str, sizes: List[str], demand: List[int], min_group_size: int,
+                  max_group_size: int, deadline: float, seed: int) -> Tuple[Optional[GroupingPlan], float]:
+    """
+    Ejecuta una estrategia (en un proceso del pool o en el actual)
+
+    Returns:
+        tuple: (plan o None si no terminó, tiempo empleado en segundos)
+    """
+    started = time.perf_counter()
+    optimizer = GroupingOptimizer(min_group_size, max_group_size)
+    optimizer.shared_cost = _shared_cost
+    plan = STRATEGIES[name](optimizer, sizes, demand, deadline, seed)
+    return plan, time.perf_counter() - started
+
+
+class GroupingPortfolio:
+    """
+    Ejecuta varias estrategias de agrupación a la vez y se queda con la mejor
+
+    Cada estrategia corre en su propio proceso con el mismo plazo. Los
+    procesos comparten el mejor coste (archivos, sobrantes) encontrado, con
+    el que el branch-and-bound poda y la búsqueda local sabe cuándo parar, y
+    un aviso de óptimo demostrado con el que todos terminan antes del plazo.
+    Las victorias de cada estrategia se acumulan en self.stats para decidir
+    cuáles merece la pena mantener.
+
+    El pool de procesos y el estado compartido se crean una vez y se
+    reutilizan en cada llamada; close() (o usar el portfolio con with) los
+    libera.
+    """
+
+    def __init__(self, strategies: Optional[List[str]] = None, workers: Optional[int] = None,
+                 time_budget: Optional[float] = None, min_group_size: Optional[int] = None,
+                 max_group_size: Optional[int] = None, seed: int = 0):
+        """
+        Inicializa el portfolio
+
+        Args:
+            strategies: Nombres de STRATEGIES (por defecto
+                OPTIMIZATION_LIMITS["portfolio_strategies"])
+            workers: Número de procesos (None = uno por estrategia, 1 = secuencial)
+            time_budget: Plazo en segundos (por defecto OPTIMIZATION_LIMITS["time_budget_s"])
+            min_group_size: Mínimo de prendas por archivo (por defecto OPTIMIZATION_LIMITS)
+            max_group_size: Máximo de prendas por archivo (por defecto OPTIMIZATION_LIMITS)
+            seed: Semilla de las estrategias aleatorias
+        """
+        self.strategies = list(strategies or OPTIMIZATION_LIMITS["portfolio_strategies"])
+        unknown = [name for name in self.strategies if name not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"Estrategias desconocidas: {unknown}")
+        self.workers = workers
+        self.time_budget = time_budget if time_budget is not None else OPTIMIZATION_LIMITS["time_budget_s"]
+        optimizer = GroupingOptimizer(min_group_size, max_group_size)
+        self.min_group_size = optimizer.min_group_size
+        self.max_group_size = optimizer.max_group_size
+        self.seed = seed
+        self.stats: Dict[str, Dict[str, float]] = {
+            name: {"runs": 0, "wins": 0, "sole_wins": 0, "failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
+            for name in self.strategies
+        }
+        # Coste obtenido por cada estrategia en la última llamada (None si no terminó)
+        self.last_costs: Dict[str, Optional[Cost]] = {}
+        # Excepciones de la última llamada: {estrategia: mensaje}
+        self.last_errors: Dict[str, str] = {}
+
+        # Estado compartido con los procesos (se reinicia en cada llamada)
+        self._shared_cost = multiprocessing.Value("q", 0)
+        self._solved = multiprocessing.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def optimize_order(self, order: Order) -> GroupingPlan:
+        """
+        Agrupa las tallas de un pedido
+
+        Args:
+            order: Pedido
+
+        Returns:
+            GroupingPlan
+        """
+        return self.optimize(order.get_size_summary())
+
+    def optimize(self, size_summary: Dict[str, int]) -> GroupingPlan:
+        """
+        Ejecuta las estrategias y devuelve el mejor plan dentro del plazo
+
+        Args:
+            size_summary: {talla: cantidad}, p. ej. Order.get_size_summary()
+
+        Returns:
+            GroupingPlan (optimal=True si alguna estrategia demostró el óptimo)
+        """
+        started = time.perf_counter()
+        sizes = [size for size, count in size_summary.items() if count > 0]
+        demand = [size_summary[size] for size in sizes]
+        if not sizes:
+            return GroupingPlan(demand={}, optimal=True)
+
+        active = [name for name in self.strategies if len(sizes) <= MAX_SIZES.get(name, len(sizes))]
+        for name in self.strategies:
+            self.stats[name]["skipped"] += name not in active
+
+        self._shared_cost.value = pack_cost((len(sizes) + 1, 0))
+        self._solved.clear()
+        deadline = time.time() + self.time_budget
+        results: Dict[str, Tuple[Optional[GroupingPlan], float]] = {}
+        self.last_errors = {}
+
+        def args(name: str) -> tuple:
+            k = self.strategies.index(name)
+            return (name, sizes, demand, self.min_group_size, self.max_group_size, deadline, self.seed + k)
+
+        def failed(name: str, error: Exception):
+            results[name] = None, 0.0
+            self.last_errors[name] = f"{type(error).__name__}: {error}"
+
+        if self._sequential():
+            previous = _shared_cost, _solved
+            _init_worker(self._shared_cost, self._solved)
+            try:
+                for name in active:
+                    try:
+                        results[name] = _run_strategy(*args(name))
+                    except Exception as e:
+                        failed(name, e)
+            finally:
+                _init_worker(*previous)
+        else:
+            executor = self._pool()
+            futures = {executor.submit(_run_strategy, *args(name)): name for name in active}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    failed(futures[future], e)
+            if any(isinstance(future.exception(), BrokenProcessPool) for future in futures):
+                # Un proceso murió: el pool ya no sirve, la próxima llamada crea otro
+                self.close()
+
+        self.last_costs = {
+            name: (plan.file_count, plan.get_waste()) if plan is not None and plan.covers_demand() else None
+            for name, (plan, _) in results.items()
+        }
+        finished = {name: cost for name, cost in self.last_costs.items() if cost is not None}
+        best_cost = min(finished.values()) if finished else None
+        winners = [name for name, cost in finished.items() if cost == best_cost]
+
+        for name, (_, elapsed) in results.items():
+            entry = self.stats[name]
+            entry["runs"] += 1
+            entry["time"] += elapsed
+            entry["errors"] += name in self.last_errors
+            if name not in finished:
+                entry["failures"] += 1
+            elif name in winners:
+                entry["wins"] += 1
+                entry["sole_wins"] += len(winners) == 1
+
+        if not winners:
+            # Ninguna estrategia terminó: el plan voraz siempre es válido
+            optimizer = GroupingOptimizer(self.min_group_size, self.max_group_size)
+            plan = optimizer._plan_from_blocks(sizes, demand, optimizer._greedy_blocks(sizes, demand))
+            plan.elapsed = time.perf_counter() - started
+            return plan
+        # Entre empates, el de la estrategia configurada antes
+        winner = min(winners, key=self.strategies.index)
+        plan = results[winner][0]
+        plan.optimal = any(results[name][0].optimal for name in finished)
+        plan.elapsed = time.perf_counter() - started
+        return plan
+
+    def _sequential(self) -> bool:
+        """Indica si las estrategias se ejecutan en el proceso actual"""
+        return self.workers == 1 or len(self.strategies) == 1
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Pool de procesos del portfolio, creado en la primera llamada en paralelo"""
+        if self._executor is None:
+            workers = self.workers if self.workers is not None else len(self.strategies)
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                 initargs=(self._shared_cost, self._solved))
+        return self._executor
+
+    def close(self):
+        """Termina el pool de procesos (se vuelve a crear si se llama a optimize)"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        Obtiene las estadísticas acumuladas por estrategia
+
+        Returns:
+            dict: {estrategia: {runs, wins, sole_wins, failures, errors, skipped, time, win_rate}}
+        """
+        return {
+            name: {**entry, "win_rate": entry["wins"] / entry["runs"] if entry["runs"] else 0.0}
+            for name, entry in self.stats.items()
+        }
@@ -0,0 +1,179 @@
+"""
+Motor de nesting: colocación de las piezas reales de las prendas en el rollo
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from models import Piece, Garment, SizeGroup, NestingResult, PlacedPiece
+from models.piece import rotation_matrix
+from config import ROLL_CONFIG, NESTING_CONFIG, OPTIMIZATION_LIMITS
+from utils.geometry import column_profile
+
+# Perfil de una pieza girada: (inferior, superior ensanchado con la separación,
+# esquina mínima de la geometría girada, columnas que ocupa, alto, altura del centroide)
+Profile = Tuple[np.ndarray, np.ndarray, np.ndarray, int, float, float]
+
+
+class NestingEngine:
+    """
+    Bottom-left-fill sobre el contorno real de las piezas
+
+    El ancho útil del rollo se divide en columnas de NESTING_CONFIG
+    ["resolution_mm"] y se mantiene la línea de horizonte (la y más alta
+    ocupada en cada columna). Cada pieza se describe por su perfil inferior
+    y superior por columnas (utils.geometry.column_profile), así que su
+    borde inferior encaja en el horizonte de lo ya colocado en lugar de
+    apoyarse sobre cajas. Para cada giro permitido se evalúan a la vez todas
+    las posiciones x y se elige la de centro de gravedad más bajo (regla
+    "lowest gravity center": a diferencia de la y más baja, no premia tumbar
+    piezas altas en un valle estrecho) y, a igualdad, la más a la izquierda.
+    Las piezas se colocan de mayor a menor lado.
+
+    Se coloca la geometría simplificada hacia fuera (Piece.placement_vertices)
+    y los perfiles envuelven al contorno, así que la separación entre piezas
+    reales nunca es menor que NESTING_CONFIG["spacing"]. Los huecos que
+    quedan bajo el horizonte no se vuelven a rellenar.
+    """
+
+    def __init__(self, roll_width: Optional[float] = None, edge_margin: Optional[float] = None,
+                 spacing: Optional[float] = None, rotations: Optional[List[float]] = None,
+                 resolution: Optional[float] = None):
+        """
+        Inicializa el motor
+
+        Args:
+            roll_width: Ancho del rollo en mm (por defecto ROLL_CONFIG["width"])
+            edge_margin: Margen a cada borde del rollo en mm (por defecto ROLL_CONFIG)
+            spacing: Separación mínima entre piezas en mm (por defecto NESTING_CONFIG)
+            rotations: Giros permitidos en grados (por defecto NESTING_CONFIG["allowed_rotations"])
+            resolution: Ancho de columna en mm (por defecto NESTING_CONFIG["resolution_mm"])
+
+        Raises:
+            ValueError: Si la resolución no es positiva o el rollo no tiene ancho útil
+        """
+        self.roll_width = roll_width if roll_width is not None else ROLL_CONFIG["width"]
+        self.edge_margin = edge_margin if edge_margin is not None else ROLL_CONFIG["edge_margin"]
+        self.spacing = spacing if spacing is not None else NESTING_CONFIG["spacing"]
+        self.rotations = list(rotations if rotations is not None else NESTING_CONFIG["allowed_rotations"])
+        self.resolution = resolution if resolution is not None else NESTING_CONFIG["resolution_mm"]
+        if self.resolution <= 0:
+            raise ValueError(f"La resolución debe ser positiva: {self.resolution}")
+        self.columns = int((self.roll_width - 2 * self.edge_margin) // self.resolution)
+        self.reach = int(np.ceil(self.spacing / self.resolution))  # columnas de separación
+        if self.columns <= 0:
+            raise ValueError(f"El rollo de {self.roll_width} mm no tiene ancho útil "
+                             f"con márgenes de {self.edge_margin} mm")
+
+    def nest_group(self, group: SizeGroup, patterns: Dict[str, Garment]) -> NestingResult:
+        """
+        Coloca una repetición de un archivo de impresión
+
+        Args:
+            group: Grupo de tallas del archivo
+            patterns: {talla: Garment} del patrón, p. ej. PDFPatternLoader.garments
+
+        Returns:
+            NestingResult
+        """
+        missing = [size for size in group.sizes if size not in patterns]
+        if missing:
+            raise ValueError(f"No hay patrón para las tallas: {missing}")
+        garments = [patterns[size].instantiate()
+                    for size, count in group.sizes.items() for _ in range(count)]
+        return self.nest(garments)
+
+    def nest(self, garments: List[Garment]) -> NestingResult:
+        """
+        Coloca todas las piezas de las prendas en el rollo
+
+        Las piezas se transforman a su posición final (rotate/translate sobre
+        su transformación de origen).
+
+        Args:
+            garments: Prendas a colocar
+
+        Returns:
+            NestingResult
+        """
+        started = time.perf_counter()
+        result = NestingResult(roll_width=self.roll_width,
+                               target_efficiency=OPTIMIZATION_LIMITS["target_efficiency"])
+
+        # Perfiles por geometría (las piezas iguales de cada prenda los comparten)
+        pieces = [(piece, index) for index, garment in enumerate(garments)
+                  for piece in garment.pieces if len(piece.source_vertices) >= 3]
+        profiles: Dict[tuple, List[Tuple[float, Profile]]] = {}
+        for piece, _ in pieces:
+            key = piece.placement_key
+            if key not in profiles:
+                profiles[key] = [(angle, self._profile(piece, angle)) for angle in self.rotations]
+
+        # Primero las piezas de lado más largo (el alto girado 90° es el ancho)
+        pieces.sort(key=lambda item: (-max(profile[4] for _, profile in profiles[item[0].placement_key]),
+                                      item[0].name))
+
+        skyline = np.zeros(self.columns)
+        length = 0.0
+
+        for piece, index in pieces:
+            key = piece.placement_key
+            best = None
+            for angle, (bottom, _, _, width, _, centroid) in profiles[key]:
+                if width > self.columns:
+                    continue
+                heights = (sliding_window_view(skyline, width) - bottom).max(axis=1)
+                column = int(np.argmin(heights + centroid))  # a igualdad, la más a la izquierda
+                score = float(heights[column]) + centroid
+                if best is None or (score, column) < best[:2]:
+                    best = (score, column, angle, float(heights[column]))
+
+            if best is None:
+                result.unplaced.append(piece)
+                continue
+
+            _, column, angle, y = best
+            _, top, corner, _, height, _ = dict(profiles[key])[angle]
+            self._raise_skyline(skyline, column, y, top)
+            length = max(length, y + height)
+
+            x = self.edge_margin + column * self.resolution
+            y += self.edge_margin
+            piece.reset_transform()
+            piece.rotate(angle)
+            piece.translate(x - corner[0], y - corner[1])
+            result.placements.append(PlacedPiece(piece=piece, garment=index, rotation=angle, x=x, y=y))
+            result.piece_area += piece.get_area_mm2()
+
+        result.length = length + 2 * self.edge_margin if result.placements else 0.0
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def _profile(self, piece: Piece, angle: float) -> Profile:
+        """
+        Perfiles por columna de la geometría de colocación girada
+
+        El perfil superior se ensancha spacing mm a cada lado (máximo en la
+        vecindad) y se eleva spacing mm, de modo que al subir el horizonte
+        con él la pieza siguiente queda separada en horizontal y vertical.
+        """
+        points = piece.placement_source @ rotation_matrix(angle).T
+        corner = points.min(axis=0)
+        points = points - corner
+        bottom, top = column_profile(points, self.resolution)
+
+        padded = np.pad(top, 2 * self.reach, constant_values=-np.inf)
+        widened = sliding_window_view(padded, 2 * self.reach + 1).max(axis=1) + self.spacing
+
+        # Altura del centroide del polígono sobre su esquina inferior
+        x, y = points[:, 0], points[:, 1]
+        next_x, next_y = np.roll(x, -1), np.roll(y, -1)
+        cross = x * next_y - next_x * y
+        centroid = float(((y + next_y) * cross).sum() / (3 * cross.sum()))
+        return bottom, widened, corner, len(bottom), float(top.max()), centroid
+
+    def _raise_skyline(self, skyline: np.ndarray, column: int, y: float, top: np.ndarray):
+        """Sube el horizonte con el perfil superior ensanchado de una pieza colocada en column"""
+        start = column - self.reach
+        lo, hi = max(start, 0), min(start + len(top), len(skyline))
+        np.maximum(skyline[lo:hi], y + top[lo - start:hi - start], out=skyline[lo:hi])
@@ -0,0 +1,205 @@
+"""
+Caché de no-fit polygons entre piezas: LRU en memoria sobre un almacén SQLite
+"""
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import shapely
+from models import Piece
+from config import CACHE_CONFIG, PDF_CONFIG
+from services.shape_registry import ShapeRegistry
+from utils.geometry import no_fit_polygon, simplify_polygon
+
+# Versión del cálculo y del formato. Incrementar si cambia no_fit_polygon.
+NFP_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nfp (
+    key TEXT PRIMARY KEY,
+    offsets BLOB NOT NULL,
+    points BLOB NOT NULL
+);
+"""
+
+# NFP: (contorno exterior, huecos)
+NFP = Tuple[np.ndarray, List[np.ndarray]]
+
+
+class NFPCache:
+    """
+    No-fit polygons por pareja de formas canónicas y giro relativo
+
+    Un NFP solo depende de las dos geometrías y de su orientación relativa,
+    así que se calcula en el sistema canónico de la pieza fija (ver
+    ShapeRegistry) y se guarda con la clave (forma fija, forma móvil, giro
+    de la móvil respecto a la fija). La misma pareja en cualquier posición,
+    con ambos giros sumados a un mismo ángulo o entre pedidos distintos
+    reutiliza la entrada, y NFP(B, A) se obtiene de NFP(A, B) por simetría.
+    Las entradas usadas recientemente viven en memoria y todas se guardan en
+    disco.
+
+    Calcular un NFP cuesta O(n³) en los vértices de cada pieza (ver
+    utils.geometry.convex_decomposition), así que se usa la geometría
+    simplificada de colocación y las piezas que no la tienen se simplifican
+    hacia fuera con simplify_tolerance: el NFP resultante contiene al exacto
+    y ningún solape real se pasa por alto.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None,
+                 shapes: Optional[ShapeRegistry] = None, simplify_tolerance: Optional[float] = None):
+        """
+        Abre (o crea) la caché
+
+        Args:
+            db_path: Ruta de la base de datos (por defecto CACHE_CONFIG["nfp_path"])
+            max_entries: NFPs en memoria (por defecto CACHE_CONFIG["nfp_memory_entries"])
+            shapes: Registro con el que se canonicalizan las piezas sin shape_key
+                (por defecto uno nuevo)
+            simplify_tolerance: Simplificación en mm de las piezas sin geometría de
+                colocación (por defecto PDF_CONFIG["simplify_tolerance_mm"]; 0 = ninguna)
+        """
+        self.db_path = Path(db_path) if db_path else Path(CACHE_CONFIG["nfp_path"])
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(_SCHEMA)
+        self.max_entries = max_entries or CACHE_CONFIG["nfp_memory_entries"]
+        self.shapes = shapes if shapes is not None else ShapeRegistry()
+        self.simplify_tolerance = (PDF_CONFIG["simplify_tolerance_mm"]
+                                   if simplify_tolerance is None else simplify_tolerance)
+        self.memory: "OrderedDict[str, NFP]" = OrderedDict()
+        # {id(geometría): (hash, geometría, geometría para el NFP)}; la referencia evita reutilizar ids
+        self._digests: Dict[int, Tuple[str, np.ndarray, np.ndarray]] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.computed = 0
+
+    def get(self, fixed: Piece, moving: Piece) -> NFP:
+        """
+        NFP de una pieza móvil alrededor de una fija, en sus posiciones actuales
+
+        La pieza móvil se solapa con la fija si el origen de su sistema
+        (moving.placement_frame[1][:2, 2]) cae en el interior del contorno y
+        fuera de los huecos. Las piezas sin shape_key se canonicalizan.
+
+        Args:
+            fixed: Pieza fija
+            moving: Pieza móvil
+
+        Returns:
+            tuple: (contorno exterior (K, 2), huecos) en coordenadas del rollo
+        """
+        fixed_key, fixed_geometry, fixed_matrix = self._frame(fixed)
+        moving_key, moving_geometry, moving_matrix = self._frame(moving)
+        linear = fixed_matrix[:2, :2]
+        relative = linear.T @ moving_matrix[:2, :2]
+
+        # NFP(B, A, rᵀ) = −r · NFP(A, B, r): se guarda solo una de las dos
+        if moving_key < fixed_key:
+            exterior, holes = self._lookup(moving_key, moving_geometry, fixed_key, fixed_geometry, relative.T)
+            linear = -linear @ relative
+        else:
+            exterior, holes = self._lookup(fixed_key, fixed_geometry, moving_key, moving_geometry, relative)
+
+        offset = fixed_matrix[:2, 2]
+        return exterior @ linear.T + offset, [hole @ linear.T + offset for hole in holes]
+
+    def overlaps(self, fixed: Piece, moving: Piece) -> bool:
+        """
+        Indica si dos piezas colocadas se solapan (según su NFP)
+
+        Args:
+            fixed: Pieza fija
+            moving: Pieza móvil
+
+        Returns:
+            True si el origen de la móvil está estrictamente dentro del NFP
+        """
+        exterior, holes = self.get(fixed, moving)
+        x, y = moving.placement_frame[1][:2, 2]
+        return bool(shapely.contains_xy(shapely.Polygon(exterior, holes), x, y))
+
+    def _frame(self, piece: Piece) -> Tuple[str, np.ndarray, np.ndarray]:
+        """Hash de la geometría para el NFP, la geometría (simplificada si hace falta) y su matriz al rollo"""
+        if piece.shape_key is None:
+            self.shapes.canonicalize(piece)
+        geometry, matrix = piece.placement_frame
+        entry = self._digests.get(id(geometry))
+        if entry is None or entry[1] is not geometry:
+            used = geometry
+            if self.simplify_tolerance > 0 and not piece.vertex_reduction:
+                used = simplify_polygon(geometry, self.simplify_tolerance)
+            digest = hashlib.sha1(np.ascontiguousarray(used, dtype=np.float64).tobytes()).hexdigest()[:20]
+            entry = (digest, geometry, used)
+            self._digests[id(geometry)] = entry
+        return entry[0], entry[2], matrix
+
+    def _lookup(self, fixed_key: str, fixed_geometry: np.ndarray, moving_key: str,
+                moving_geometry: np.ndarray, relative: np.ndarray) -> NFP:
+        """NFP en el sistema de la pieza fija: memoria, disco o cálculo"""
+        rotation = ",".join(f"{value:.6f}" for value in (np.round(relative, 6) + 0.0).ravel())
+        key = f"{NFP_VERSION}:{fixed_key}:{moving_key}:{rotation}"
+
+        nfp = self.memory.get(key)
+        if nfp is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return nfp
+
+        row = self.conn.execute("SELECT offsets, points FROM nfp WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            offsets = np.frombuffer(row[0], dtype=np.int64)
+            points = np.frombuffer(row[1], dtype=np.float64).reshape(-1, 2)
+            rings = np.split(points, offsets[1:-1])
+            nfp = (rings[0], rings[1:])
+            self.disk_hits += 1
+        else:
+            nfp = no_fit_polygon(fixed_geometry, moving_geometry @ relative.T)
+            rings = [nfp[0], *nfp[1]]
+            offsets = np.cumsum([0] + [len(ring) for ring in rings]).astype(np.int64)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO nfp VALUES (?, ?, ?)",
+                    (key, offsets.tobytes(), np.concatenate(rings).astype(np.float64).tobytes())
+                )
+            self.computed += 1
+
+        self.memory[key] = nfp
+        if len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+        return nfp
+
+    def clear(self) -> int:
+        """
+        Vacía la caché (memoria y disco)
+
+        Returns:
+            Número de NFPs eliminados del disco
+        """
+        self.memory.clear()
+        with self.conn:
+            return self.conn.execute("DELETE FROM nfp").rowcount
+
+    def close(self):
+        """Cierra la base de datos"""
+        self.conn.close()
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene estadísticas de uso
+
+        Returns:
+            dict con NFPs en disco y en memoria, aciertos y NFPs calculados
+        """
+        return {
+            "stored": len(self),
+            "in_memory": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "computed": self.computed
+        }
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM nfp").fetchone()[0]
@@ -0,0 +1,220 @@
+"""
+Caché en disco de pedidos ya parseados, direccionada por contenido
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Optional, List, Tuple
+from models import Player, Order
+from config import CACHE_CONFIG
+
+# Versión del formato de la caché. Incrementar si cambia la serialización.
+CACHE_FORMAT_VERSION = 1
+
+
+def file_digest(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo
+
+    Args:
+        filepath: Ruta al archivo
+        chunk_size: Tamaño de bloque de lectura en bytes
+
+    Returns:
+        Hash hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OrderCache:
+    """Caché LRU en disco de pedidos parseados, indexada por hash del archivo"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[float] = None):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir: Directorio de la caché (por defecto CACHE_CONFIG["orders_dir"])
+            max_size_mb: Tamaño máximo en MB antes de expulsar entradas
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(CACHE_CONFIG["orders_dir"])
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int((max_size_mb or CACHE_CONFIG["orders_max_size_mb"]) * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, digest: str, parser_version: str) -> Path:
+        """Ruta del archivo de caché para un hash de contenido y versión del parser"""
+        return self.cache_dir / f"{digest}_{parser_version}.order"
+
+    def get(self, filepath: str, parser_version: str,
+            name: Optional[str] = None, digest: Optional[str] = None) -> Optional[Order]:
+        """
+        Devuelve el pedido cacheado para un archivo, si existe
+
+        Args:
+            filepath: Ruta al archivo Excel
+            parser_version: Versión del parser que generó la entrada
+            name: Nombre del pedido (por defecto el nombre del archivo)
+            digest: Hash del archivo ya calculado (por defecto se calcula)
+
+        Returns:
+            Order o None si no está en caché
+        """
+        entry = self._entry_path(digest or file_digest(filepath), parser_version)
+
+        try:
+            with open(entry, "rb") as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Entrada corrupta: descartarla
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        if payload.get("format") != CACHE_FORMAT_VERSION:
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Marcar como usada recientemente (orden LRU)
+        os.utime(entry)
+        self.hits += 1
+
+        order = Order(name=name if name is not None else Path(filepath).stem)
+        for player_name, number, size, sponsor, team in self._decode_players(payload):
+            order.add_player(Player(name=player_name, number=number, size=size,
+                                    sponsor=sponsor, team=team))
+        return order
+
+    def put(self, filepath: str, parser_version: str, order: Order,
+            digest: Optional[str] = None):
+        """
+        Guarda un pedido parseado en la caché
+
+        Args:
+            filepath: Ruta al archivo Excel del que procede
+            parser_version: Versión del parser que generó el pedido
+            order: Pedido parseado
+            digest: Hash del archivo ya calculado (por defecto se calcula)
+        """
+        entry = self._entry_path(digest or file_digest(filepath), parser_version)
+        payload = self._encode_players(order.players)
+
+        # Escritura atómica para no dejar entradas a medias. El temporal es
+        # único: varios procesos pueden escribir la misma entrada a la vez.
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            tmp = Path(f.name)
+            try:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                f.close()
+                tmp.unlink(missing_ok=True)
+                raise
+        os.replace(tmp, entry)
+
+        self._evict()
+
+    def invalidate(self, filepath: str) -> int:
+        """
+        Elimina de la caché las entradas de un archivo (todas las versiones)
+
+        Args:
+            filepath: Ruta al archivo Excel
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        digest = file_digest(filepath)
+        removed = 0
+        for entry in self.cache_dir.glob(f"{digest}_*.order"):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """
+        Vacía la caché
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        removed = 0
+        for entry in self.cache_dir.glob("*.order"):
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def get_size_bytes(self) -> int:
+        """Tamaño total de la caché en bytes"""
+        return sum(entry.stat().st_size for entry in self.cache_dir.glob("*.order"))
+
+    def _evict(self):
+        """Expulsa las entradas usadas hace más tiempo hasta respetar el tamaño máximo"""
+        entries = [(entry.stat(), entry) for entry in self.cache_dir.glob("*.order")]
+        total = sum(stat.st_size for stat, _ in entries)
+
+        for stat, entry in sorted(entries, key=lambda e: e[0].st_mtime):
+            if total <= self.max_size_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    @staticmethod
+    def _encode_players(players: List[Player]) -> dict:
+        """
+        Serializa jugadores en forma columnar con textos repetidos deduplicados
+
+        Args:
+            players: Lista de jugadores
+
+        Returns:
+            dict serializable
+        """
+        strings: dict = {}
+
+        def code(value: Optional[str]) -> int:
+            if value is None:
+                return -1
+            return strings.setdefault(value, len(strings))
+
+        columns = [[], [], [], [], []]
+        for player in players:
+            columns[0].append(code(player.name))
+            columns[1].append(code(player.number))
+            columns[2].append(code(player.size))
+            columns[3].append(code(player.sponsor))
+            columns[4].append(code(player.team))
+
+        return {
+            "format": CACHE_FORMAT_VERSION,
+            "strings": list(strings),
+            "columns": columns
+        }
+
+    @staticmethod
+    def _decode_players(payload: dict) -> List[Tuple[str, Optional[str], str, str, str]]:
+        """
+        Reconstruye las tuplas (nombre, número, talla, patrocinador, equipo)
+
+        Args:
+            payload: dict generado por _encode_players
+
+        Returns:
+            Lista de tuplas
+        """
+        strings = payload["strings"]
+
+        def decode(column: List[int]) -> List[Optional[str]]:
+            return [strings[c] if c >= 0 else None for c in column]
+
+        return list(zip(*(decode(column) for column in payload["columns"])))
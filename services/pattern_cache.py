@@ -0,0 +1,200 @@
+"""
+Caché en disco de la geometría extraída de los PDFs de patrones
+"""
+import argparse
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from models import Piece, Garment
+from config import CACHE_CONFIG
+from services.order_cache import file_digest
+
+
+class PatternCache:
+    """Caché de prendas extraídas de PDF, indexada por hash del archivo y versiones"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir: Directorio de la caché (por defecto CACHE_CONFIG["patterns_dir"])
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(CACHE_CONFIG["patterns_dir"])
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, pdf_path: str, version: str, digest: Optional[str] = None) -> Path:
+        """Ruta del archivo .npz para un PDF y una versión de extracción"""
+        return self.cache_dir / f"{digest or file_digest(pdf_path)}_{version}.npz"
+
+    def get(self, pdf_path: str, version: str, digest: Optional[str] = None) -> Optional[Garment]:
+        """
+        Devuelve la prenda cacheada de un PDF sin abrirlo
+
+        Args:
+            pdf_path: Ruta al PDF del patrón
+            version: Versión del extractor y de PyMuPDF que generó la entrada
+            digest: Hash del PDF ya calculado (por defecto se calcula)
+
+        Returns:
+            Garment o None si no está en caché
+        """
+        entry = self._entry_path(pdf_path, version, digest)
+
+        try:
+            with np.load(entry, allow_pickle=False) as data:
+                size = str(data["size"])
+                names = data["names"].tolist()
+                meta = data["meta"]
+                offsets = data["offsets"]
+                vertices = data["vertices"]
+                mark_owner = data["mark_owner"]
+                mark_offsets = data["mark_offsets"]
+                mark_vertices = data["mark_vertices"]
+                placement_offsets = data["placement_offsets"]
+                placement_vertices = data["placement_vertices"]
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Entrada corrupta: descartarla
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        marks = [[] for _ in names]
+        for j, owner in enumerate(mark_owner.tolist()):
+            marks[owner].append(mark_vertices[mark_offsets[j]:mark_offsets[j + 1]])
+
+        garment = Garment(size=size)
+        for i, name in enumerate(names):
+            width, height, area, pdf_page = meta[i].tolist()
+            piece = Piece(
+                name=name,
+                size=size,
+                width=width,
+                height=height,
+                area=area,
+                pdf_page=int(pdf_page) if pdf_page >= 0 else None,
+                vertices=vertices[offsets[i]:offsets[i + 1]],
+                marks=marks[i]
+            )
+            # Rango vacío: la pieza no tiene geometría simplificada
+            start, end = placement_offsets[i], placement_offsets[i + 1]
+            if end > start:
+                piece.set_placement_geometry(placement_vertices[start:end])
+            garment.add_piece(piece)
+        return garment
+
+    def put(self, pdf_path: str, version: str, garment: Garment, digest: Optional[str] = None):
+        """
+        Guarda la geometría de una prenda extraída de un PDF
+
+        Args:
+            pdf_path: Ruta al PDF del patrón
+            version: Versión del extractor y de PyMuPDF
+            garment: Prenda extraída
+            digest: Hash del PDF ya calculado (por defecto se calcula)
+        """
+        entry = self._entry_path(pdf_path, version, digest)
+
+        pieces = garment.pieces
+        counts = [len(piece.source_vertices) for piece in pieces]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        vertices = (np.concatenate([piece.source_vertices for piece in pieces])
+                    if pieces else np.empty((0, 2)))
+        meta = np.array([
+            [piece.width, piece.height, piece.area,
+             piece.pdf_page if piece.pdf_page is not None else -1]
+            for piece in pieces
+        ], dtype=np.float64).reshape(-1, 4)
+
+        # Marcas internas: todas concatenadas con la pieza a la que pertenecen
+        marks = [(i, mark) for i, piece in enumerate(pieces) for mark in piece.marks]
+        mark_owner = np.array([i for i, _ in marks], dtype=np.int64)
+        mark_offsets = np.concatenate([[0], np.cumsum([len(m) for _, m in marks])]).astype(np.int64)
+        mark_vertices = (np.concatenate([m for _, m in marks]) if marks else np.empty((0, 2)))
+
+        # Geometría simplificada para nesting (vacía si coincide con la original)
+        placements = [piece.placement_source if piece.vertex_reduction else np.empty((0, 2))
+                      for piece in pieces]
+        placement_offsets = np.concatenate([[0], np.cumsum([len(p) for p in placements])]).astype(np.int64)
+        placement_vertices = np.concatenate(placements) if pieces else np.empty((0, 2))
+
+        # Escritura atómica para no dejar entradas a medias. El temporal es
+        # único y no termina en .npz, así que nunca cuenta como entrada.
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            tmp = Path(f.name)
+            try:
+                np.savez(f, size=np.array(garment.size), names=np.array([p.name for p in pieces], dtype=str),
+                         meta=meta, offsets=offsets, vertices=vertices,
+                         mark_owner=mark_owner, mark_offsets=mark_offsets, mark_vertices=mark_vertices,
+                         placement_offsets=placement_offsets, placement_vertices=placement_vertices)
+            except BaseException:
+                f.close()
+                tmp.unlink(missing_ok=True)
+                raise
+        os.replace(tmp, entry)
+
+    def purge(self, keep_version: Optional[str] = None) -> int:
+        """
+        Elimina entradas de la caché
+
+        Args:
+            keep_version: Si se indica, conserva las entradas de esa versión
+                y elimina solo las obsoletas
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        removed = 0
+        for entry in self.cache_dir.glob("*.npz"):
+            if keep_version and entry.stem.endswith(f"_{keep_version}"):
+                continue
+            entry.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene estadísticas de uso de la caché
+
+        Returns:
+            dict con aciertos, fallos, entradas y tamaño en bytes
+        """
+        entries = list(self.cache_dir.glob("*.npz"))
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "size_bytes": sum(entry.stat().st_size for entry in entries)
+        }
+
+
+def main():
+    """Línea de comandos: python -m services.pattern_cache {stats,purge}"""
+    from services.pdf_processor import cache_version
+
+    parser = argparse.ArgumentParser(description="Caché de geometría de patrones")
+    parser.add_argument("command", choices=["stats", "purge"])
+    parser.add_argument("--stale", action="store_true",
+                        help="con purge, elimina solo entradas de versiones anteriores")
+    args = parser.parse_args()
+
+    cache = PatternCache()
+    if args.command == "purge":
+        removed = cache.purge(keep_version=cache_version() if args.stale else None)
+        print(f"Entradas eliminadas: {removed}")
+    else:
+        stats = cache.get_stats()
+        print(f"Entradas: {stats['entries']} ({stats['size_bytes'] / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
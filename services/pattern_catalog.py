@@ -0,0 +1,367 @@
+"""
+Catálogo persistente de patrones con métricas precalculadas por pieza
+"""
+import argparse
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from models import Garment, Piece
+from config import CATALOG_CONFIG
+from services.order_cache import file_digest
+from services.pattern_cache import PatternCache
+from services.pdf_processor import PDFPatternLoader, cache_version
+from utils.geometry import convex_hull, min_area_rectangle, polygon_area
+
+# Versión del esquema y de las métricas. Incrementar si cambia su cálculo.
+CATALOG_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pieces (
+    model TEXT NOT NULL,
+    size TEXT NOT NULL,
+    piece_index INTEGER NOT NULL,
+    piece TEXT NOT NULL,
+    area REAL NOT NULL,
+    min_x REAL NOT NULL,
+    min_y REAL NOT NULL,
+    max_x REAL NOT NULL,
+    max_y REAL NOT NULL,
+    hull_area REAL NOT NULL,
+    hull BLOB NOT NULL,
+    rect_width REAL NOT NULL,
+    rect_height REAL NOT NULL,
+    rect_angle REAL NOT NULL,
+    vertex_count INTEGER NOT NULL,
+    shape_key TEXT,
+    PRIMARY KEY (model, size, piece_index)
+);
+CREATE TABLE IF NOT EXISTS sources (
+    model TEXT NOT NULL,
+    file TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (model, file)
+);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class PieceMetrics:
+    """Métricas geométricas de una pieza, en mm"""
+
+    area: float
+    bbox: Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+    hull: np.ndarray  # Envolvente convexa (H, 2)
+    hull_area: float
+    rect_width: float  # Rectángulo girado de área mínima
+    rect_height: float
+    rect_angle: float  # Ángulo en grados del rectángulo mínimo
+    vertex_count: int
+    shape_key: Optional[str] = None
+
+    @property
+    def bbox_width(self) -> float:
+        return self.bbox[2] - self.bbox[0]
+
+    @property
+    def bbox_height(self) -> float:
+        return self.bbox[3] - self.bbox[1]
+
+    @property
+    def hull_efficiency(self) -> float:
+        """Fracción de la envolvente convexa ocupada por la pieza"""
+        return self.area / self.hull_area if self.hull_area else 0.0
+
+    @property
+    def rect_efficiency(self) -> float:
+        """Fracción del rectángulo mínimo ocupada por la pieza"""
+        rect_area = self.rect_width * self.rect_height
+        return self.area / rect_area if rect_area else 0.0
+
+
+def compute_metrics(piece: Piece) -> PieceMetrics:
+    """
+    Calcula las métricas de una pieza sobre su geometría original
+
+    Args:
+        piece: Pieza
+
+    Returns:
+        PieceMetrics
+    """
+    vertices = piece.source_vertices
+    if len(vertices) == 0:
+        hull = np.empty((0, 2))
+        return PieceMetrics(area=piece.area, bbox=(0.0, 0.0, piece.width, piece.height), hull=hull,
+                            hull_area=0.0, rect_width=piece.width, rect_height=piece.height,
+                            rect_angle=0.0, vertex_count=0, shape_key=piece.shape_key)
+
+    min_x, min_y = vertices.min(axis=0).tolist()
+    max_x, max_y = vertices.max(axis=0).tolist()
+    hull = convex_hull(vertices)
+    rect_width, rect_height, rect_angle = min_area_rectangle(hull)
+
+    return PieceMetrics(
+        area=abs(polygon_area(vertices)),
+        bbox=(min_x, min_y, max_x, max_y),
+        hull=hull,
+        hull_area=abs(polygon_area(hull)),
+        rect_width=rect_width,
+        rect_height=rect_height,
+        rect_angle=rect_angle,
+        vertex_count=len(vertices),
+        shape_key=piece.shape_key
+    )
+
+
+class PatternCatalog:
+    """
+    Catálogo SQLite de métricas por (modelo de prenda, talla, pieza)
+
+    Las métricas se calculan una vez al reconstruir un modelo y se cargan
+    en memoria la primera vez que se consultan, así que cada consulta es un
+    acceso a diccionario. Cada pieza se guarda por su posición en la prenda,
+    así que las piezas con el mismo nombre (varias "UNKNOWN") se conservan
+    todas; las consultas por nombre devuelven la primera.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Abre (o crea) el catálogo
+
+        Args:
+            db_path: Ruta de la base de datos (por defecto CATALOG_CONFIG["path"])
+        """
+        self.db_path = Path(db_path) if db_path else Path(CATALOG_CONFIG["path"])
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+            # Esquema anterior: el catálogo se reconstruye desde los PDFs
+            with self.conn:
+                self.conn.execute("DROP TABLE IF EXISTS pieces")
+                self.conn.execute("DROP TABLE IF EXISTS sources")
+                self.conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+        self.conn.executescript(_SCHEMA)
+        self._metrics: Optional[Dict[Tuple[str, str, str], PieceMetrics]] = None
+        self._garments: Dict[Tuple[str, str], List[Tuple[str, PieceMetrics]]] = {}
+
+    def _load(self) -> Dict[Tuple[str, str, str], PieceMetrics]:
+        """Carga todas las métricas en memoria (una sola consulta)"""
+        if self._metrics is None:
+            self._metrics = {}
+            self._garments = {}
+            rows = self.conn.execute(
+                "SELECT model, size, piece, area, min_x, min_y, max_x, max_y, hull_area, hull, "
+                "rect_width, rect_height, rect_angle, vertex_count, shape_key FROM pieces "
+                "ORDER BY model, size, piece_index"
+            )
+            for (model, size, piece, area, min_x, min_y, max_x, max_y, hull_area, hull,
+                 rect_width, rect_height, rect_angle, vertex_count, shape_key) in rows:
+                hull_array = np.frombuffer(hull, dtype=np.float64).reshape(-1, 2)
+                metrics = PieceMetrics(
+                    area=area, bbox=(min_x, min_y, max_x, max_y), hull=hull_array,
+                    hull_area=hull_area, rect_width=rect_width, rect_height=rect_height,
+                    rect_angle=rect_angle, vertex_count=vertex_count, shape_key=shape_key
+                )
+                self._metrics.setdefault((model, size, piece), metrics)
+                self._garments.setdefault((model, size), []).append((piece, metrics))
+        return self._metrics
+
+    def get(self, model: str, size: str, piece: str) -> Optional[PieceMetrics]:
+        """
+        Obtiene las métricas de una pieza
+
+        Args:
+            model: Modelo de prenda (nombre del directorio de patrones)
+            size: Talla
+            piece: Nombre de la pieza
+
+        Returns:
+            PieceMetrics (la primera pieza con ese nombre) o None si no está catalogada
+        """
+        return self._load().get((model, size.upper(), piece))
+
+    def get_garment(self, model: str, size: str) -> Dict[str, PieceMetrics]:
+        """
+        Obtiene las métricas de las piezas de una talla por nombre
+
+        Returns:
+            dict: {pieza: PieceMetrics}; con nombres repetidos, la primera
+            (ver get_pieces)
+        """
+        pieces: Dict[str, PieceMetrics] = {}
+        for name, metrics in self.get_pieces(model, size):
+            pieces.setdefault(name, metrics)
+        return pieces
+
+    def get_pieces(self, model: str, size: str) -> List[Tuple[str, PieceMetrics]]:
+        """
+        Obtiene las métricas de todas las piezas de una talla, en su orden
+
+        Returns:
+            Lista de (pieza, PieceMetrics), incluidas las de nombre repetido
+        """
+        self._load()
+        return list(self._garments.get((model, size.upper()), []))
+
+    def get_models(self) -> List[str]:
+        """Modelos de prenda catalogados"""
+        self._load()
+        return sorted({model for model, _ in self._garments})
+
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        """
+        Obtiene el número de piezas catalogadas por modelo y talla
+
+        Returns:
+            dict: {modelo: {talla: piezas}}
+        """
+        self._load()
+        summary: Dict[str, Dict[str, int]] = {}
+        for (model, size), pieces in sorted(self._garments.items()):
+            summary.setdefault(model, {})[size] = len(pieces)
+        return summary
+
+    def is_current(self, model: str, patterns_dir: str, version: str) -> bool:
+        """
+        Indica si el catálogo de un modelo corresponde a sus PDFs actuales
+
+        Args:
+            model: Modelo de prenda
+            patterns_dir: Directorio con los PDFs del modelo
+            version: Versión del extractor de geometría
+
+        Returns:
+            True si los PDFs y la versión coinciden con los catalogados
+        """
+        stored = dict(
+            (file, (digest, stored_version)) for file, digest, stored_version in self.conn.execute(
+                "SELECT file, digest, version FROM sources WHERE model = ?", (model,))
+        )
+        current = {pdf.name: (file_digest(str(pdf)), f"{version}-{CATALOG_VERSION}")
+                   for pdf in sorted(Path(patterns_dir).glob("*.pdf"))}
+        return bool(current) and stored == current
+
+    def rebuild(self, model: str, garments: Dict[str, Garment],
+                sources: Optional[Dict[str, str]] = None, version: str = "") -> int:
+        """
+        Sustituye las métricas de un modelo por las de sus prendas
+
+        Args:
+            model: Modelo de prenda
+            garments: {talla: Garment}, p. ej. de PDFPatternLoader
+            sources: {archivo: ruta} de los PDFs de origen (para detectar cambios)
+            version: Versión del extractor de geometría
+
+        Returns:
+            Número de piezas catalogadas
+        """
+        rows = []
+        for size, garment in garments.items():
+            for index, piece in enumerate(garment.pieces):
+                metrics = compute_metrics(piece)
+                rows.append((
+                    model, size.upper(), index, piece.name, metrics.area, *metrics.bbox,
+                    metrics.hull_area, np.ascontiguousarray(metrics.hull, dtype=np.float64).tobytes(),
+                    metrics.rect_width, metrics.rect_height, metrics.rect_angle,
+                    metrics.vertex_count, metrics.shape_key
+                ))
+
+        with self.conn:
+            self.conn.execute("DELETE FROM pieces WHERE model = ?", (model,))
+            self.conn.execute("DELETE FROM sources WHERE model = ?", (model,))
+            self.conn.executemany(
+                "INSERT INTO pieces VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.executemany(
+                "INSERT INTO sources VALUES (?, ?, ?, ?)",
+                [(model, file, file_digest(path), f"{version}-{CATALOG_VERSION}")
+                 for file, path in (sources or {}).items()]
+            )
+
+        self._metrics = None
+        return len(rows)
+
+    def remove(self, model: str) -> int:
+        """
+        Elimina un modelo del catálogo
+
+        Returns:
+            Número de piezas eliminadas
+        """
+        with self.conn:
+            removed = self.conn.execute("DELETE FROM pieces WHERE model = ?", (model,)).rowcount
+            self.conn.execute("DELETE FROM sources WHERE model = ?", (model,))
+        self._metrics = None
+        return removed
+
+    def close(self):
+        """Cierra la base de datos"""
+        self.conn.close()
+
+    def __len__(self):
+        self._load()
+        return sum(len(pieces) for pieces in self._garments.values())
+
+
+def build_catalog(patterns_dir: str, catalog: PatternCatalog, model: Optional[str] = None,
+                  force: bool = False) -> Tuple[int, List[str]]:
+    """
+    Cataloga (o recataloga) un directorio de patrones
+
+    Args:
+        patterns_dir: Directorio con los PDFs de una prenda (uno por talla)
+        catalog: Catálogo destino
+        model: Nombre del modelo (por defecto el nombre del directorio)
+        force: Reconstruir aunque los PDFs no hayan cambiado
+
+    Returns:
+        tuple: (piezas catalogadas, errores); (0, []) si ya estaba al día
+    """
+    patterns_dir = Path(patterns_dir)
+    model = model or patterns_dir.resolve().name
+    version = cache_version()
+
+    if not force and catalog.is_current(model, str(patterns_dir), version):
+        return 0, []
+
+    loader = PDFPatternLoader(str(patterns_dir), cache=PatternCache())
+    garments = loader.load_all_patterns()
+    # También los PDFs con error: si no cambian no hace falta reintentarlos
+    sources = {pdf.name: str(pdf) for pdf in sorted(patterns_dir.glob("*.pdf"))}
+    count = catalog.rebuild(model, garments, sources=sources, version=version)
+    return count, list(loader.errors.values())
+
+
+def main():
+    """Línea de comandos: python -m services.pattern_catalog {rebuild,stats}"""
+    parser = argparse.ArgumentParser(description="Catálogo de métricas de patrones")
+    parser.add_argument("command", choices=["rebuild", "stats"])
+    parser.add_argument("patterns_dir", nargs="*", help="con rebuild, directorios de patrones")
+    parser.add_argument("--model", help="nombre del modelo (por defecto el del directorio)")
+    parser.add_argument("--force", action="store_true", help="reconstruir aunque no haya cambios")
+    args = parser.parse_args()
+    if args.model and len(args.patterns_dir) > 1:
+        # Cada reconstrucción sustituye el modelo entero
+        parser.error("--model solo admite un directorio de patrones")
+
+    catalog = PatternCatalog()
+    try:
+        if args.command == "rebuild":
+            for patterns_dir in args.patterns_dir:
+                count, errors = build_catalog(patterns_dir, catalog, model=args.model, force=args.force)
+                status = f"{count} piezas" if count else "sin cambios"
+                print(f"{patterns_dir}: {status}")
+                for error in errors:
+                    print(f"   {error}")
+        else:
+            for model, sizes in catalog.get_summary().items():
+                print(f"{model}: {sum(sizes.values())} piezas, tallas {', '.join(sizes)}")
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,46 +4,156 @@ Servicio para procesamiento de archivos PDF con patrones de prendas
 import fitz  # PyMuPDF
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import re
-from models import Piece, Garment
+import time
+import numpy as np
+from models import Piece, Garment, Player, Order
+from services.order_cache import file_digest
+from services.pattern_cache import PatternCache
+from services.shape_registry import ShapeRegistry
+from utils.geometry import flatten_cubics, join_segments, polygon_area
+from config import PDF_CONFIG
+
+# Versión del extractor de geometría. Incrementar al cambiar el resultado de
+# extract_pieces para invalidar la caché de patrones.
+EXTRACTOR_VERSION = "5"
+
+# Conversión de puntos PDF a milímetros (1 pt = 0.352778 mm)
+PT_TO_MM = 0.352778
+
+# Patrones del nombre de la pieza, por orden de prioridad
+PIECE_NAME_PATTERNS = [
+    re.compile(r'Piece Name:\s*(.+)', re.IGNORECASE),
+    re.compile(r'PIEZA:\s*(.+)', re.IGNORECASE),
+    re.compile(r'(DELANTERO|POSTERIOR|@MANGA DER|@MANGA IZQ|SESGO CUELLO)', re.IGNORECASE)
+]
+
+# Piezas que debe tener un patrón completo
+REQUIRED_PIECES = ["DELANTERO", "POSTERIOR", "@MANGA DER", "@MANGA IZQ"]
+
+
+def cache_version(curve_tolerance: Optional[float] = None, join_tolerance: Optional[float] = None,
+                  simplify_tolerance: Optional[float] = None) -> str:
+    """
+    Versión de la caché de patrones: extractor, tolerancias y PyMuPDF
+    
+    Args:
+        curve_tolerance: Tolerancia de curvas (por defecto la de PDF_CONFIG)
+        join_tolerance: Tolerancia de unión (por defecto la de PDF_CONFIG)
+        simplify_tolerance: Tolerancia de simplificación (por defecto la de PDF_CONFIG)
+        
+    Returns:
+        Versión que forma parte de la clave de cada entrada
+    """
+    tolerances = [
+        PDF_CONFIG[name] if value is None else value
+        for name, value in (("curve_tolerance_mm", curve_tolerance),
+                            ("join_tolerance_mm", join_tolerance),
+                            ("simplify_tolerance_mm", simplify_tolerance))
+    ]
+    return f"{EXTRACTOR_VERSION}-" + "-".join(map(str, tolerances)) + f"-{fitz.VersionBind}"
+
+
+def _lap(timings: Dict[str, float], phase: str, since: float) -> float:
+    """Anota el tiempo transcurrido desde since en una fase y devuelve el instante actual"""
+    now = time.perf_counter()
+    timings[phase] = timings.get(phase, 0.0) + now - since
+    return now
+
+
+def extract_size_from_filename(pdf_path: str) -> str:
+    """
+    Extrae la talla del nombre de un archivo (ej: "S.pdf" -> "S")
+    
+    Args:
+        pdf_path: Ruta al archivo PDF
+        
+    Returns:
+        Talla, o el nombre completo en mayúsculas si no se reconoce
+    """
+    # Buscar patrón de talla en el nombre del archivo
+    filename = Path(pdf_path).stem  # nombre sin extensión
+    
+    # Tallas posibles
+    size_patterns = [
+        r'\b(XXXL|XXL|XL|L|M|S|XS)\b',  # Tallas de letras
+        r'\b(2|4|6|8|10|12|14|16)\b'     # Tallas numéricas
+    ]
+    
+    for pattern in size_patterns:
+        match = re.search(pattern, filename, re.IGNORECASE)
+        if match:
+            return match.group(1).upper()
+    
+    # Si no se encuentra, usar el nombre completo
+    return filename.upper()
+
+
+def missing_pieces(garment: Garment) -> List[str]:
+    """
+    Obtiene las piezas obligatorias que faltan en una prenda
+    
+    Args:
+        garment: Prenda a revisar
+        
+    Returns:
+        Lista de piezas faltantes
+    """
+    piece_names = [p.name.upper() for p in garment.pieces]
+    return [req for req in REQUIRED_PIECES if req not in piece_names]
 
 class PDFProcessor:
     """Procesa archivos PDF con patrones vectoriales de prendas"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, doc: Optional[fitz.Document] = None,
+                 curve_tolerance: Optional[float] = None, join_tolerance: Optional[float] = None,
+                 simplify_tolerance: Optional[float] = None):
         """
         Inicializa el procesador
         
         Args:
             pdf_path: Ruta al archivo PDF
+            doc: Documento ya abierto (opcional); no se cierra en close()
+            curve_tolerance: Error cordal máximo en mm al aproximar curvas
+                (por defecto PDF_CONFIG["curve_tolerance_mm"])
+            join_tolerance: Distancia máxima en mm para unir extremos de
+                segmentos (por defecto PDF_CONFIG["join_tolerance_mm"])
+            simplify_tolerance: Tolerancia en mm de la geometría simplificada
+                para nesting (por defecto PDF_CONFIG["simplify_tolerance_mm"];
+                0 la desactiva)
+                
+        Raises:
+            ValueError: Si la tolerancia de curvas o la de unión no es positiva
         """
         self.pdf_path = Path(pdf_path)
-        self.doc: Optional[fitz.Document] = None
+        self.curve_tolerance = (PDF_CONFIG["curve_tolerance_mm"]
+                                if curve_tolerance is None else curve_tolerance)
+        if self.curve_tolerance <= 0:
+            raise ValueError(f"La tolerancia de curvas debe ser positiva: {self.curve_tolerance}")
+        self.join_tolerance = (PDF_CONFIG["join_tolerance_mm"]
+                               if join_tolerance is None else join_tolerance)
+        if self.join_tolerance <= 0:
+            raise ValueError(f"La tolerancia de unión debe ser positiva: {self.join_tolerance}")
+        self.simplify_tolerance = (PDF_CONFIG["simplify_tolerance_mm"]
+                                   if simplify_tolerance is None else simplify_tolerance)
+        self.doc: Optional[fitz.Document] = doc
+        self._owns_doc = doc is None
         self.size: Optional[str] = None
         self.pieces: List[Piece] = []
+        self.page_timings: Dict[int, Dict[str, float]] = {}  # {página: {fase: segundos}}
         
         # Extraer talla del nombre del archivo (ej: "S.pdf" -> "S")
         self._extract_size_from_filename()
     
+    def cache_version(self) -> str:
+        """Versión de la caché con las tolerancias de este procesador"""
+        return cache_version(self.curve_tolerance, self.join_tolerance, self.simplify_tolerance)
+    
     def _extract_size_from_filename(self):
         """Extrae la talla del nombre del archivo"""
-        # Buscar patrón de talla en el nombre del archivo
-        filename = self.pdf_path.stem  # nombre sin extensión
-        
-        # Tallas posibles
-        size_patterns = [
-            r'\b(XXXL|XXL|XL|L|M|S|XS)\b',  # Tallas de letras
-            r'\b(2|4|6|8|10|12|14|16)\b'     # Tallas numéricas
-        ]
-        
-        for pattern in size_patterns:
-            match = re.search(pattern, filename, re.IGNORECASE)
-            if match:
-                self.size = match.group(1).upper()
-                return
-        
-        # Si no se encuentra, usar el nombre completo
-        self.size = filename.upper()
+        self.size = extract_size_from_filename(self.pdf_path)
     
     def load_pdf(self) -> fitz.Document:
         """
@@ -72,14 +182,7 @@ class PDFProcessor:
         
         # Recorrer todas las páginas
         for page_num in range(len(self.doc)):
-            page = self.doc[page_num]
-            
-            # Extraer texto para identificar el nombre de la pieza
-            text = page.get_text()
-            piece_name = self._extract_piece_name(text)
-            
-            # Extraer información vectorial
-            piece = self._extract_piece_from_page(page, page_num, piece_name)
+            piece = self.extract_piece(page_num)
             
             if piece:
                 pieces.append(piece)
@@ -87,6 +190,60 @@ class PDFProcessor:
         self.pieces = pieces
         return pieces
     
+    def extract_piece(self, page_num: int) -> Optional[Piece]:
+        """
+        Extrae la pieza de una sola página
+        
+        La página se lee una sola vez: bloques de texto para el nombre y
+        dibujos en bruto para la geometría. Los tiempos de cada fase quedan
+        en self.page_timings[page_num].
+        
+        Args:
+            page_num: Número de página (desde 0)
+            
+        Returns:
+            Piece o None
+        """
+        if self.doc is None:
+            self.load_pdf()
+        
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        page = self.doc[page_num]
+        
+        # Nombre de la pieza a partir de los bloques de texto
+        blocks = page.get_text("blocks")
+        piece_name = self._find_piece_name(blocks, page.rect.height)
+        lap = _lap(timings, "text", started)
+        
+        # Dibujos en bruto (tuplas, sin objetos Point)
+        paths = page.get_cdrawings()
+        _lap(timings, "drawings", lap)
+        
+        piece = self._extract_piece_from_page(page, page_num, piece_name, paths, timings)
+        timings["total"] = time.perf_counter() - started
+        self.page_timings[page_num] = timings
+        return piece
+    
+    def _find_piece_name(self, blocks: List[tuple], page_height: float) -> str:
+        """
+        Busca el nombre de la pieza, primero en la zona de la etiqueta
+        
+        Args:
+            blocks: Bloques de page.get_text("blocks")
+            page_height: Alto de la página en puntos
+            
+        Returns:
+            Nombre de la pieza
+        """
+        limit = page_height * PDF_CONFIG["label_region"]
+        label = "\n".join(block[4] for block in blocks if block[1] <= limit)
+        name = self._extract_piece_name(label)
+        
+        if name == "UNKNOWN" and len(label) < sum(len(block[4]) for block in blocks):
+            name = self._extract_piece_name("\n".join(block[4] for block in blocks))
+        return name
+    
     def _extract_piece_name(self, text: str) -> str:
         """
         Extrae el nombre de la pieza del texto
@@ -97,22 +254,18 @@ class PDFProcessor:
         Returns:
             Nombre de la pieza
         """
-        # Buscar patrones como "Piece Name: DELANTERO"
-        patterns = [
-            r'Piece Name:\s*(.+)',
-            r'PIEZA:\s*(.+)',
-            r'(DELANTERO|POSTERIOR|@MANGA DER|@MANGA IZQ|SESGO CUELLO)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        # Patrones como "Piece Name: DELANTERO", por orden de prioridad
+        for pattern in PIECE_NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 return name
         
         return "UNKNOWN"
     
-    def _extract_piece_from_page(self, page: fitz.Page, page_num: int, piece_name: str) -> Optional[Piece]:
+    def _extract_piece_from_page(self, page: fitz.Page, page_num: int, piece_name: str,
+                                 paths: Optional[List] = None,
+                                 timings: Optional[Dict[str, float]] = None) -> Optional[Piece]:
         """
         Extrae información de una pieza desde una página
         
@@ -120,23 +273,32 @@ class PDFProcessor:
             page: Página del PDF
             page_num: Número de página
             piece_name: Nombre de la pieza
+            paths: Dibujos ya leídos con page.get_cdrawings() (opcional)
+            timings: dict donde anotar el tiempo de cada fase (opcional)
             
         Returns:
             Piece o None
         """
+        timings = {} if timings is None else timings
+        lap = time.perf_counter()
+        
         # Obtener dimensiones de la página (en puntos)
         rect = page.rect
         width_pt = rect.width
         height_pt = rect.height
         
-        # Convertir de puntos a milímetros (1 pt = 0.352778 mm)
-        PT_TO_MM = 0.352778
+        # Convertir de puntos a milímetros
         width_mm = width_pt * PT_TO_MM
         height_mm = height_pt * PT_TO_MM
         
         # Extraer paths vectoriales
-        paths = page.get_drawings()
-        vertices = self._extract_vertices_from_paths(paths)
+        if paths is None:
+            paths = page.get_cdrawings()
+            lap = _lap(timings, "drawings", lap)
+        segments = self._extract_segments_from_paths(paths)
+        lap = _lap(timings, "segments", lap)
+        vertices, marks = self._contour_from_segments(segments)
+        lap = _lap(timings, "contour", lap)
         
         # Crear pieza
         piece = Piece(
@@ -145,39 +307,158 @@ class PDFProcessor:
             width=width_mm,
             height=height_mm,
             pdf_page=page_num,
-            vertices=vertices
+            vertices=vertices,
+            marks=marks
         )
         
         # Calcular área
         piece.calculate_area()
         
+        # Geometría simplificada para colocar; la original queda para exportar
+        if self.simplify_tolerance > 0:
+            piece.simplify(self.simplify_tolerance)
+        _lap(timings, "simplify", lap)
+        
         return piece
     
-    def _extract_vertices_from_paths(self, paths: List) -> List[Tuple[float, float]]:
+    def _extract_vertices_from_paths(self, paths: List) -> Tuple[np.ndarray, List[np.ndarray]]:
         """
-        Extrae vértices de los paths vectoriales
+        Extrae el contorno de corte y las marcas internas de los paths
+        
+        Los segmentos se unen por sus extremos en anillos cerrados. El anillo
+        de mayor área es el contorno de corte; el resto de anillos y las
+        cadenas abiertas (piquetes, líneas de hilo, textos) son marcas.
         
         Args:
-            paths: Lista de paths del PDF
+            paths: Lista de paths de page.get_cdrawings()
             
         Returns:
-            Lista de vértices (x, y)
+            tuple: (contorno (N, 2) en mm, lista de marcas (M_i, 2) en mm)
+        """
+        return self._contour_from_segments(self._extract_segments_from_paths(paths))
+    
+    def _contour_from_segments(self, segments: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:
         """
-        vertices = []
-        PT_TO_MM = 0.352778
+        Une los segmentos y separa el contorno de corte de las marcas
+        
+        Args:
+            segments: Polilíneas en mm
+            
+        Returns:
+            tuple: (contorno (N, 2), lista de marcas (M_i, 2))
+        """
+        if not segments:
+            return np.empty((0, 2)), []
+        
+        rings, chains = join_segments(segments, self.join_tolerance)
+        
+        if rings:
+            outer = max(range(len(rings)), key=lambda i: abs(polygon_area(rings[i])))
+            contour = rings.pop(outer)
+        else:
+            # Sin anillos cerrados: la cadena más extensa hace de contorno
+            extent = [np.prod(chain.max(axis=0) - chain.min(axis=0)) for chain in chains]
+            contour = chains.pop(int(np.argmax(extent)))
+        
+        return contour, rings + chains
+    
+    def _extract_segments_from_paths(self, paths: List) -> List[np.ndarray]:
+        """
+        Convierte los elementos de dibujo en segmentos (polilíneas) en mm
+        
+        Las líneas aportan sus dos extremos, los rectángulos y cuadriláteros
+        sus cuatro esquinas (cerrados) y las curvas Bézier se aproximan
+        por el mínimo número de tramos rectos que respeta la tolerancia
+        cordal. Todas las coordenadas de la página se reúnen en un único
+        array y se pasan a mm con una sola multiplicación.
+        
+        Args:
+            paths: Lista de paths de page.get_cdrawings() (coordenadas en tuplas)
+            
+        Returns:
+            Lista de arrays (N_i, 2), uno por elemento de dibujo, en orden
+        """
+        coords = []  # (x, y) en puntos de todos los elementos seguidos
+        spans = []  # (es_curva, primer punto, número de puntos) por elemento
         
         for path in paths:
-            # Extraer puntos del path
-            for item in path.get("items", []):
-                if item[0] == "l":  # línea
-                    p1 = item[1]
-                    vertices.append((p1.x * PT_TO_MM, p1.y * PT_TO_MM))
-                elif item[0] == "c":  # curva
-                    # Para curvas, tomar el punto final
-                    p3 = item[3]
-                    vertices.append((p3.x * PT_TO_MM, p3.y * PT_TO_MM))
-        
-        return vertices
+            items = path.get("items", [])
+            for item in items:
+                kind = item[0]
+                if kind == "l" or kind == "c":  # línea o curva (puntos de control)
+                    points = item[1:]
+                elif kind == "re":  # rectángulo cerrado
+                    x0, y0, x1, y1 = item[1]
+                    points = ((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))
+                elif kind == "qu":  # cuadrilátero cerrado (ul, ur, ll, lr)
+                    ul, ur, ll, lr = item[1]
+                    points = (ul, ur, lr, ll, ul)
+                else:
+                    continue
+                spans.append((kind == "c", len(coords), len(points)))
+                coords.extend(points)
+            
+            # Subpath cerrado implícitamente: tramo del último punto al primero
+            # (solo entre líneas y curvas; rectángulos y cuadriláteros ya cierran)
+            if path.get("closePath") and items and items[0][0] in ("l", "c") \
+                    and items[-1][0] in ("l", "c"):
+                first, last = tuple(items[0][1]), tuple(items[-1][-1])
+                if first != last:
+                    spans.append((False, len(coords), 2))
+                    coords.extend((last, first))
+        
+        if not spans:
+            return []
+        
+        points = np.array(coords, dtype=np.float64).reshape(-1, 2) * PT_TO_MM
+        
+        # Todas las curvas de la página a la vez
+        curve_starts = np.array([start for is_curve, start, _ in spans if is_curve], dtype=np.int64)
+        controls = points[curve_starts[:, None] + np.arange(4)] if len(curve_starts) else np.empty((0, 4, 2))
+        flat, flat_counts = flatten_cubics(controls, self.curve_tolerance)
+        
+        # Cada curva: P0 seguido de sus puntos aproximados
+        curve_points = iter(np.split(flat, np.cumsum(flat_counts)[:-1]) if len(flat) else [])
+        
+        segments = []
+        for is_curve, start, count in spans:
+            if is_curve:
+                segments.append(np.vstack([points[start], next(curve_points)]))
+            else:
+                segments.append(points[start:start + count])
+        return segments
+    
+    def get_timing_summary(self) -> Dict[str, float]:
+        """
+        Suma por fase los tiempos de extracción de todas las páginas
+        
+        Returns:
+            dict: {fase: segundos} (text, drawings, segments, contour, simplify, total)
+        """
+        summary: Dict[str, float] = {}
+        for timings in self.page_timings.values():
+            for phase, elapsed in timings.items():
+                summary[phase] = summary.get(phase, 0.0) + elapsed
+        return summary
+    
+    def get_vertex_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Obtiene el número de vértices de cada pieza, original y simplificado
+        
+        Returns:
+            dict: {nombre_pieza: {"vertices", "placement_vertices", "reduction"}}
+        """
+        if not self.pieces:
+            self.extract_pieces()
+        
+        return {
+            piece.name: {
+                "vertices": len(piece.source_vertices),
+                "placement_vertices": len(piece.placement_source),
+                "reduction": piece.vertex_reduction
+            }
+            for piece in self.pieces
+        }
     
     def create_garment(self) -> Garment:
         """
@@ -218,26 +499,20 @@ class PDFProcessor:
         if not self.pieces:
             self.extract_pieces()
         
-        required_pieces = [
-            "DELANTERO",
-            "POSTERIOR",
-            "@MANGA DER",
-            "@MANGA IZQ"
-        ]
-        
         piece_names = [p.name.upper() for p in self.pieces]
-        missing = [req for req in required_pieces if req not in piece_names]
+        missing = [req for req in REQUIRED_PIECES if req not in piece_names]
         
         return len(missing) == 0, missing
     
     def close(self):
-        """Cierra el documento PDF"""
-        if self.doc:
+        """Cierra el documento PDF (solo si lo abrió este procesador)"""
+        if self.doc and self._owns_doc:
             self.doc.close()
     
     def __enter__(self):
         """Context manager entry"""
-        self.load_pdf()
+        if self.doc is None:
+            self.load_pdf()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -245,44 +520,116 @@ class PDFProcessor:
         self.close()
 
 
+def _load_pattern_file(pdf_path: str) -> Tuple[Garment, List[str]]:
+    """
+    Procesa un PDF de patrón en un proceso trabajador (debe ser una función de módulo)
+    
+    Args:
+        pdf_path: Ruta al PDF
+        
+    Returns:
+        tuple: (prenda, piezas_faltantes)
+    """
+    processor = PDFProcessor(pdf_path)
+    try:
+        garment = processor.create_garment()
+        return garment, missing_pieces(garment)
+    finally:
+        processor.close()
+
+
 class PDFPatternLoader:
     """Cargador de múltiples patrones PDF (diferentes tallas)"""
     
-    def __init__(self, patterns_dir: str):
+    def __init__(self, patterns_dir: str, cache: Optional[PatternCache] = None,
+                 shapes: Optional[ShapeRegistry] = None):
         """
         Inicializa el cargador
         
         Args:
             patterns_dir: Directorio con los PDFs de patrones
+            cache: Caché de geometría de patrones (opcional)
+            shapes: Registro de formas canónicas; las piezas duplicadas o
+                simétricas comparten geometría (por defecto uno nuevo)
         """
         self.patterns_dir = Path(patterns_dir)
+        self.cache = cache
+        self.shapes = shapes if shapes is not None else ShapeRegistry()
         self.garments: Dict[str, Garment] = {}
+        self.warnings: List[str] = []
+        self.errors: Dict[str, str] = {}
     
-    def load_all_patterns(self) -> Dict[str, Garment]:
+    def load_all_patterns(self, workers: Optional[int] = 1) -> Dict[str, Garment]:
         """
         Carga todos los patrones PDF del directorio
         
+        Con workers distinto de 1 cada PDF se procesa en un proceso
+        independiente. Los avisos de completitud quedan en self.warnings y los
+        errores por archivo en self.errors (solo los de la última carga). Con caché, los PDFs ya conocidos
+        no se abren.
+        
+        Args:
+            workers: Número de procesos (1 = secuencial, None = núcleos disponibles)
+        
         Returns:
             dict: {talla: Garment}
         """
-        # Buscar todos los PDFs en el directorio
-        pdf_files = list(self.patterns_dir.glob("*.pdf"))
+        # Los avisos y errores son los de esta carga
+        self.warnings = []
+        self.errors = {}
         
+        # Buscar todos los PDFs en el directorio
+        pdf_files = sorted(self.patterns_dir.glob("*.pdf"))
+        results: Dict[Path, Tuple[Garment, List[str]]] = {}
+        
+        # Prendas ya extraídas en ejecuciones anteriores
+        digests: Dict[Path, str] = {}
+        if self.cache is not None:
+            version = cache_version()
+            for pdf_file in pdf_files:
+                digests[pdf_file] = file_digest(str(pdf_file))
+                garment = self.cache.get(str(pdf_file), version, digests[pdf_file])
+                if garment is not None:
+                    results[pdf_file] = garment, missing_pieces(garment)
+        pending = [pdf_file for pdf_file in pdf_files if pdf_file not in results]
+        
+        if workers == 1 or len(pending) <= 1:
+            for pdf_file in pending:
+                try:
+                    results[pdf_file] = _load_pattern_file(str(pdf_file))
+                except Exception as e:
+                    self.errors[pdf_file.name] = f"Error al procesar {pdf_file.name}: {e}"
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_load_pattern_file, str(pdf_file)): pdf_file
+                    for pdf_file in pending
+                }
+                for future in as_completed(futures):
+                    pdf_file = futures[future]
+                    try:
+                        results[pdf_file] = future.result()
+                    except Exception as e:
+                        self.errors[pdf_file.name] = f"Error al procesar {pdf_file.name}: {e}"
+        
+        if self.cache is not None:
+            for pdf_file in pending:
+                if pdf_file in results:
+                    self.cache.put(str(pdf_file), version, results[pdf_file][0], digests[pdf_file])
+        
+        # Registrar en el orden de los archivos, no en el de finalización
         for pdf_file in pdf_files:
-            try:
-                processor = PDFProcessor(str(pdf_file))
-                garment = processor.create_garment()
-                
-                # Validar completitud
-                is_complete, missing = processor.validate_completeness()
-                if not is_complete:
-                    print(f"Advertencia: {pdf_file.name} no está completo. Faltan: {missing}")
-                
-                self.garments[garment.size] = garment
-                processor.close()
-                
-            except Exception as e:
-                print(f"Error al procesar {pdf_file.name}: {e}")
+            if pdf_file not in results:
+                continue
+            garment, missing = results[pdf_file]
+            
+            # Validar completitud
+            if missing:
+                self.warnings.append(f"Advertencia: {pdf_file.name} no está completo. Faltan: {missing}")
+            
+            # Una sola geometría para piezas iguales o simétricas
+            self.shapes.canonicalize_garment(garment)
+            self.garments[garment.size] = garment
         
         return self.garments
     
@@ -298,6 +645,32 @@ class PDFPatternLoader:
         """
         return self.garments.get(size.upper())
     
+    def create_garments_for_order(self, order: Order) -> Tuple[List[Garment], List[Player]]:
+        """
+        Crea una prenda por jugador a partir de los patrones cargados
+        
+        Todas las prendas de una talla comparten la geometría del patrón.
+        
+        Args:
+            order: Pedido con los jugadores
+            
+        Returns:
+            tuple: (prendas_creadas, jugadores_sin_patrón)
+        """
+        garments = []
+        missing = []
+        
+        for player in order.players:
+            pattern = self.get_garment_by_size(player.size)
+            if pattern is None:
+                missing.append(player)
+                continue
+            garment = pattern.instantiate(player)
+            order.add_garment(garment)
+            garments.append(garment)
+        
+        return garments, missing
+    
     def get_available_sizes(self) -> List[str]:
         """Obtiene lista de tallas disponibles"""
         return sorted(list(self.garments.keys()))
@@ -316,4 +689,150 @@ class PDFPatternLoader:
             if not is_valid:
                 errors.append(f"Talla {size}: {error_msg}")
         
-        return len(errors) == 0, errors
\ No newline at end of file
+        return len(errors) == 0, errors
+
+
+class DocumentPool:
+    """Conjunto acotado de documentos PDF abiertos, con expulsión LRU"""
+    
+    def __init__(self, max_open: int = 4):
+        """
+        Inicializa el conjunto
+        
+        Args:
+            max_open: Máximo de documentos abiertos a la vez
+        """
+        self.max_open = max_open
+        self._docs: "OrderedDict[Path, fitz.Document]" = OrderedDict()
+    
+    def get(self, pdf_path: str) -> fitz.Document:
+        """
+        Devuelve el documento abierto, abriéndolo si hace falta
+        
+        Args:
+            pdf_path: Ruta al PDF
+            
+        Returns:
+            Documento PDF
+        """
+        path = Path(pdf_path)
+        doc = self._docs.get(path)
+        if doc is not None:
+            self._docs.move_to_end(path)
+            return doc
+        
+        try:
+            doc = fitz.open(path)
+        except Exception as e:
+            raise ValueError(f"Error al cargar PDF {path}: {e}")
+        
+        self._docs[path] = doc
+        while len(self._docs) > self.max_open:
+            _, oldest = self._docs.popitem(last=False)
+            oldest.close()
+        return doc
+    
+    def close_all(self):
+        """Cierra todos los documentos abiertos"""
+        while self._docs:
+            _, doc = self._docs.popitem()
+            doc.close()
+    
+    def __len__(self):
+        return len(self._docs)
+
+
+class LazyPDFPatternLoader(PDFPatternLoader):
+    """Cargador de patrones que solo abre el PDF de una talla cuando se pide"""
+    
+    def __init__(self, patterns_dir: str, cache: Optional[PatternCache] = None,
+                 max_open_documents: int = 4, shapes: Optional[ShapeRegistry] = None):
+        """
+        Inicializa el cargador e indexa los PDFs por talla sin abrirlos
+        
+        Args:
+            patterns_dir: Directorio con los PDFs de patrones
+            cache: Caché de geometría de patrones (opcional)
+            max_open_documents: Máximo de documentos PDF abiertos a la vez
+            shapes: Registro de formas canónicas (por defecto uno nuevo)
+        """
+        super().__init__(patterns_dir, cache=cache, shapes=shapes)
+        self.pool = DocumentPool(max_open=max_open_documents)
+        self.index: Dict[str, Path] = {
+            extract_size_from_filename(pdf_file): pdf_file
+            for pdf_file in sorted(self.patterns_dir.glob("*.pdf"))
+        }
+    
+    def get_garment_by_size(self, size: str) -> Optional[Garment]:
+        """
+        Obtiene la prenda de una talla, extrayéndola la primera vez
+        
+        Args:
+            size: Talla buscada
+            
+        Returns:
+            Garment o None si no hay PDF para esa talla o no se pudo procesar
+        """
+        size = size.upper()
+        if size in self.garments:
+            return self.garments[size]
+        
+        pdf_file = self.index.get(size)
+        if pdf_file is None:
+            return None
+        
+        garment = None
+        if self.cache is not None:
+            digest = file_digest(str(pdf_file))
+            garment = self.cache.get(str(pdf_file), cache_version(), digest)
+        
+        if garment is None:
+            try:
+                processor = PDFProcessor(str(pdf_file), doc=self.pool.get(str(pdf_file)))
+                garment = processor.create_garment()
+            except Exception as e:
+                self.errors[pdf_file.name] = f"Error al procesar {pdf_file.name}: {e}"
+                return None
+            if self.cache is not None:
+                self.cache.put(str(pdf_file), cache_version(), garment, digest)
+        
+        missing = missing_pieces(garment)
+        if missing:
+            self.warnings.append(f"Advertencia: {pdf_file.name} no está completo. Faltan: {missing}")
+        
+        self.shapes.canonicalize_garment(garment)
+        self.garments[size] = garment
+        return garment
+    
+    def get_piece(self, size: str, page_num: int) -> Optional[Piece]:
+        """
+        Extrae una sola pieza (página) del PDF de una talla
+        
+        Args:
+            size: Talla
+            page_num: Página del PDF (desde 0)
+            
+        Returns:
+            Piece o None si no hay PDF para esa talla
+        """
+        size = size.upper()
+        garment = self.garments.get(size)
+        if garment is not None:
+            for piece in garment.pieces:
+                if piece.pdf_page == page_num:
+                    return piece
+        
+        pdf_file = self.index.get(size)
+        if pdf_file is None:
+            return None
+        
+        processor = PDFProcessor(str(pdf_file), doc=self.pool.get(str(pdf_file)))
+        return processor.extract_piece(page_num)
+    
+    def get_available_sizes(self) -> List[str]:
+        """Obtiene lista de tallas con PDF (cargadas o no)"""
+        return sorted(self.index.keys())
+    
+    def close(self):
+        """Cierra los documentos PDF abiertos"""
+        self.pool.close_all()
@@ -0,0 +1,231 @@
+"""
+Caché persistente de planes de agrupación, indexada por la firma de tallas del pedido
+"""
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from models import SizeGroup, GroupingPlan
+from config import CACHE_CONFIG
+
+# Versión del formato de los planes y del esquema. Incrementar si cambia la
+# búsqueda o la serialización.
+PLAN_CACHE_VERSION = 2
+
+# Objetivo que minimizan los planes guardados (ver GroupingOptimizer)
+PLAN_OBJECTIVE = "files,waste"
+
+# Máximo de planes que nearest() compara, los de cantidad total más parecida
+NEAREST_CANDIDATES = 32
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    config TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    size_count INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    optimal INTEGER NOT NULL,
+    plan TEXT NOT NULL,
+    PRIMARY KEY (config, signature)
+);
+CREATE INDEX IF NOT EXISTS plans_by_total ON plans (config, size_count, total);
+"""
+
+
+def size_signature(size_summary: Dict[str, int]) -> Tuple[List[str], Tuple[int, ...]]:
+    """
+    Normaliza un resumen de tallas
+
+    El plan óptimo solo depende de las cantidades, no de los nombres de las
+    tallas, así que dos pedidos con 12/10/3 prendas comparten plan aunque
+    sean S/M/L en uno y M/L/XL en otro.
+
+    Args:
+        size_summary: {talla: cantidad}
+
+    Returns:
+        tuple: (tallas ordenadas por cantidad descendente, cantidades en ese orden)
+    """
+    sizes = sorted((size for size, count in size_summary.items() if count > 0),
+                   key=lambda size: (-size_summary[size], size))
+    return sizes, tuple(size_summary[size] for size in sizes)
+
+
+class PlanCache:
+    """
+    Caché SQLite de planes de agrupación
+
+    La clave es la firma normalizada de cantidades más un hash de lo único
+    que condiciona el plan: el tamaño de grupo del optimizador y su
+    objetivo. Los planes se guardan como
+    particiones de índices de talla, así que se aplican a cualquier pedido
+    con la misma firma. Si no hay coincidencia exacta, nearest() devuelve la
+    partición de la firma más parecida para arrancar la búsqueda con ella.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Abre (o crea) la caché
+
+        Args:
+            db_path: Ruta de la base de datos (por defecto CACHE_CONFIG["plans_path"])
+        """
+        self.db_path = Path(db_path) if db_path else Path(CACHE_CONFIG["plans_path"])
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != PLAN_CACHE_VERSION:
+            # Esquema anterior: los planes se vuelven a calcular
+            with self.conn:
+                self.conn.execute("DROP TABLE IF EXISTS plans")
+                self.conn.execute(f"PRAGMA user_version = {PLAN_CACHE_VERSION}")
+        self.conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.warm_starts = 0
+        self.misses = 0
+
+    @staticmethod
+    def config_key(min_group_size: int, max_group_size: int) -> str:
+        """
+        Hash de la configuración que condiciona los planes
+
+        Otros ajustes (nesting, tamaño de archivo, presupuesto de tiempo) no
+        cambian el plan óptimo, así que no invalidan la caché.
+
+        Args:
+            min_group_size: Mínimo de prendas por archivo del optimizador
+            max_group_size: Máximo de prendas por archivo del optimizador
+
+        Returns:
+            Hash hexadecimal
+        """
+        payload = json.dumps({
+            "version": PLAN_CACHE_VERSION,
+            "objective": PLAN_OBJECTIVE,
+            "group_size": [min_group_size, max_group_size]
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+    def get(self, config: str, size_summary: Dict[str, int]) -> Optional[GroupingPlan]:
+        """
+        Devuelve el plan guardado para un resumen de tallas, si existe
+
+        Args:
+            config: Clave de configuración (config_key)
+            size_summary: {talla: cantidad}
+
+        Returns:
+            GroupingPlan con las tallas del pedido o None
+        """
+        sizes, counts = size_signature(size_summary)
+        row = self.conn.execute(
+            "SELECT optimal, plan FROM plans WHERE config = ? AND signature = ?",
+            (config, self._encode_signature(counts))
+        ).fetchone()
+        if row is None:
+            return None
+        return self._decode_plan(json.loads(row[1]), sizes, counts, bool(row[0]))
+
+    def nearest(self, config: str, size_summary: Dict[str, int]) -> Optional[List[List[int]]]:
+        """
+        Partición guardada de la firma más parecida con el mismo número de tallas
+
+        La distancia es la suma de diferencias entre cantidades en orden
+        normalizado; a igualdad se prefieren los planes óptimos. Como nunca
+        es menor que la diferencia de cantidades totales, SQLite ordena los
+        planes por esa diferencia y solo se decodifican hasta que supera la
+        mejor distancia, como mucho NEAREST_CANDIDATES.
+
+        Args:
+            config: Clave de configuración (config_key)
+            size_summary: {talla: cantidad}
+
+        Returns:
+            Lista de grupos de índices de talla (orden normalizado) o None
+        """
+        _, counts = size_signature(size_summary)
+        total = sum(counts)
+        best = None
+        for signature, gap, optimal, plan in self.conn.execute(
+                "SELECT signature, ABS(total - ?) AS gap, optimal, plan FROM plans "
+                "WHERE config = ? AND size_count = ? ORDER BY gap LIMIT ?",
+                (total, config, len(counts), NEAREST_CANDIDATES)):
+            if best is not None and gap > best[0]:
+                break
+            stored = self._decode_signature(signature)
+            distance = sum(abs(a - b) for a, b in zip(stored, counts))
+            if best is None or (distance, -optimal) < best[:2]:
+                best = (distance, -optimal, plan)
+        if best is None:
+            return None
+        return [members for members, _, _ in json.loads(best[2])]
+
+    def put(self, config: str, plan: GroupingPlan):
+        """
+        Guarda un plan (sustituye al anterior de la misma firma)
+
+        Args:
+            config: Clave de configuración (config_key)
+            plan: Plan a guardar; su demanda define la firma
+        """
+        sizes, counts = size_signature(plan.demand)
+        index = {size: i for i, size in enumerate(sizes)}
+        encoded = [
+            [[index[size] for size in group.sizes], list(group.sizes.values()), group.repetitions]
+            for group in plan.groups
+        ]
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?)",
+                (config, self._encode_signature(counts), len(counts), sum(counts),
+                 int(plan.optimal), json.dumps(encoded))
+            )
+
+    def clear(self) -> int:
+        """
+        Vacía la caché
+
+        Returns:
+            Número de planes eliminados
+        """
+        with self.conn:
+            return self.conn.execute("DELETE FROM plans").rowcount
+
+    def close(self):
+        """Cierra la base de datos"""
+        self.conn.close()
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene estadísticas de uso
+
+        Returns:
+            dict con planes guardados, aciertos, arranques en caliente y fallos
+        """
+        return {
+            "plans": len(self),
+            "hits": self.hits,
+            "warm_starts": self.warm_starts,
+            "misses": self.misses
+        }
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+    @staticmethod
+    def _encode_signature(counts: Tuple[int, ...]) -> str:
+        return ",".join(map(str, counts))
+
+    @staticmethod
+    def _decode_signature(signature: str) -> Tuple[int, ...]:
+        return tuple(int(count) for count in signature.split(","))
+
+    @staticmethod
+    def _decode_plan(encoded: list, sizes: List[str], counts: Tuple[int, ...],
+                     optimal: bool) -> GroupingPlan:
+        """Reconstruye un plan con las tallas del pedido a partir de índices normalizados"""
+        groups = [
+            SizeGroup(sizes={sizes[i]: count for i, count in zip(members, per_file)}, repetitions=repetitions)
+            for members, per_file, repetitions in encoded
+        ]
+        return GroupingPlan(groups=groups, demand=dict(zip(sizes, counts)), optimal=optimal)
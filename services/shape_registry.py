@@ -0,0 +1,118 @@
+"""
+Registro de formas canónicas: una sola geometría para piezas duplicadas o simétricas
+"""
+from typing import Dict, Optional, Tuple
+import numpy as np
+from models import Piece, Garment
+from config import PDF_CONFIG
+from utils.geometry import canonical_shape
+
+
+class ShapeRegistry:
+    """
+    Deduplica la geometría de las piezas por su forma canónica
+
+    Piezas iguales salvo traslación, giros de 90° o espejo (la manga derecha
+    y la izquierda, o la misma pieza en varios PDF) comparten un único array
+    y guardan solo la transformación que las lleva a su posición. La clave
+    de forma (Piece.shape_key) sirve además para cachear resultados de
+    colocación entre piezas simétricas.
+    """
+
+    def __init__(self, quantum: Optional[float] = None):
+        """
+        Inicializa el registro
+
+        Args:
+            quantum: Resolución en mm con la que se comparan las formas
+                (por defecto PDF_CONFIG["shape_quantum_mm"])
+        """
+        self.quantum = quantum or PDF_CONFIG["shape_quantum_mm"]
+        # {clave: (geometría canónica, geometría simplificada canónica, signo del espejo)}
+        self.shapes: Dict[str, Tuple[np.ndarray, Optional[np.ndarray], float]] = {}
+        self.pieces = 0
+        self.duplicates = 0
+        self.mirrors = 0
+        self.bytes_saved = 0
+
+    def canonicalize(self, piece: Piece) -> Optional[str]:
+        """
+        Hace que una pieza use la geometría canónica de su forma
+
+        Args:
+            piece: Pieza a canonicalizar (se modifica)
+
+        Returns:
+            Clave de la forma o None si la pieza no tiene contorno
+        """
+        if piece.shape_key is not None and piece.shape_key in self.shapes:
+            return piece.shape_key
+
+        source = piece.source_vertices
+        if len(source) < 3:
+            return None
+
+        key, canonical, base = canonical_shape(source, self.quantum)
+        handedness = float(np.sign(np.linalg.det(base[:2, :2])))
+        self.pieces += 1
+
+        entry = self.shapes.get(key)
+        if entry is None:
+            canonical = canonical.astype(source.dtype)
+            canonical.flags.writeable = False
+
+            placement = None
+            if piece.vertex_reduction:
+                inverse = np.linalg.inv(base)
+                placement = piece.placement_source @ inverse[:2, :2].T + inverse[:2, 2]
+                placement = placement.astype(source.dtype)
+                placement.flags.writeable = False
+
+            entry = (canonical, placement, handedness)
+            self.shapes[key] = entry
+        else:
+            self.duplicates += 1
+            if handedness != entry[2]:
+                self.mirrors += 1
+            self.bytes_saved += source.nbytes
+
+        piece.share_shape(key, entry[0], base, entry[1])
+        return key
+
+    def canonicalize_garment(self, garment: Garment) -> int:
+        """
+        Canonicaliza todas las piezas de una prenda
+
+        Args:
+            garment: Prenda
+
+        Returns:
+            Número de piezas que reutilizan una forma ya registrada
+        """
+        before = self.duplicates
+        for piece in garment.pieces:
+            self.canonicalize(piece)
+        return self.duplicates - before
+
+    def get_geometry(self, key: str) -> Optional[np.ndarray]:
+        """Geometría canónica de una forma (solo lectura)"""
+        entry = self.shapes.get(key)
+        return entry[0] if entry else None
+
+    def get_stats(self) -> dict:
+        """
+        Obtiene estadísticas del registro
+
+        Returns:
+            dict con piezas, formas únicas, duplicados, simétricas y bytes ahorrados
+        """
+        return {
+            "pieces": self.pieces,
+            "unique_shapes": len(self.shapes),
+            "duplicates": self.duplicates,
+            "mirrors": self.mirrors,
+            "bytes_saved": self.bytes_saved
+        }
+
+    def __len__(self):
+        return len(self.shapes)
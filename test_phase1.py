@@ -120,11 +120,20 @@ def test_pdf_processor():
         loader = PDFPatternLoader(".")
         garments = loader.load_all_patterns()
         
+        for warning in loader.warnings:
+            print(f"   ⚠️  {warning}")
+        for error in loader.errors.values():
+            print(f"   ❌ {error}")
+        
         if garments:
             print(f"\n✅ Se cargaron {len(garments)} patrones:")
             for size, garment in sorted(garments.items()):
                 print(f"   Talla {size:5s}: {len(garment.pieces)} piezas (área total: {garment.get_total_area():.0f} mm²)")
             
+            shapes = loader.shapes.get_stats()
+            print(f"   Formas únicas: {shapes['unique_shapes']} de {shapes['pieces']} piezas "
+                  f"({shapes['mirrors']} simétricas)")
+            
             # Validar todos
             print("\n🔍 VALIDANDO TODOS LOS PATRONES...")
             is_valid, errors = loader.validate_all()
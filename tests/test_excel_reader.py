@@ -0,0 +1,87 @@
+"""
+Pruebas del parseo de pedidos Excel
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from services.excel_reader import ExcelReader, read_orders_from_directory
+from services.order_cache import OrderCache
+
+
+def _players(order):
+    return [(p.name, p.number, p.size, p.sponsor, p.team) for p in order.players]
+
+
+def _parse(df: pd.DataFrame, vectorized: bool):
+    reader = ExcelReader("pedido.xlsx")
+    reader.df = df
+    return reader.parse_order(vectorized=vectorized)
+
+
+SHEETS = {
+    "columna_vacia": pd.DataFrame({
+        "Jugador": ["Patrocinador: A", "23 FOO", "7 BAR", "TOTAL"],
+        "Talla": [None, "M", "L", 2],
+        "Notas": [np.nan] * 4
+    }),
+    "columna_final_vacia": pd.DataFrame({
+        "Jugador": ["Patrocinador: A", "PALOMA", "TOTAL"],
+        "Talla": [None, "xl", None],
+        "Unnamed: 2": [None, None, None]
+    }),
+    "numericas": pd.DataFrame({
+        "Jugador": ["Patrocinador: B", "GIL", "ROS", "Patrocinador: C", "SOL", 7],
+        "Talla": [np.nan, "S", "M", np.nan, "XXL", 40],
+        "Dorsal": [np.nan, 10, 11.0, np.nan, 12, np.nan],
+        "Cantidad": [np.nan, 1, 2, np.nan, 3, 1]
+    }),
+    "mixtas": pd.DataFrame({
+        "Jugador": ["Patrocinador:  D ", " 9  LUZ ", 42, "SIN TALLA", "  ", "RESUMEN", "5 POST"],
+        "Talla": [None, " L ", "M", "ZZ", "S", None, "M"],
+        "Extra": [None, 3.5, "x", None, None, None, None]
+    }),
+    "vacia": pd.DataFrame({"Jugador": [np.nan, np.nan], "Talla": [np.nan, np.nan]})
+}
+
+
+@pytest.mark.parametrize("name", list(SHEETS))
+def test_vectorized_matches_rows(name):
+    """El parseo columnar produce exactamente el mismo Order que el de filas"""
+    df = SHEETS[name]
+    rows = _parse(df.copy(), vectorized=False)
+    vectorized = _parse(df.copy(), vectorized=True)
+    assert _players(vectorized) == _players(rows)
+    assert vectorized.get_size_summary() == rows.get_size_summary()
+
+
+def test_empty_column_players():
+    order = _parse(SHEETS["columna_vacia"], vectorized=True)
+    assert _players(order) == [("FOO", "23", "M", "A", ""), ("BAR", "7", "L", "A", "")]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_directory_with_empty_column(tmp_path, workers):
+    """Un libro con una columna vacía se parsea en lote en lugar de acabar en errores"""
+    SHEETS["columna_vacia"].to_excel(tmp_path / "a.xlsx", index=False)
+    SHEETS["mixtas"].to_excel(tmp_path / "b.xlsx", index=False)
+    (tmp_path / "legacy.xls").write_bytes(b"no es un libro")
+
+    orders, errors = read_orders_from_directory(str(tmp_path), workers=workers, merge=False)
+    assert errors == {}
+    assert list(orders) == ["a.xlsx", "b.xlsx"]
+    assert _players(orders["a.xlsx"]) == [("FOO", "23", "M", "A", ""), ("BAR", "7", "L", "A", "")]
+
+
+def test_directory_merges_and_counts_cache(tmp_path):
+    """Con caché, los aciertos de los procesos llegan a la caché del llamador"""
+    books = tmp_path / "libros"
+    books.mkdir()
+    for name in ("a", "b"):
+        SHEETS["columna_vacia"].to_excel(books / f"{name}.xlsx", index=False)
+    cache = OrderCache(str(tmp_path / "cache"))
+
+    merged, _ = read_orders_from_directory(str(books), workers=2, cache=cache)
+    assert merged.get_total_players() == 4
+    read_orders_from_directory(str(books), workers=2, cache=cache)
+    assert cache.hits + cache.misses == 4
+    assert cache.hits >= 2
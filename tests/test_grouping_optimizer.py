@@ -0,0 +1,130 @@
+"""
+Pruebas del optimizador de agrupación de tallas
+"""
+import multiprocessing
+import random
+from typing import Dict, List, Tuple
+import pytest
+from models import GroupingPlan, SizeGroup
+from services.grouping_optimizer import GroupingOptimizer, pack_cost
+
+
+def _block_cost(demand: List[int], min_size: int, max_size: int):
+    """Sobrantes mínimos de un bloque probando todas las repeticiones posibles"""
+    best = None
+    for repetitions in range(1, max(demand) + 1):
+        counts = [-(-d // repetitions) for d in demand]
+        total = max(sum(counts), min_size)
+        if total > max_size:
+            continue
+        waste = total * repetitions - sum(demand)
+        best = waste if best is None else min(best, waste)
+    return best
+
+
+def _partitions(items: List[int]):
+    """Todas las particiones de una lista en bloques"""
+    if not items:
+        yield []
+        return
+    first, rest = items[0], items[1:]
+    for partition in _partitions(rest):
+        yield [[first]] + partition
+        for k in range(len(partition)):
+            yield partition[:k] + [[first] + partition[k]] + partition[k + 1:]
+
+
+def _brute_force(demand: List[int], min_size: int, max_size: int) -> Tuple[int, int]:
+    """Coste (archivos, sobrantes) óptimo enumerando todas las particiones"""
+    best = None
+    for partition in _partitions(list(range(len(demand)))):
+        waste = 0
+        for block in partition:
+            cost = _block_cost([demand[i] for i in block], min_size, max_size)
+            if cost is None:
+                break
+            waste += cost
+        else:
+            best = min(best, (len(partition), waste)) if best else (len(partition), waste)
+    return best
+
+
+def _random_order(rng: random.Random, sizes: int) -> Dict[str, int]:
+    return {f"T{i}": rng.choice([1, 2, 3, 5, 8, 12, 20]) for i in range(sizes)}
+
+
+@pytest.mark.parametrize("min_size, max_size", [(2, 4), (1, 3), (3, 4)])
+def test_matches_brute_force(min_size, max_size):
+    """El plan óptimo coincide con la enumeración exhaustiva en pedidos pequeños"""
+    rng = random.Random(min_size * 10 + max_size)
+    optimizer = GroupingOptimizer(min_size, max_size, time_budget=10.0)
+    for _ in range(40):
+        summary = _random_order(rng, rng.randint(1, 6))
+        plan = optimizer.optimize(summary)
+        assert plan.optimal
+        assert (plan.file_count, plan.get_waste()) == _brute_force(list(summary.values()), min_size, max_size)
+
+
+def test_plan_covers_demand_within_limits():
+    """Cada talla va a un solo archivo, se cubre lo pedido y se respetan los límites"""
+    rng = random.Random(7)
+    optimizer = GroupingOptimizer(2, 4, time_budget=10.0)
+    for _ in range(40):
+        summary = _random_order(rng, rng.randint(1, 9))
+        plan = optimizer.optimize(summary)
+        assert plan.covers_demand()
+        assert plan.demand == summary
+        assigned = [size for group in plan.groups for size in group.sizes]
+        assert sorted(assigned) == sorted(summary)
+        for group in plan.groups:
+            assert 2 <= group.garments_per_file <= 4
+            assert group.repetitions >= 1
+
+
+def test_single_size_is_padded_to_minimum():
+    """Un archivo con menos prendas que el mínimo se rellena con su talla"""
+    plan = GroupingOptimizer(2, 4).optimize({"M": 1})
+    assert plan.groups[0].sizes == {"M": 2}
+    assert plan.get_waste() == 1
+
+
+def test_covers_demand():
+    plan = GroupingPlan(groups=[SizeGroup(sizes={"M": 2, "L": 1}, repetitions=3)],
+                        demand={"M": 6, "L": 4})
+    assert not plan.covers_demand()
+    plan.groups[0].repetitions = 4
+    assert plan.covers_demand()
+    assert plan.get_waste() == 2
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        GroupingOptimizer(5, 4)
+
+
+def test_budget_exhausted_returns_best_plan():
+    """Sin presupuesto se devuelve un plan válido marcado como no óptimo"""
+    summary = _random_order(random.Random(3), 22)
+    plan = GroupingOptimizer(2, 4, time_budget=0.0).optimize(summary)
+    assert not plan.optimal
+    assert plan.covers_demand()
+    assert plan.file_count >= -(-len(summary) // 4)
+
+
+def test_empty_order():
+    plan = GroupingOptimizer().optimize({"S": 0})
+    assert plan.optimal and plan.file_count == 0
+
+
+def test_pruned_by_shared_cost_is_not_optimal():
+    """Si el coste compartido de otro proceso poda todo, el plan propio no es óptimo"""
+    summary = {"T0": 5, "T1": 12, "T2": 5, "T3": 20, "T4": 2, "T5": 1}
+    optimizer = GroupingOptimizer(2, 4)
+    optimizer.shared_cost = multiprocessing.Value("q", pack_cost((2, 0)))
+    plan = optimizer.optimize(summary)
+    assert plan.covers_demand()
+    assert (plan.file_count, plan.get_waste()) > (2, 0)
+    assert not plan.optimal
+
+    optimizer.shared_cost = multiprocessing.Value("q", pack_cost((99, 0)))
+    assert optimizer.optimize(summary).optimal
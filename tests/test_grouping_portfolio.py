@@ -0,0 +1,104 @@
+"""
+Pruebas del portfolio de estrategias de agrupación
+"""
+import random
+import time
+import pytest
+from services import grouping_portfolio
+from services.grouping_optimizer import GroupingOptimizer
+from services.grouping_portfolio import GroupingPortfolio, MAX_SIZES
+
+
+def _order(sizes: int, seed: int = 0):
+    rng = random.Random(seed)
+    return {f"T{i}": rng.randint(1, 40) for i in range(sizes)}
+
+
+def test_winner_is_best_finished_plan():
+    """Gana el menor coste y, a igualdad, la estrategia configurada antes"""
+    summary = _order(7, seed=1)
+    portfolio = GroupingPortfolio(workers=1, time_budget=5.0, min_group_size=2, max_group_size=4)
+    plan = portfolio.optimize(summary)
+
+    best = min(cost for cost in portfolio.last_costs.values() if cost is not None)
+    assert (plan.file_count, plan.get_waste()) == best
+    assert plan.optimal and plan.covers_demand()
+    reference = GroupingOptimizer(2, 4, time_budget=5.0).optimize(summary)
+    assert best == (reference.file_count, reference.get_waste())
+
+    stats = portfolio.get_stats()
+    winners = [name for name, entry in stats.items() if entry["wins"]]
+    first = min(winners, key=portfolio.strategies.index)
+    assert stats[first]["sole_wins"] == (len(winners) == 1)
+    assert all(entry["runs"] == 1 and entry["errors"] == 0 for entry in stats.values())
+
+
+def test_stats_accumulate():
+    portfolio = GroupingPortfolio(strategies=["greedy", "branch_and_bound"], workers=1, time_budget=5.0)
+    for seed in range(3):
+        portfolio.optimize(_order(6, seed))
+    stats = portfolio.get_stats()
+    assert stats["greedy"]["runs"] == stats["branch_and_bound"]["runs"] == 3
+    assert stats["branch_and_bound"]["wins"] == 3
+    assert stats["branch_and_bound"]["win_rate"] == 1.0
+    assert stats["greedy"]["time"] >= 0.0
+
+
+def test_dp_is_skipped_on_many_sizes():
+    """Con más tallas que el límite la DP ni se lanza"""
+    portfolio = GroupingPortfolio(strategies=["greedy", "dp"], workers=1, time_budget=5.0)
+    plan = portfolio.optimize(_order(MAX_SIZES["dp"] + 10))
+    assert plan.covers_demand()
+    assert portfolio.stats["dp"]["skipped"] == 1
+    assert portfolio.stats["dp"]["runs"] == 0
+    assert "dp" not in portfolio.last_costs
+
+    portfolio.optimize(_order(6))
+    assert portfolio.stats["dp"]["runs"] == 1 and portfolio.stats["dp"]["skipped"] == 1
+
+
+def test_no_finisher_falls_back_to_greedy():
+    """Si ninguna estrategia termina a tiempo se devuelve el plan voraz"""
+    portfolio = GroupingPortfolio(strategies=["dp"], workers=1, time_budget=0.0)
+    plan = portfolio.optimize(_order(MAX_SIZES["dp"]))
+    assert plan.covers_demand() and not plan.optimal
+    assert plan.file_count == -(-MAX_SIZES["dp"] // portfolio.max_group_size)
+    assert portfolio.last_costs == {"dp": None}
+    assert portfolio.stats["dp"]["failures"] == 1
+
+
+def test_exceptions_are_recorded(monkeypatch):
+    def broken(*args):
+        raise RuntimeError("fallo")
+
+    monkeypatch.setitem(grouping_portfolio.STRATEGIES, "greedy", broken)
+    portfolio = GroupingPortfolio(strategies=["greedy"], workers=1, time_budget=1.0)
+    plan = portfolio.optimize(_order(5))
+    assert plan.covers_demand()
+    assert portfolio.last_errors == {"greedy": "RuntimeError: fallo"}
+    assert portfolio.stats["greedy"]["errors"] == 1
+    assert portfolio.stats["greedy"]["failures"] == 1
+
+
+def test_deadline_is_respected():
+    portfolio = GroupingPortfolio(strategies=["branch_and_bound", "local_search"], workers=1, time_budget=0.2)
+    started = time.perf_counter()
+    plan = portfolio.optimize(_order(26, seed=4))
+    assert time.perf_counter() - started < 2.0
+    assert plan.covers_demand()
+
+
+def test_pool_is_reused_until_closed():
+    with GroupingPortfolio(strategies=["greedy", "local_search"], workers=2, time_budget=0.5) as portfolio:
+        portfolio.optimize(_order(8))
+        executor = portfolio._executor
+        assert executor is not None
+        plan = portfolio.optimize(_order(8, seed=2))
+        assert portfolio._executor is executor
+        assert plan.covers_demand()
+    assert portfolio._executor is None
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        GroupingPortfolio(strategies=["magia"])
@@ -0,0 +1,120 @@
+"""
+Pruebas del motor de nesting sobre el contorno real de las piezas
+"""
+import itertools
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+from config import NESTING_CONFIG, ROLL_CONFIG
+from models import Garment, Piece, SizeGroup
+from services.nesting_engine import NestingEngine
+from utils.geometry import column_profile
+
+
+def _front(size: str, scale: float = 1.0) -> Piece:
+    """Delantero con escote curvo y hombro inclinado"""
+    t = np.linspace(0, np.pi, 60)
+    neck = np.column_stack([250 - 90 * np.cos(t), 620 - 70 * np.sin(t)])
+    outline = np.vstack([[[0, 0], [500, 0], [500, 560], [380, 640]], neck[::-1], [[120, 640], [0, 560]]])
+    return Piece(name="DELANTERO", size=size, vertices=outline * scale)
+
+
+def _garment(size: str = "M", scale: float = 1.0, simplify: bool = True) -> Garment:
+    garment = Garment(size=size)
+    garment.add_piece(_front(size, scale))
+    garment.add_piece(Piece(name="POSTERIOR", size=size,
+                            vertices=np.array([(0, 0), (480, 0), (480, 650), (0, 650)]) * scale))
+    garment.add_piece(Piece(name="@MANGA DER", size=size,
+                            vertices=np.array([(0, 0), (320, 0), (260, 300), (160, 380), (60, 300)]) * scale))
+    garment.add_piece(Piece(name="CUELLO", size=size,
+                            vertices=np.array([(0, 0), (400, 0), (400, 60), (60, 60), (60, 160), (0, 160)]) * scale))
+    if simplify:
+        for piece in garment.pieces:
+            piece.simplify(2.0)
+    return garment
+
+
+def _placed_polygons(result):
+    return [Polygon(placement.piece.vertices) for placement in result.placements]
+
+
+@pytest.mark.parametrize("simplify", [True, False])
+def test_pieces_keep_spacing_and_margins(simplify):
+    """Las piezas reales no se solapan, guardan la separación y quedan dentro de los márgenes"""
+    patterns = [_garment(size, scale, simplify) for size, scale in (("S", 0.9), ("M", 1.0), ("L", 1.1))]
+    garments = [pattern.instantiate() for pattern in patterns for _ in range(2)]
+    engine = NestingEngine()
+    result = engine.nest(garments)
+
+    assert len(result.placements) == sum(len(g.pieces) for g in garments)
+    assert result.unplaced == []
+
+    spacing = NESTING_CONFIG["spacing"]
+    polygons = _placed_polygons(result)
+    for a, b in itertools.combinations(polygons, 2):
+        assert not a.intersects(b)
+        assert a.distance(b) >= spacing - 1e-6
+
+    margin = ROLL_CONFIG["edge_margin"]
+    for placement in result.placements:
+        x, y = placement.piece.vertices[:, 0], placement.piece.vertices[:, 1]
+        assert x.min() >= margin - 1e-6
+        assert x.max() <= ROLL_CONFIG["width"] - margin + 1e-6
+        assert y.min() >= margin - 1e-6
+        assert y.max() <= result.length - margin + 1e-6
+
+
+def test_column_profile_tolerates_rounding():
+    """Un x máximo que pasa del último borde por redondeo cae en la última columna"""
+    square = np.array([(0.0, 0.0), (6.0 + 1e-12, 0.0), (6.0 + 1e-12, 4.0), (0.0, 4.0)])
+    bottom, top = column_profile(square, 2.0)
+    assert bottom.tolist() == [0.0, 0.0, 0.0]
+    assert top.tolist() == [4.0, 4.0, 4.0]
+
+
+def test_rotations_are_respected():
+    engine = NestingEngine(rotations=[0, 180])
+    result = engine.nest([_garment().instantiate() for _ in range(3)])
+    assert {placement.rotation for placement in result.placements} <= {0, 180}
+    for placement in result.placements:
+        assert placement.piece.rotation == placement.rotation
+
+
+def test_too_wide_piece_is_unplaced():
+    """Una pieza que no cabe en ningún giro va a unplaced y el resto se coloca"""
+    garment = _garment()
+    wide = Piece(name="FALDÓN", size="M", vertices=[(0, 0), (900, 0), (900, 900), (0, 900)])
+    garment.add_piece(wide)
+    engine = NestingEngine(roll_width=800, edge_margin=20, rotations=[0, 90])
+    result = engine.nest([garment])
+
+    assert result.unplaced == [wide]
+    assert len(result.placements) == len(garment.pieces) - 1
+    assert all(placement.piece is not wide for placement in result.placements)
+
+    rotated = NestingEngine(roll_width=800, edge_margin=20, rotations=[0, 90]).nest(
+        [Garment(size="M", pieces=[Piece(name="TIRA", size="M", vertices=[(0, 0), (900, 0), (900, 80), (0, 80)])])])
+    assert rotated.unplaced == []
+    assert rotated.placements[0].rotation == 90
+
+
+def test_resolution():
+    """Una resolución explícita no se sustituye por la de configuración"""
+    assert NestingEngine().resolution == NESTING_CONFIG["resolution_mm"]
+    assert NestingEngine(resolution=5.0).resolution == 5.0
+    for resolution in (0, 0.0, -1.0):
+        with pytest.raises(ValueError):
+            NestingEngine(resolution=resolution)
+    with pytest.raises(ValueError):
+        NestingEngine(roll_width=40, edge_margin=20)
+
+
+def test_nest_group_instantiates_each_size():
+    patterns = {"S": _garment("S", 0.9), "M": _garment("M")}
+    result = NestingEngine().nest_group(SizeGroup(sizes={"S": 2, "M": 1}), patterns)
+    assert len(result.placements) == 3 * len(patterns["M"].pieces)
+    assert all(piece.rotation == 0 and piece.position == (0.0, 0.0)
+               for garment in patterns.values() for piece in garment.pieces)
+
+    with pytest.raises(ValueError):
+        NestingEngine().nest_group(SizeGroup(sizes={"XL": 1}), patterns)
@@ -0,0 +1,142 @@
+"""
+Pruebas de los no-fit polygons y de su caché
+"""
+import itertools
+import random
+import numpy as np
+import pytest
+import shapely
+from models import Piece
+from services.nfp_cache import NFPCache
+from services.shape_registry import ShapeRegistry
+from utils.geometry import convex_decomposition, no_fit_polygon, polygon_area
+
+
+def _outlines():
+    """Contornos no convexos, un rectángulo y una manga con su simétrica"""
+    t = np.linspace(0, np.pi, 40)
+    neck = np.column_stack([250 - 90 * np.cos(t), 620 - 70 * np.sin(t)])
+    sleeve = np.array([(0, 0), (320, 0), (300, 120), (260, 300), (160, 380), (60, 300)], dtype=float)
+    return {
+        "DELANTERO": np.vstack([[[0, 0], [500, 0], [500, 560], [380, 640]], neck[::-1], [[120, 640], [0, 560]]]),
+        "POSTERIOR": np.array([(0, 0), (480, 0), (480, 650), (0, 650)], dtype=float),
+        "CUELLO": np.array([(0, 0), (400, 0), (400, 60), (60, 60), (60, 160), (0, 160)], dtype=float),
+        "@MANGA DER": sleeve,
+        "@MANGA IZQ": sleeve * [-1, 1]
+    }
+
+
+def _patterns(simplify: bool = True):
+    shapes = ShapeRegistry()
+    pieces = []
+    for name, outline in _outlines().items():
+        piece = Piece(name=name, size="M", vertices=outline)
+        if simplify:
+            piece.simplify(1.0)
+        shapes.canonicalize(piece)
+        pieces.append(piece)
+    return shapes, pieces
+
+
+def _place(pattern: Piece, rng: random.Random) -> Piece:
+    piece = pattern.instance()
+    piece.rotate(rng.choice([0, 90, 180, 270]))
+    piece.translate(rng.uniform(0, 900), rng.uniform(0, 900))
+    return piece
+
+
+def _polygon(piece: Piece):
+    return shapely.Polygon(piece.placement_vertices)
+
+
+def test_overlaps_match_shapely(tmp_path):
+    """870 parejas colocadas (giradas y simétricas): el NFP coincide con la intersección real"""
+    shapes, patterns = _patterns()
+    rng = random.Random(3)
+    placed = [_place(rng.choice(patterns), rng) for _ in range(30)]
+    cache = NFPCache(str(tmp_path / "nfp.sqlite"), shapes=shapes)
+
+    checked = overlapping = 0
+    for fixed, moving in itertools.permutations(placed, 2):
+        a, b = _polygon(fixed), _polygon(moving)
+        if a.intersection(b).area < 1e-3 and a.distance(b) < 1e-3:
+            continue  # se tocan: el resultado depende del redondeo
+        expected = a.intersects(b)
+        assert cache.overlaps(fixed, moving) == expected
+        checked += 1
+        overlapping += expected
+    cache.close()
+
+    assert checked > 800 and 0 < overlapping < checked
+    assert cache.computed < checked
+
+
+def test_symmetric_pair_matches_direct_computation(tmp_path):
+    """NFP(B, A) derivado de NFP(A, B) es el mismo que calcularlo directamente"""
+    shapes, patterns = _patterns()
+    rng = random.Random(8)
+    cache = NFPCache(str(tmp_path / "nfp.sqlite"), shapes=shapes)
+    for first, second in itertools.combinations(patterns, 2):
+        pieces = _place(first, rng), _place(second, rng)
+        for fixed, moving in (pieces, pieces[::-1]):
+            exterior, holes = cache.get(fixed, moving)
+            origin = moving.placement_frame[1][:2, 2]
+            expected, expected_holes = no_fit_polygon(fixed.placement_vertices, moving.placement_vertices - origin)
+            difference = shapely.Polygon(exterior, holes).symmetric_difference(
+                shapely.Polygon(expected, expected_holes))
+            assert difference.area < 1e-6 * shapely.Polygon(expected).area
+    assert cache.computed == len(patterns) * (len(patterns) - 1) // 2
+    cache.close()
+
+
+def test_memory_and_disk_round_trip(tmp_path):
+    """Las entradas se expulsan de memoria por antigüedad y se leen de disco al reabrir"""
+    path = str(tmp_path / "nfp.sqlite")
+    shapes, patterns = _patterns()
+    front, back, collar = patterns[:3]
+    cache = NFPCache(path, max_entries=2, shapes=shapes)
+    first = cache.get(front, back)
+    cache.get(front, collar)
+    cache.get(front, back)
+    cache.get(back, collar)
+    assert len(cache.memory) == 2 and len(cache) == 3
+    assert cache.memory_hits == 1 and cache.computed == 3
+
+    cache.get(front, collar)  # expulsada de memoria: se lee de disco
+    assert cache.disk_hits == 1
+    cache.close()
+
+    reopened = NFPCache(path, max_entries=2, shapes=shapes)
+    exterior, holes = reopened.get(front, back)
+    assert np.array_equal(exterior, first[0])
+    assert all(np.array_equal(hole, other) for hole, other in zip(holes, first[1]))
+    assert reopened.get_stats() == {"stored": 3, "in_memory": 1, "memory_hits": 0, "disk_hits": 1, "computed": 0}
+    assert reopened.clear() == 3
+    assert len(reopened) == 0 and len(reopened.memory) == 0
+    reopened.close()
+
+
+def test_unsimplified_pieces_are_simplified_outward(tmp_path):
+    """Sin geometría de colocación se simplifica: menos vértices y ningún solape real perdido"""
+    shapes, patterns = _patterns(simplify=False)
+    cache = NFPCache(str(tmp_path / "nfp.sqlite"), shapes=shapes, simplify_tolerance=1.0)
+    exact = NFPCache(str(tmp_path / "exacto.sqlite"), shapes=shapes, simplify_tolerance=0)
+    front = patterns[0]
+    assert len(cache._frame(front)[1]) < len(exact._frame(front)[1]) == len(front.source_vertices)
+
+    rng = random.Random(11)
+    for _ in range(200):
+        fixed, moving = _place(rng.choice(patterns), rng), _place(rng.choice(patterns), rng)
+        if exact.overlaps(fixed, moving):
+            assert cache.overlaps(fixed, moving)
+    cache.close()
+    exact.close()
+
+
+def test_convex_decomposition_covers_polygon():
+    for outline in _outlines().values():
+        parts = convex_decomposition(outline)
+        assert all(polygon_area(part) > 0 for part in parts)
+        assert sum(polygon_area(part) for part in parts) == pytest.approx(abs(polygon_area(outline)))
+        union = shapely.union_all([shapely.Polygon(part) for part in parts])
+        assert union.symmetric_difference(shapely.Polygon(outline)).area < 1e-6
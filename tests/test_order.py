@@ -0,0 +1,127 @@
+"""
+Pruebas de los índices de Order y de su versión columnar
+"""
+import random
+import pytest
+from models import ColumnarOrder, Order, Player
+
+
+def _players():
+    return [
+        Player(name="ANA", number="1", size="S", sponsor="Bar Pepe", team="Alevín"),
+        Player(name="LUIS", number="2", size="M", sponsor="Bar Pepe", team="Alevín"),
+        Player(name="EVA", number="1", size="M", sponsor="", team="Infantil"),
+        Player(name="SOL", number=None, size="L", sponsor="Talleres Gil", team="Infantil")
+    ]
+
+
+def _rebuilt(order: Order) -> Order:
+    """Order equivalente con los índices construidos desde cero"""
+    return Order(name=order.name, players=list(order.players))
+
+
+def _assert_indexes_match(order: Order):
+    fresh = _rebuilt(order)
+    assert order.get_size_summary() == fresh.get_size_summary()
+    assert order.get_sponsor_summary() == fresh.get_sponsor_summary()
+    assert order.get_available_sizes() == fresh.get_available_sizes()
+    for player in order.players:
+        assert order.get_players_by_size(player.size) == fresh.get_players_by_size(player.size)
+        assert order.get_players_by_sponsor(player.sponsor) == fresh.get_players_by_sponsor(player.sponsor)
+        assert order.get_players_by_team(player.team) == fresh.get_players_by_team(player.team)
+
+
+def test_initial_players_are_indexed():
+    order = Order(players=_players())
+    assert order.get_size_summary() == {"S": 1, "M": 2, "L": 1}
+    assert order.get_sponsor_summary() == {"Bar Pepe": 2, "SIN PATROCINADOR": 1, "Talleres Gil": 1}
+    assert [p.name for p in order.get_players_by_team("Infantil")] == ["EVA", "SOL"]
+
+
+def test_remove_player_updates_indexes():
+    """remove_player deja los índices igual que reconstruirlos"""
+    order = Order()
+    players = _players()
+    for player in players:
+        order.add_player(player)
+
+    order.remove_player(players[1])
+    _assert_indexes_match(order)
+    assert order.get_players_by_size("M") == [players[2]]
+
+    order.remove_player(players[0])
+    _assert_indexes_match(order)
+    assert "S" not in order.get_size_summary()
+    assert order.get_players_by_sponsor("Bar Pepe") == []
+    assert order.get_players_by_team("Alevín") == []
+    assert order.get_available_sizes() == ["L", "M"]
+
+
+def test_remove_player_uses_identity_for_equal_players():
+    """Con dos jugadores iguales se quita exactamente uno"""
+    twin = Player(name="ANA", number="1", size="S", sponsor="Bar Pepe", team="Alevín")
+    order = Order(players=_players() + [twin])
+    order.remove_player(twin)
+    assert all(player is not twin for player in order.players)
+    assert order.get_players_by_size("S")[0] is order.players[0]
+    assert order.get_size_summary()["S"] == 1
+    assert order.get_total_players() == 4
+    _assert_indexes_match(order)
+
+
+def test_remove_missing_player_raises():
+    order = Order(players=_players())
+    with pytest.raises(ValueError):
+        order.remove_player(Player(name="NADIE", number="0", size="XS"))
+    assert order.get_total_players() == 4
+    _assert_indexes_match(order)
+
+
+def test_rebuild_indexes_after_direct_edit():
+    order = Order(players=_players())
+    order.players.pop()
+    order.rebuild_indexes()
+    assert order.get_size_summary() == {"S": 1, "M": 2}
+    assert "Talleres Gil" not in order.get_sponsor_summary()
+
+
+def _random_players(rng: random.Random, count: int):
+    """Jugadores con números repetidos, vacíos y patrocinadores vacíos"""
+    return [
+        Player(name=f"J{i}", number=rng.choice(["", None, "1", "2", "3", "10", 7]),
+               size=rng.choice(["S", "M", "L"]), sponsor=rng.choice(["", "Bar Pepe", "Gil"]),
+               team=rng.choice(["A", "B"]))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_columnar_duplicates_match_order(seed):
+    """validate_duplicate_numbers da los mismos mensajes y en el mismo orden"""
+    players = _random_players(random.Random(seed), random.Random(seed).randint(0, 40))
+    order = Order(players=players)
+    columnar = ColumnarOrder.from_order(order)
+    assert columnar.validate_duplicate_numbers() == order.validate_duplicate_numbers()
+    assert columnar.get_size_summary() == order.get_size_summary()
+    assert columnar.get_sponsor_summary() == order.get_sponsor_summary()
+
+
+def test_columnar_duplicates_messages():
+    order = Order(players=_players() + [
+        Player(name="PACO", number="2", size="L", sponsor="Bar Pepe"),
+        Player(name="RUT", number="1", size="S", sponsor=""),
+        Player(name="LEO", number="2", size="M", sponsor="Bar Pepe")
+    ])
+    expected = (True, [
+        "Bar Pepe: número 2 duplicado (LUIS y PACO)",
+        "Bar Pepe: número 2 duplicado (LUIS y LEO)",
+        "SIN PATROCINADOR: número 1 duplicado (EVA y RUT)"
+    ])
+    assert order.validate_duplicate_numbers() == expected
+    assert ColumnarOrder.from_order(order).validate_duplicate_numbers() == expected
+
+
+def test_columnar_without_numbers():
+    order = Order(players=[Player(name="ANA", number=None, size="S"), Player(name="EVA", number="", size="S")])
+    assert ColumnarOrder.from_order(order).validate_duplicate_numbers() == (False, [])
+    assert ColumnarOrder().validate_duplicate_numbers() == (False, [])
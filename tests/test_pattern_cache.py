@@ -0,0 +1,93 @@
+"""
+Pruebas de la caché en disco de geometría de patrones
+"""
+import numpy as np
+from models import Piece, Garment
+from services.pattern_cache import PatternCache
+
+
+def _garment() -> Garment:
+    """Prenda con marcas, geometría simplificada y una pieza sin geometría"""
+    t = np.linspace(0, np.pi, 80)
+    curved = np.vstack([[[0, 0], [500, 0]], np.column_stack([250 + 250 * np.cos(t), 600 + 80 * np.sin(t)])])
+    garment = Garment(size="L")
+    front = Piece(name="DELANTERO", size="L", width=500.0, height=680.0, pdf_page=0, vertices=curved,
+                  marks=[np.array([[10.0, 10.0], [20.0, 10.0]]), np.array([[30.0, 40.0]])])
+    front.calculate_area()
+    front.simplify(1.0)
+    garment.add_piece(front)
+    garment.add_piece(Piece(name="POSTERIOR", size="L", pdf_page=1,
+                            vertices=[(0, 0), (400, 0), (400, 700), (0, 700)]))
+    garment.add_piece(Piece(name="ETIQUETA", size="L", width=30.0, height=10.0))
+    return garment
+
+
+def _pdf(tmp_path, content=b"%PDF-1.4 patron"):
+    path = tmp_path / "patron.pdf"
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_round_trip(tmp_path):
+    """La prenda leída es igual a la guardada, incluida la geometría simplificada"""
+    cache = PatternCache(str(tmp_path / "cache"))
+    pdf = _pdf(tmp_path)
+    garment = _garment()
+    assert garment.pieces[0].vertex_reduction > 0
+
+    assert cache.get(pdf, "v1") is None
+    cache.put(pdf, "v1", garment)
+    cached = cache.get(pdf, "v1")
+
+    assert cached.size == "L"
+    assert [p.name for p in cached.pieces] == [p.name for p in garment.pieces]
+    for original, restored in zip(garment.pieces, cached.pieces):
+        assert restored == original
+        assert restored.vertex_reduction == original.vertex_reduction
+    assert cached.pieces[1].placement_source is cached.pieces[1].source_vertices
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_version_and_content_key_the_entry(tmp_path):
+    cache = PatternCache(str(tmp_path / "cache"))
+    pdf = _pdf(tmp_path)
+    cache.put(pdf, "v1", _garment())
+    assert cache.get(pdf, "v2") is None
+
+    _pdf(tmp_path, b"%PDF-1.4 otro patron")
+    assert cache.get(pdf, "v1") is None
+
+
+def test_precomputed_digest(tmp_path):
+    """Con digest no hace falta el archivo"""
+    cache = PatternCache(str(tmp_path / "cache"))
+    cache.put("no-existe.pdf", "v1", _garment(), digest="abc")
+    assert cache.get("tampoco.pdf", "v1", digest="abc") is not None
+
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    cache = PatternCache(str(tmp_path / "cache"))
+    cache.put("a.pdf", "v1", _garment(), digest="abc")
+    entry = tmp_path / "cache" / "abc_v1.npz"
+    entry.write_bytes(b"no es un npz")
+    assert cache.get("a.pdf", "v1", digest="abc") is None
+    assert not entry.exists()
+
+
+def test_purge_and_stats_ignore_temporaries(tmp_path):
+    """purge y get_stats solo cuentan entradas .npz, no los temporales de put"""
+    cache = PatternCache(str(tmp_path / "cache"))
+    for digest in ("a", "b"):
+        cache.put(f"{digest}.pdf", "v1", _garment(), digest=digest)
+    cache.put("a.pdf", "v2", _garment(), digest="a")
+    leftover = tmp_path / "cache" / "tmpx1y2.tmp"
+    leftover.write_bytes(b"escritura interrumpida")
+
+    assert list((tmp_path / "cache").glob("*.tmp")) == [leftover]
+    assert cache.get_stats()["entries"] == 3
+
+    assert cache.purge(keep_version="v2") == 2
+    assert cache.get("a.pdf", "v2", digest="a") is not None
+    assert cache.purge() == 1
+    assert cache.get_stats()["entries"] == 0
+    assert leftover.exists()
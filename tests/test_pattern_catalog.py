@@ -0,0 +1,130 @@
+"""
+Pruebas del catálogo de métricas de patrones
+"""
+import sqlite3
+import pytest
+from config import CACHE_CONFIG
+from models import Garment, Piece
+from services.pattern_catalog import PatternCatalog, build_catalog
+from services.pdf_processor import cache_version
+from tests.test_pdf_loading import PIECE_NAMES, _make_pdf
+
+
+def _garment(size: str, width: float = 400.0) -> Garment:
+    """Prenda con dos piezas del mismo nombre y una sin geometría"""
+    garment = Garment(size=size)
+    garment.add_piece(Piece(name="DELANTERO", size=size,
+                            vertices=[(0, 0), (width, 0), (width, 600), (200, 700), (0, 600)]))
+    garment.add_piece(Piece(name="UNKNOWN", size=size, vertices=[(0, 0), (100, 0), (100, 50), (0, 50)]))
+    garment.add_piece(Piece(name="UNKNOWN", size=size, vertices=[(0, 0), (80, 0), (40, 60)]))
+    garment.add_piece(Piece(name="ETIQUETA", size=size, width=30.0, height=10.0, area=300.0))
+    return garment
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = PatternCatalog(str(tmp_path / "catalogo.sqlite"))
+    yield catalog
+    catalog.close()
+
+
+@pytest.fixture
+def patterns(tmp_path):
+    directory = tmp_path / "camiseta"
+    directory.mkdir()
+    for size in ("S", "M"):
+        _make_pdf(directory / f"{size}.pdf")
+    return directory
+
+
+def test_rebuild_and_queries(catalog):
+    assert catalog.rebuild("camiseta", {"s": _garment("S"), "M": _garment("M", 450.0)}) == 8
+    assert len(catalog) == 8
+    assert catalog.get_models() == ["camiseta"]
+    assert catalog.get_summary() == {"camiseta": {"M": 4, "S": 4}}
+
+    front = catalog.get("camiseta", "s", "DELANTERO")
+    assert front.area == pytest.approx(400 * 600 + 400 * 100 / 2)
+    assert front.bbox == (0.0, 0.0, 400.0, 700.0)
+    assert front.hull_area == pytest.approx(front.area)
+    assert front.vertex_count == 5
+
+    pieces = catalog.get_pieces("camiseta", "S")
+    assert [name for name, _ in pieces] == ["DELANTERO", "UNKNOWN", "UNKNOWN", "ETIQUETA"]
+    assert catalog.get_garment("camiseta", "S")["UNKNOWN"] is pieces[1][1]
+    assert catalog.get("camiseta", "S", "UNKNOWN").area == pytest.approx(5000.0)
+    label = catalog.get("camiseta", "S", "ETIQUETA")
+    assert (label.vertex_count, label.bbox_width, label.bbox_height, label.area) == (0, 30.0, 10.0, 300.0)
+    assert catalog.get("camiseta", "XL", "DELANTERO") is None
+
+
+def test_rebuild_replaces_model(catalog):
+    catalog.rebuild("camiseta", {"S": _garment("S"), "M": _garment("M")})
+    catalog.rebuild("polo", {"L": _garment("L")})
+    assert len(catalog) == 12
+
+    catalog.rebuild("camiseta", {"XL": _garment("XL", 500.0)})
+    assert catalog.get_summary() == {"camiseta": {"XL": 4}, "polo": {"L": 4}}
+    assert catalog.get("camiseta", "S", "DELANTERO") is None
+    assert catalog.get("camiseta", "XL", "DELANTERO").bbox_width == 500.0
+
+    assert catalog.remove("camiseta") == 4
+    assert catalog.get_models() == ["polo"]
+
+
+def test_is_current_tracks_pdfs_and_version(catalog, patterns):
+    sources = {pdf.name: str(pdf) for pdf in patterns.glob("*.pdf")}
+    assert not catalog.is_current("camiseta", str(patterns), "v1")
+
+    catalog.rebuild("camiseta", {"S": _garment("S")}, sources=sources, version="v1")
+    assert catalog.is_current("camiseta", str(patterns), "v1")
+    assert not catalog.is_current("camiseta", str(patterns), "v2")
+    assert not catalog.is_current("polo", str(patterns), "v1")
+
+    _make_pdf(patterns / "M.pdf", names=PIECE_NAMES[:2])
+    assert not catalog.is_current("camiseta", str(patterns), "v1")
+
+    sources["M.pdf"] = str(patterns / "M.pdf")
+    catalog.rebuild("camiseta", {"S": _garment("S")}, sources=sources, version="v1")
+    assert catalog.is_current("camiseta", str(patterns), "v1")
+    _make_pdf(patterns / "L.pdf")
+    assert not catalog.is_current("camiseta", str(patterns), "v1")
+    (patterns / "L.pdf").unlink()
+    (patterns / "S.pdf").unlink()
+    assert not catalog.is_current("camiseta", str(patterns), "v1")
+
+
+def test_is_current_without_pdfs(catalog, tmp_path):
+    """Un directorio vacío nunca está al día, aunque el catálogo tampoco tenga fuentes"""
+    catalog.rebuild("vacio", {"S": _garment("S")})
+    (tmp_path / "vacio").mkdir()
+    assert not catalog.is_current("vacio", str(tmp_path / "vacio"), "")
+
+
+def test_build_catalog_skips_unchanged_patterns(catalog, patterns, tmp_path, monkeypatch):
+    monkeypatch.setitem(CACHE_CONFIG, "patterns_dir", tmp_path / "cache")
+    count, errors = build_catalog(str(patterns), catalog)
+    assert (count, errors) == (2 * len(PIECE_NAMES), [])
+    assert catalog.is_current("camiseta", str(patterns), cache_version())
+    assert build_catalog(str(patterns), catalog) == (0, [])
+    assert build_catalog(str(patterns), catalog, force=True)[0] == 2 * len(PIECE_NAMES)
+
+    (patterns / "XL.pdf").write_bytes(b"no es un pdf")
+    count, errors = build_catalog(str(patterns), catalog)
+    assert count == 2 * len(PIECE_NAMES) and len(errors) == 1
+    assert build_catalog(str(patterns), catalog) == (0, [])
+    assert sorted(catalog.get_summary()["camiseta"]) == ["M", "S"]
+
+
+def test_old_schema_is_dropped(tmp_path):
+    path = tmp_path / "catalogo.sqlite"
+    catalog = PatternCatalog(str(path))
+    catalog.rebuild("camiseta", {"S": _garment("S")})
+    catalog.close()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA user_version = 1")
+    conn.close()
+    catalog = PatternCatalog(str(path))
+    assert len(catalog) == 0
+    catalog.close()
@@ -0,0 +1,122 @@
+"""
+Pruebas de la carga perezosa de patrones PDF
+"""
+import fitz
+import pytest
+from services.pattern_cache import PatternCache
+from services.pdf_processor import DocumentPool, LazyPDFPatternLoader, PDFPatternLoader, PDFProcessor
+
+PIECE_NAMES = ("DELANTERO", "POSTERIOR", "@MANGA DER", "@MANGA IZQ")
+
+
+def _make_pdf(path, names=PIECE_NAMES):
+    """PDF de patrón con una pieza vectorial (polilínea y curva) por página"""
+    doc = fitz.open()
+    for i, name in enumerate(names):
+        page = doc.new_page(width=800, height=800)
+        shape = page.new_shape()
+        shape.draw_polyline([(100, 100), (400 + i * 10, 100), (450, 300), (400, 500), (100, 500), (100, 100)])
+        shape.draw_bezier((100, 100), (50, 50), (60, 40), (100, 100))
+        shape.finish(closePath=True)
+        shape.commit()
+        page.insert_text((50, 750), f"Piece Name: {name}")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def patterns(tmp_path):
+    directory = tmp_path / "patrones"
+    directory.mkdir()
+    for size in ("S", "M", "L"):
+        _make_pdf(directory / f"{size}.pdf")
+    return directory
+
+
+def test_pool_evicts_least_recently_used(patterns):
+    pool = DocumentPool(max_open=2)
+    small = pool.get(str(patterns / "S.pdf"))
+    medium = pool.get(str(patterns / "M.pdf"))
+    assert pool.get(str(patterns / "S.pdf")) is small
+
+    pool.get(str(patterns / "L.pdf"))
+    assert len(pool) == 2
+    assert medium.is_closed and not small.is_closed
+
+    pool.close_all()
+    assert len(pool) == 0 and small.is_closed
+
+
+def test_pool_invalid_pdf(tmp_path):
+    (tmp_path / "roto.pdf").write_bytes(b"no es un pdf")
+    with pytest.raises(ValueError):
+        DocumentPool().get(str(tmp_path / "roto.pdf"))
+
+
+def test_lazy_loader_opens_only_requested_sizes(patterns):
+    loader = LazyPDFPatternLoader(str(patterns), max_open_documents=1)
+    assert loader.get_available_sizes() == ["L", "M", "S"]
+    assert len(loader.pool) == 0 and loader.garments == {}
+
+    garment = loader.get_garment_by_size("m")
+    assert [p.name for p in garment.pieces] == list(PIECE_NAMES)
+    assert loader.get_garment_by_size("M") is garment
+    assert list(loader.garments) == ["M"]
+    assert loader.get_piece("M", 1) is garment.pieces[1]
+    assert loader.get_garment_by_size("XXL") is None
+    assert loader.warnings == [] and loader.errors == {}
+
+    piece = loader.get_piece("L", 2)
+    assert piece.name == "@MANGA DER"
+    assert list(loader.garments) == ["M"]
+    assert len(loader.pool) == 1
+    loader.close()
+    assert len(loader.pool) == 0
+
+
+def test_lazy_loader_matches_eager_loader(patterns):
+    eager = PDFPatternLoader(str(patterns))
+    eager.load_all_patterns()
+    lazy = LazyPDFPatternLoader(str(patterns), max_open_documents=2)
+    for size in eager.get_available_sizes():
+        expected = eager.get_garment_by_size(size)
+        garment = lazy.get_garment_by_size(size)
+        assert [p.name for p in garment.pieces] == [p.name for p in expected.pieces]
+        for piece, other in zip(garment.pieces, expected.pieces):
+            assert piece.calculate_bounding_box() == pytest.approx(other.calculate_bounding_box())
+    assert len(lazy.pool) == 2
+    lazy.close()
+
+
+def test_lazy_loader_uses_cache_without_opening(patterns, tmp_path):
+    cache = PatternCache(str(tmp_path / "cache"))
+    LazyPDFPatternLoader(str(patterns), cache=cache).get_garment_by_size("S")
+
+    loader = LazyPDFPatternLoader(str(patterns), cache=cache)
+    garment = loader.get_garment_by_size("S")
+    assert len(garment.pieces) == 4
+    assert len(loader.pool) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lazy_loader_records_errors(patterns):
+    (patterns / "XL.pdf").write_bytes(b"no es un pdf")
+    _make_pdf(patterns / "XS.pdf", names=PIECE_NAMES[:2])
+    loader = LazyPDFPatternLoader(str(patterns))
+
+    assert loader.get_garment_by_size("XL") is None
+    assert list(loader.errors) == ["XL.pdf"]
+    assert len(loader.get_garment_by_size("XS").pieces) == 2
+    assert len(loader.warnings) == 1 and "XS.pdf" in loader.warnings[0]
+    loader.close()
+
+
+@pytest.mark.parametrize("tolerance", ["curve_tolerance", "join_tolerance"])
+def test_tolerances_must_be_positive(tolerance):
+    """Una tolerancia 0 explícita no se sustituye por la de configuración"""
+    with pytest.raises(ValueError):
+        PDFProcessor("M.pdf", **{tolerance: 0.0})
+    processor = PDFProcessor("M.pdf", **{tolerance: 0.25})
+    assert getattr(processor, tolerance) == 0.25
+    assert processor.cache_version() != PDFProcessor("M.pdf").cache_version()
@@ -0,0 +1,82 @@
+"""
+Pruebas de la actualización incremental del pedido por bloques de equipo
+"""
+import pandas as pd
+from leer_excel_mejorado import PedidoIncremental, convertir_equipos_a_order, dividir_por_equipos
+
+
+def _hoja(equipos) -> pd.DataFrame:
+    """Hoja con bloques 'Equipo:' como la que devuelve leer_hoja_equipaciones"""
+    filas = []
+    for nombre, patrocinador, jugadores in equipos:
+        filas.append([f"Equipo: {nombre}", f"Patrocinador: {patrocinador}", None])
+        filas.append(["Nombre jugador", "Numero", "Talla"])
+        filas.extend(jugadores)
+        filas.append([None, None, None])
+    return pd.DataFrame(filas)
+
+
+EQUIPOS = [
+    ("Alevín", "Bar Pepe", [["ANA", 1, "s"], ["LUIS", 2, "M"]]),
+    ("Infantil", "Talleres Gil", [["EVA", 5, "L"], ["SOL", 9, "M"]]),
+    ("Cadete", "Bar Pepe", [["IKER", 3, "XL"]])
+]
+
+
+def _completo(df) -> pd.DataFrame:
+    return convertir_equipos_a_order(dividir_por_equipos(df))
+
+
+def _jugadores(order):
+    return sorted((p.team, p.name, p.number, p.size, p.sponsor) for p in order.players)
+
+
+def test_primera_lectura_convierte_todos():
+    pedido = PedidoIncremental()
+    df = _hoja(EQUIPOS)
+    assert pedido.actualizar(df) == ["Alevín", "Infantil", "Cadete"]
+    assert _jugadores(pedido.order) == _jugadores(_completo(df))
+    assert pedido.actualizar(df) == []
+
+
+def test_solo_se_parchea_el_equipo_modificado():
+    """Los equipos sin cambios conservan sus objetos Player y los índices siguen al día"""
+    pedido = PedidoIncremental()
+    pedido.actualizar(_hoja(EQUIPOS))
+    sin_cambios = {p.name: p for p in pedido.order.players if p.team != "Infantil"}
+
+    modificados = [EQUIPOS[0], ("Infantil", "Talleres Gil", [["EVA", 5, "XL"], ["RUT", 4, "S"]]), EQUIPOS[2]]
+    df = _hoja(modificados)
+    assert pedido.actualizar(df) == ["Infantil"]
+
+    for player in pedido.order.players:
+        if player.team != "Infantil":
+            assert player is sin_cambios[player.name]
+    completo = _completo(df)
+    assert _jugadores(pedido.order) == _jugadores(completo)
+    assert pedido.order.get_size_summary() == completo.get_size_summary()
+    assert pedido.order.get_sponsor_summary() == completo.get_sponsor_summary()
+    assert [p.name for p in pedido.order.get_players_by_team("Infantil")] == ["EVA", "RUT"]
+    assert pedido.order.get_players_by_size("M") == [sin_cambios["LUIS"]]
+
+
+def test_equipo_eliminado_sale_del_pedido():
+    pedido = PedidoIncremental()
+    pedido.actualizar(_hoja(EQUIPOS))
+    df = _hoja([EQUIPOS[0], EQUIPOS[2]])
+
+    assert pedido.actualizar(df) == ["Infantil"]
+    assert pedido.order.get_players_by_team("Infantil") == []
+    assert "Infantil" not in pedido.jugadores_por_equipo
+    assert pedido.order.get_size_summary() == _completo(df).get_size_summary()
+
+
+def test_equipos_con_el_mismo_nombre():
+    """Dos bloques con el mismo nombre se parchean por separado"""
+    repetidos = [EQUIPOS[0], ("Alevín", "Bar Luis", [["TEO", 7, "M"]])]
+    pedido = PedidoIncremental()
+    assert pedido.actualizar(_hoja(repetidos)) == ["Alevín", "Alevín#2"]
+
+    repetidos[1] = ("Alevín", "Bar Luis", [["TEO", 7, "L"]])
+    assert pedido.actualizar(_hoja(repetidos)) == ["Alevín#2"]
+    assert _jugadores(pedido.order) == _jugadores(_completo(_hoja(repetidos)))
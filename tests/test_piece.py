@@ -0,0 +1,133 @@
+"""
+Pruebas de la geometría de Piece con formas compartidas
+"""
+import dataclasses
+import numpy as np
+import pytest
+import shapely
+from models import Piece, Garment
+from services.shape_registry import ShapeRegistry
+from utils.geometry import simplify_polygon
+
+
+def _outline(offset=(690.0, 90.0)) -> np.ndarray:
+    """Cuerpo con escote curvo (muchos vértices) desplazado del origen"""
+    t = np.linspace(0, -np.pi, 60)
+    neck = np.column_stack([310 + 160 * np.cos(t), 790 + 110 * np.sin(t)])
+    outline = np.vstack([[[0, 0], [620, 0], [620, 790]], neck, [[0, 790]]])
+    return outline + offset
+
+
+def _canonical_garment() -> Garment:
+    """Prenda con piezas iguales y simétricas ya canonicalizadas"""
+    outline = _outline()
+    garment = Garment(size="M")
+    garment.add_piece(Piece(name="DELANTERO", size="M", vertices=outline))
+    garment.add_piece(Piece(name="POSTERIOR", size="M", vertices=outline[::-1] + [0, 900]))
+    garment.add_piece(Piece(name="@MANGA IZQ", size="M", vertices=outline * [-1, 1]))
+    ShapeRegistry().canonicalize_garment(garment)
+    return garment
+
+
+def test_simplify_after_canonicalize_covers_source():
+    """La geometría simplificada tras share_shape sigue envolviendo a la real"""
+    for piece in _canonical_garment().pieces:
+        assert piece.shape_key is not None
+        reduction = piece.simplify(0.5)
+        assert reduction > 0
+
+        real = shapely.Polygon(piece.source_vertices)
+        placement = shapely.Polygon(piece.placement_source)
+        assert placement.buffer(1e-6).covers(real), piece.name
+        np.testing.assert_allclose(placement.bounds, real.bounds, atol=0.5)
+
+
+def test_simplify_after_canonicalize_follows_transform():
+    """La geometría de colocación transformada acompaña a los vértices"""
+    for piece in _canonical_garment().pieces:
+        piece.simplify(0.5)
+        piece.rotate(90)
+        piece.translate(15, -40)
+        real = shapely.Polygon(piece.vertices)
+        placement = shapely.Polygon(piece.placement_vertices)
+        assert placement.buffer(1e-6).covers(real), piece.name
+
+
+def test_shape_key_is_not_an_init_argument():
+    """shape_key solo lo fija share_shape"""
+    init_fields = {f.name for f in dataclasses.fields(Piece) if f.init}
+    assert "shape_key" not in init_fields
+    assert Piece(name="DELANTERO", size="M", vertices=_outline()).shape_key is None
+
+
+def test_rotate_is_lazy_and_size_follows_geometry():
+    """rotate/transform solo acumulan; ancho, alto y caja se calculan al pedirlos"""
+    piece = Piece(name="DELANTERO", size="M", width=1.0, height=2.0, vertices=_outline())
+    assert (piece.width, piece.height) == (1.0, 2.0)
+
+    piece.rotate(90)
+    piece.transform(np.diag([2.0, 1.0, 1.0]))
+    assert piece._bbox is None and piece._vertices is None
+    assert piece.width == pytest.approx(2 * 790.0)
+    assert piece.height == pytest.approx(620.0)
+
+    piece.translate(10, 20)
+    min_x, min_y, max_x, max_y = piece.calculate_bounding_box()
+    np.testing.assert_allclose([min_x, min_y, max_x, max_y],
+                               [*piece.vertices.min(axis=0), *piece.vertices.max(axis=0)])
+    assert piece.instance().width == piece.width
+
+
+def test_vertices_is_a_plain_property():
+    """vertices es un argumento de __init__ y una propiedad, no un campo"""
+    assert "vertices" not in {f.name for f in dataclasses.fields(Piece)}
+    piece = Piece("DELANTERO", "M", vertices=[(0, 0), (10, 0), (10, 5)])
+    assert piece.vertices.shape == (3, 2)
+    assert not piece.vertices.flags.writeable
+    assert len(Piece(name="VACIA", size="M").vertices) == 0
+
+    piece.rotate(90)
+    piece.vertices = [(0, 0), (4, 0), (4, 4), (0, 4)]
+    np.testing.assert_array_equal(piece.transform_matrix, np.eye(3))
+    assert piece.calculate_bounding_box() == (0.0, 0.0, 4.0, 4.0)
+
+
+def _random_outline(rng: np.random.Generator) -> np.ndarray:
+    """Contorno no convexo en estrella con radios aleatorios"""
+    count = int(rng.integers(6, 150))
+    angles = np.sort(rng.uniform(0, 2 * np.pi, count))
+    radii = rng.uniform(20, 120, count)
+    outline = np.column_stack([radii * np.cos(angles), radii * np.sin(angles)])
+    return outline[::-1] if rng.random() < 0.5 else outline
+
+
+def _assert_outward_within(outline: np.ndarray, simplified: np.ndarray, tolerance: float):
+    original = shapely.Polygon(outline)
+    result = shapely.Polygon(simplified)
+    assert result.is_valid
+    assert result.buffer(1e-6).covers(original)
+    assert shapely.contains_xy(result.buffer(1e-6), outline[:, 0], outline[:, 1]).all()
+    deviation = shapely.hausdorff_distance(original.exterior, result.exterior, densify=0.02)
+    assert deviation <= tolerance * (1 + 1e-6)
+
+
+def test_simplify_polygon_outward_counterexample():
+    """Contorno en el que desplazar las aristas recortaba el original"""
+    outline = np.array([[77, 12], [114, 30], [70, 36], [20, 88], [-42, 57], [125, -13]], float)
+    _assert_outward_within(outline, simplify_polygon(outline, 10), 10)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_simplify_polygon_outward_property(seed):
+    """En contornos no convexos el resultado cubre al original sin alejarse más de la tolerancia"""
+    rng = np.random.default_rng(seed)
+    reduced = 0
+    for _ in range(20):
+        outline = _random_outline(rng)
+        if not shapely.Polygon(outline).is_valid:
+            continue
+        tolerance = float(rng.choice([0.5, 2.0, 5.0, 10.0]))
+        simplified = simplify_polygon(outline, tolerance)
+        _assert_outward_within(outline, simplified, tolerance)
+        reduced += len(simplified) < len(outline)
+    assert reduced > 0
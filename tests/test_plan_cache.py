@@ -0,0 +1,84 @@
+"""
+Pruebas de la caché de planes de agrupación
+"""
+import json
+import random
+import sqlite3
+import pytest
+from config import NESTING_CONFIG, OPTIMIZATION_LIMITS
+from services.grouping_optimizer import GroupingOptimizer
+from services.plan_cache import PlanCache, size_signature
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PlanCache(str(tmp_path / "planes.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_config_key_depends_only_on_group_size(monkeypatch):
+    key = PlanCache.config_key(2, 4)
+    monkeypatch.setitem(NESTING_CONFIG, "spacing", 99)
+    monkeypatch.setitem(OPTIMIZATION_LIMITS, "time_budget_s", 0.1)
+    monkeypatch.setitem(OPTIMIZATION_LIMITS, "max_file_size_mb", 1)
+    assert PlanCache.config_key(2, 4) == key
+    assert PlanCache.config_key(2, 5) != key
+    assert PlanCache.config_key(1, 4) != key
+
+
+def test_optimizer_round_trip(cache):
+    optimizer = GroupingOptimizer(2, 4, cache=cache)
+    plan = optimizer.optimize({"S": 12, "M": 10, "L": 3})
+    assert plan.optimal
+
+    again = GroupingOptimizer(2, 4, cache=cache).optimize({"M": 12, "L": 10, "XL": 3})
+    assert cache.hits == 1
+    assert again.covers_demand()
+    assert (again.file_count, again.get_waste()) == (plan.file_count, plan.get_waste())
+
+
+def _closest_partitions(cache: PlanCache, config: str, summary):
+    """Particiones de los planes más cercanos recorriendo toda la tabla"""
+    _, counts = size_signature(summary)
+    ranked = []
+    for signature, optimal, plan in cache.conn.execute(
+            "SELECT signature, optimal, plan FROM plans WHERE config = ? AND size_count = ?",
+            (config, len(counts))):
+        stored = cache._decode_signature(signature)
+        key = (sum(abs(a - b) for a, b in zip(stored, counts)), -optimal)
+        ranked.append((key, [members for members, _, _ in json.loads(plan)]))
+    best = min(key for key, _ in ranked)
+    return [partition for key, partition in ranked if key == best]
+
+
+def test_nearest_matches_full_scan(cache):
+    """Parar por diferencia de totales no cambia el plan más cercano"""
+    rng = random.Random(5)
+    optimizer = GroupingOptimizer(2, 4, time_budget=0.05)
+    config = PlanCache.config_key(2, 4)
+    for _ in range(30):
+        cache.put(config, optimizer.optimize({f"T{i}": rng.randint(1, 30) for i in range(6)}))
+
+    for _ in range(20):
+        summary = {f"T{i}": rng.randint(1, 30) for i in range(6)}
+        assert cache.nearest(config, summary) in _closest_partitions(cache, config, summary)
+
+    assert cache.nearest(config, {"S": 1, "M": 2}) is None
+    assert cache.nearest(PlanCache.config_key(1, 3), summary) is None
+
+
+def test_old_schema_is_replaced(tmp_path):
+    path = tmp_path / "planes.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE plans (config TEXT, signature TEXT, size_count INTEGER, "
+                 "optimal INTEGER, plan TEXT, PRIMARY KEY (config, signature))")
+    conn.execute("INSERT INTO plans VALUES ('x', '1', 1, 1, '[]')")
+    conn.commit()
+    conn.close()
+
+    cache = PlanCache(str(path))
+    assert len(cache) == 0
+    GroupingOptimizer(2, 4, cache=cache).optimize({"S": 3, "M": 1})
+    assert len(cache) == 1
+    cache.close()
@@ -3,9 +3,11 @@ Utilidades del sistema
 """
 from utils.logger import GarmentLogger, app_logger
 from utils import validators
+from utils import geometry
 
 __all__ = [
     'GarmentLogger',
     'app_logger',
-    'validators'
+    'validators',
+    'geometry'
 ]
\ No newline at end of file